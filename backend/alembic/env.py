@@ -5,6 +5,11 @@ from sqlalchemy import pool
 
 from alembic import context
 
+from app.core.config import settings
+from app.database import Base
+from app import models  # noqa: F401  (registers the tables on Base.metadata)
+from app.search import SEARCH_TABLE
+
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
@@ -14,11 +19,21 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# The application settings are the single source of the database URL
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("%", "%%"))
+
 # add your model's MetaData object here
 # for 'autogenerate' support
-# from myapp import mymodel
-# target_metadata = mymodel.Base.metadata
-target_metadata = None
+target_metadata = Base.metadata
+
+
+
+def include_name(name, type_, parent_names):
+    """Leave the search index (and FTS5's shadow tables) out of autogenerate."""
+    if type_ == "table":
+        return not name.startswith(SEARCH_TABLE)
+    return True
+
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
@@ -43,6 +58,7 @@ def run_migrations_offline() -> None:
         url=url,
         target_metadata=target_metadata,
         literal_binds=True,
+        include_name=include_name,
         dialect_opts={"paramstyle": "named"},
     )
 
@@ -65,7 +81,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_name=include_name,
         )
 
         with context.begin_transaction():
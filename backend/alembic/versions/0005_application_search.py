@@ -0,0 +1,83 @@
+"""application search index
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 05:10:00.000000
+
+The DDL, the backfill query and the text normalization are copied here
+as they were at this revision, so later changes to app.search or the
+models do not change what upgrading an older database does. At runtime
+app.search keeps the documents up to date.
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_CHAR_MAP = str.maketrans({
+    "\u064a": "\u06cc",  # Arabic yeh -> Persian yeh
+    "\u0649": "\u06cc",  # alef maksura -> Persian yeh
+    "\u0643": "\u06a9",  # Arabic kaf -> Persian kaf
+    "\u0640": None,      # tatweel
+    **{chr(0x06F0 + digit): str(digit) for digit in range(10)},  # Persian digits
+    **{chr(0x0660 + digit): str(digit) for digit in range(10)},  # Arabic-Indic digits
+})
+_DIACRITICS = re.compile("[\u064b-\u065f\u0670]")
+_ZWNJ = "\u200c"
+_ZWNJ_WORDS = re.compile(r"\S*\u200c\S*")
+
+
+def build_document(*fields) -> str:
+    """app.search.build_document as of this revision."""
+    value = _DIACRITICS.sub("", " ".join(field for field in fields if field).translate(_CHAR_MAP)).casefold()
+    parts = [value.replace(_ZWNJ, " ")]
+    parts += [word.replace(_ZWNJ, "") for word in _ZWNJ_WORDS.findall(value)]
+    return " ".join(parts)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS application_search "
+            "USING fts5(document, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        insert = sa.text("INSERT INTO application_search (rowid, document) VALUES (:id, :document)")
+    elif bind.dialect.name == 'postgresql':
+        op.execute(
+            "CREATE TABLE IF NOT EXISTS application_search ("
+            "application_id INTEGER PRIMARY KEY REFERENCES applications(id) ON DELETE CASCADE, "
+            "document TEXT NOT NULL, "
+            "tsv tsvector GENERATED ALWAYS AS (to_tsvector('simple', document)) STORED)"
+        )
+        op.execute("CREATE INDEX IF NOT EXISTS ix_application_search_tsv ON application_search USING GIN (tsv)")
+        insert = sa.text("INSERT INTO application_search (application_id, document) VALUES (:id, :document)")
+    else:
+        return
+
+    rows = [
+        {"id": row.id, "document": build_document(
+            row.product_name, row.company_name, row.description,
+            row.application_number, row.full_name, row.company
+        )}
+        for row in bind.execute(sa.text(
+            "SELECT applications.id, applications.product_name, applications.company_name, "
+            "applications.description, applications.application_number, users.full_name, users.company "
+            "FROM applications LEFT OUTER JOIN users ON applications.applicant_id = users.id"
+        ))
+    ]
+    if rows:
+        bind.execute(insert, rows)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name in ('sqlite', 'postgresql'):
+        op.execute("DROP TABLE IF EXISTS application_search")
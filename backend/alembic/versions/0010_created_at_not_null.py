@@ -0,0 +1,53 @@
+"""applications and evaluations created_at not null
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 12:30:00.000000
+
+created_at is the keyset paging key of the list endpoints: a NULL there
+cannot be put in a cursor and never compares below one, so such rows
+were unreachable past the first page. Rows written without it get the
+closest timestamp they have before the column becomes NOT NULL.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+applications = sa.table(
+    'applications', sa.column('created_at', sa.DateTime()), sa.column('submission_date', sa.DateTime()),
+    sa.column('updated_at', sa.DateTime())
+)
+evaluations = sa.table(
+    'evaluations', sa.column('created_at', sa.DateTime()), sa.column('start_date', sa.DateTime()),
+    sa.column('updated_at', sa.DateTime())
+)
+
+
+def upgrade() -> None:
+    for table, *fallbacks in (
+        (applications, applications.c.submission_date, applications.c.updated_at),
+        (evaluations, evaluations.c.start_date, evaluations.c.updated_at),
+    ):
+        op.execute(table.update().where(table.c.created_at.is_(None)).values(
+            created_at=sa.func.coalesce(*fallbacks, sa.func.current_timestamp())
+        ))
+    # batch mode, since SQLite can only change a column by rebuilding the table
+    with op.batch_alter_table('applications') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+    with op.batch_alter_table('evaluations') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('evaluations') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
+    with op.batch_alter_table('applications') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
@@ -1,15 +1,22 @@
+import math
+import time
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional
 import jwt
 from jwt.exceptions import InvalidTokenError
 from passlib.context import CryptContext
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, Request, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from .cache import TTLCache
 from .config import settings
-from ..database import get_db
-from ..models import User
+from .hashing import hashing_pool, HashingPoolSaturated
+from .stickiness import wrote_recently
+from ..database import get_db, get_read_sessionmaker
+from ..models import RefreshToken, User
 from ..schemas import TokenData
 
 # Password hashing
@@ -18,6 +25,17 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # JWT Security
 security = HTTPBearer()
 
+# Authenticated users keyed by token subject (email). Entries are detached
+# from any session so they can be shared between requests; routes that change
+# a user must call invalidate_principal() after committing. That only reaches
+# this worker: on the others a role change, deactivation or token revocation
+# applies within PRINCIPAL_CACHE_TTL_SECONDS. A token newer than the cached
+# entry always forces a reload.
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
     return pwd_context.verify(plain_password, hashed_password)
@@ -26,6 +44,58 @@ def get_password_hash(password: str) -> str:
     """Hash a password."""
     return pwd_context.hash(password)
 
+def calibrate_password_hashing(target_ms: int = None) -> int:
+    """Pick the bcrypt cost whose hash time is closest to target_ms.
+
+    Each extra round doubles the cost, so one timed hash at the minimum cost
+    is enough to extrapolate. Only new hashes use the chosen cost: hashes
+    below BCRYPT_MIN_ROUNDS are rehashed on their next successful login,
+    while ones at or above it are kept, so hosts of different speeds do
+    not keep rehashing each other's passwords.
+    """
+    if target_ms is None:
+        target_ms = settings.PASSWORD_HASH_TARGET_MS
+    if target_ms <= 0:
+        return pwd_context.handler("bcrypt").default_rounds
+
+    base_rounds = settings.BCRYPT_MIN_ROUNDS
+    handler = pwd_context.handler("bcrypt").using(rounds=base_rounds)
+    started = time.perf_counter()
+    handler.hash("calibration")
+    elapsed_ms = max((time.perf_counter() - started) * 1000, 0.001)
+
+    rounds = base_rounds + round(math.log2(target_ms / elapsed_ms))
+    rounds = min(max(rounds, settings.BCRYPT_MIN_ROUNDS), settings.BCRYPT_MAX_ROUNDS)
+    pwd_context.update(bcrypt__default_rounds=rounds, bcrypt__min_rounds=settings.BCRYPT_MIN_ROUNDS)
+    return rounds
+
+def _hashing_busy_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="سرور مشغول است، لطفاً دوباره تلاش کنید",
+        headers={"Retry-After": "1"},
+    )
+
+async def verify_password_async(plain_password: str, hashed_password: str):
+    """Verify a password in the hashing pool.
+
+    Returns (valid, new_hash) where new_hash is set when the stored hash
+    uses a deprecated scheme or cost and should be replaced.
+    """
+    try:
+        return await hashing_pool.run(
+            pwd_context.verify_and_update, plain_password, hashed_password
+        )
+    except HashingPoolSaturated:
+        raise _hashing_busy_exception()
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the hashing pool."""
+    try:
+        return await hashing_pool.run(pwd_context.hash, password)
+    except HashingPoolSaturated:
+        raise _hashing_busy_exception()
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token."""
     to_encode = data.copy()
@@ -38,28 +108,134 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def create_refresh_token(db: AsyncSession, user: User) -> str:
+    """Create a single-use JWT refresh token and record it. The caller commits."""
+    now = datetime.utcnow()
+    expires_at = now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    jti = uuid.uuid4().hex
+    db.add(RefreshToken(jti=jti, user_id=user.id, issued_at=now, expires_at=expires_at))
+    to_encode = {
+        "sub": user.email,
+        "type": "refresh",
+        "jti": jti,
+        "ver": user.token_version,
+        "iat": now,
+        "exp": expires_at,
+    }
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+async def create_token_pair(db: AsyncSession, user: User) -> dict:
+    """Create a new access token and refresh token for a user. The caller commits."""
+    # Tokens of this user that can no longer be used
+    await db.execute(
+        delete(RefreshToken)
+        .where(RefreshToken.user_id == user.id, RefreshToken.expires_at < datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    access_token = create_access_token(
+        data={"sub": user.email, "ver": user.token_version},
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    return {
+        "access_token": access_token,
+        "refresh_token": create_refresh_token(db, user),
+        "token_type": "bearer",
+    }
+
+async def revoke_user_tokens(db: AsyncSession, user_id: int) -> None:
+    """Invalidate every token issued to a user so far. The caller commits."""
+    await db.execute(
+        update(User).where(User.id == user_id)
+        .values(token_version=User.token_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+async def rotate_refresh_token(db: AsyncSession, refresh_token: str) -> dict:
+    """Exchange a refresh token for a new token pair.
+
+    The user is reloaded, so deactivated or deleted accounts and tokens
+    older than the user's token_version are refused on every worker. Each
+    token is marked used in the database by a conditional update; presenting
+    one that was already used revokes every token of that user, since it
+    means the token has leaked.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="توکن تمدید نامعتبر است",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = jwt.decode(refresh_token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except InvalidTokenError:
+        raise credentials_exception
+    
+    email = payload.get("sub")
+    jti = payload.get("jti")
+    if payload.get("type") != "refresh" or not email or not jti:
+        raise credentials_exception
+    
+    user = await db.scalar(select(User).where(User.email == email))
+    if user is None or not user.is_active or payload.get("ver") != user.token_version:
+        raise credentials_exception
+    
+    consumed = await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.jti == jti, RefreshToken.user_id == user.id, RefreshToken.used_at.is_(None))
+        .values(used_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    if consumed.rowcount == 0:
+        await revoke_user_tokens(db, user.id)
+        await db.commit()
+        invalidate_principal(email)
+        raise credentials_exception
+    
+    tokens = await create_token_pair(db, user)
+    await db.commit()
+    return tokens
+
+async def revoke_refresh_token(db: AsyncSession, refresh_token: str) -> None:
+    """Revoke a refresh token, ignoring tokens that are already invalid."""
+    try:
+        payload = jwt.decode(refresh_token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except InvalidTokenError:
+        return
+    if payload.get("type") == "refresh" and payload.get("jti"):
+        await db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.jti == payload["jti"], RefreshToken.used_at.is_(None))
+            .values(used_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
 def verify_token(token: str, credentials_exception):
     """Verify JWT token."""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         email: str = payload.get("sub")
-        if email is None:
+        if email is None or payload.get("type") == "refresh":
             raise credentials_exception
-        token_data = TokenData(email=email)
+        token_data = TokenData(email=email, token_version=payload.get("ver", 0))
     except InvalidTokenError:
         raise credentials_exception
     return token_data
 
-def authenticate_user(db: Session, email: str, password: str):
+async def authenticate_user(db: AsyncSession, email: str, password: str):
     """Authenticate user with email and password."""
-    user = db.query(User).filter(User.email == email).first()
+    user = await db.scalar(select(User).where(User.email == email))
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = await verify_password_async(password, user.hashed_password)
+    if not valid:
         return False
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+        invalidate_principal(user.email)
     return user
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_db)):
     """Get current authenticated user."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -69,11 +245,35 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     
     token = credentials.credentials
     token_data = verify_token(token, credentials_exception)
-    user = db.query(User).filter(User.email == token_data.email).first()
-    if user is None:
+    db.info["subject"] = token_data.email
+    user = principal_cache.get(token_data.email)
+    if user is None or user.token_version < token_data.token_version:
+        # Missing, or older than the token: revoked on another worker meanwhile
+        user = await db.scalar(select(User).where(User.email == token_data.email))
+        if user is None:
+            raise credentials_exception
+        db.expunge(user)
+        principal_cache.set(token_data.email, user)
+    if token_data.token_version != user.token_version:
         raise credentials_exception
     return user
 
+def invalidate_principal(email: str) -> None:
+    """Drop a cached user so the next request reloads it from the database."""
+    principal_cache.invalidate(email)
+
+async def get_read_db(request: Request, current_user: User = Depends(get_current_user)):
+    """Database session for read-only routes.
+
+    Reads go to a replica when any are configured, except for users who
+    wrote recently, who stay on the primary so they see their own changes.
+    A write on another worker is known from the read-primary token the
+    client sends back (see app.core.stickiness).
+    """
+    session_factory = get_read_sessionmaker(current_user.email, wrote_recently(request, current_user.email))
+    async with session_factory() as db:
+        yield db
+
 def get_current_active_user(current_user: User = Depends(get_current_user)):
     """Get current active user."""
     if not current_user.is_active:
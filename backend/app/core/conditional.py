@@ -0,0 +1,100 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+# Responses depend on the caller; browsers may keep them but must revalidate
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag over the values that identify one version of a response.
+
+    Pass whatever changes when the payload does: row ids, ``updated_at``
+    of every serialized row, or a list's row count and latest update.
+    """
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def latest(*timestamps: Optional[datetime]) -> Optional[datetime]:
+    """Most recent of the given timestamps, ignoring missing ones."""
+    present = [timestamp for timestamp in timestamps if timestamp is not None]
+    return max(present) if present else None
+
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Whether the client's cached copy is still current.
+
+    If-None-Match wins over If-Modified-Since, and uses the weak
+    comparison GET requires.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [_opaque_tag(tag) for tag in if_none_match.split(",")]
+        return "*" in tags or _opaque_tag(etag) in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        since = _http_date(if_modified_since)
+        # Last-Modified only carries whole seconds
+        return since is not None and _whole_seconds(last_modified) <= since
+    return False
+
+
+def if_range_matches(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Whether a Range request may be served as ranges under its If-Range, if any.
+
+    If-Range needs a strong match: an ETag must be identical and strong, a
+    date must equal Last-Modified exactly.
+    """
+    if_range = request.headers.get("if-range")
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith(('"', "W/")):
+        return if_range == etag and not etag.startswith("W/")
+    since = _http_date(if_range)
+    return since is not None and last_modified is not None and _whole_seconds(last_modified) == since
+
+
+def _http_date(value: str) -> Optional[datetime]:
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _whole_seconds(timestamp: datetime) -> datetime:
+    # Naive UTC, as stored, to the precision of an HTTP date
+    return timestamp.replace(microsecond=0, tzinfo=timezone.utc)
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified:
+        # updated_at columns hold naive UTC
+        headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    return headers
+
+
+def check_not_modified(request: Request, response: Response, etag: str,
+                       last_modified: Optional[datetime]) -> Optional[Response]:
+    """Return a 304 response if the client's copy is current.
+
+    Otherwise put the validators on ``response`` and return None, so the
+    caller goes on to load and serialize the payload.
+    """
+    headers = validator_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,81 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from .config import settings
+
+
+class HashingPoolSaturated(Exception):
+    """Raised when too many password hashes are already waiting to run."""
+
+
+class HashingPool:
+    """Bounded thread pool for CPU-heavy password hashing.
+
+    bcrypt releases the GIL, so running it in worker threads keeps the event
+    loop free while a fixed number of hashes run in parallel. Calls beyond
+    ``max_workers + max_queue`` are rejected instead of piling up.
+
+    Counters are only touched from the event loop thread.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hash"
+        )
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    async def run(self, func: Callable, *args: Any) -> Any:
+        """Run func(*args) in the pool and wait for its result."""
+        if self.pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HashingPoolSaturated()
+
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        submitted = time.perf_counter()
+
+        def timed_call():
+            started = time.perf_counter()
+            return func(*args), started, time.perf_counter()
+
+        try:
+            loop = asyncio.get_running_loop()
+            result, started, finished = await loop.run_in_executor(
+                self._executor, timed_call
+            )
+        finally:
+            self.pending -= 1
+        self.completed += 1
+        self.total_wait_seconds += started - submitted
+        self.total_run_seconds += finished - started
+        return result
+
+    def stats(self) -> dict:
+        """Return concurrency and queue-depth metrics."""
+        completed = self.completed or 1
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "running": min(self.pending, self.max_workers),
+            "queued": max(0, self.pending - self.max_workers),
+            "peak_pending": self.peak_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait_seconds / completed * 1000, 2),
+            "avg_run_ms": round(self.total_run_seconds / completed * 1000, 2),
+        }
+
+
+hashing_pool = HashingPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
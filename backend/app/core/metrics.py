@@ -0,0 +1,39 @@
+import bisect
+import threading
+from typing import Sequence
+
+# Upper bounds in milliseconds; the last bucket collects everything above
+DEFAULT_LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    """Cumulative latency histogram with fixed millisecond buckets."""
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_LATENCY_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self._counts = [0] * (len(self.buckets_ms) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Record one measurement given in seconds."""
+        ms = seconds * 1000
+        index = bisect.bisect_left(self.buckets_ms, ms)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+
+    def snapshot(self) -> dict:
+        """Return bucket counts keyed by their upper bound plus summary values."""
+        with self._lock:
+            labels = [f"le_{bound}ms" for bound in self.buckets_ms] + ["inf"]
+            return {
+                "count": self.count,
+                "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+                "max_ms": round(self.max_ms, 3),
+                "buckets": dict(zip(labels, self._counts)),
+            }
@@ -0,0 +1,126 @@
+"""Streaming reader for single-file multipart uploads.
+
+Starlette's form parser spools every file of a request to a temporary file
+before the route runs, so a size limit checked afterwards only applies once
+the whole body has been received, and the route then copies the file a
+second time. MultipartFileStream instead parses the body as it arrives and
+hands the file's bytes to the caller, who writes them where they belong.
+"""
+from collections import deque
+from typing import AsyncIterator, Deque, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+from multipart.multipart import MultipartParser, parse_options_header
+
+# Room for the boundaries and part headers around the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+def invalid_form(detail: str = "درخواست چندبخشی نامعتبر است") -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+class MultipartFileStream:
+    """The file field of a multipart/form-data request, read incrementally.
+
+    ``await open()`` reads up to the start of the file's data and sets
+    ``filename`` and ``content_type``; ``chunks()`` then yields the data as
+    it comes off the socket. Other fields are skipped.
+    """
+
+    def __init__(self, request: Request, field_name: str = "file"):
+        self.request = request
+        self.field_name = field_name
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self._stream = request.stream()
+        self._parser: Optional[MultipartParser] = None
+        self._events: Deque[Tuple[str, object]] = deque()
+        self._header_name = b""
+        self._header_value = b""
+        self._headers = {}
+        self._finished = False
+
+    def too_large(self, max_size: int) -> bool:
+        """Whether the declared Content-Length rules out a file of at most max_size bytes."""
+        content_length = self.request.headers.get("content-length", "")
+        return content_length.isdigit() and int(content_length) > max_size + MULTIPART_OVERHEAD
+
+    # Parser callbacks only queue events; the async methods act on them.
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_name.lower()] = self._header_value
+        self._header_name = self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        self._events.append(("headers", self._headers))
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        self._events.append(("data", data[start:end]))
+
+    def _on_part_end(self) -> None:
+        self._events.append(("end", None))
+
+    def _create_parser(self) -> MultipartParser:
+        content_type, params = parse_options_header(self.request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise invalid_form()
+        return MultipartParser(params[b"boundary"], {
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+        })
+
+    async def _next_event(self) -> Optional[Tuple[str, object]]:
+        while not self._events:
+            if self._finished:
+                return None
+            try:
+                chunk = await self._stream.__anext__()
+            except StopAsyncIteration:
+                self._finished = True
+                self._parser.finalize()
+                continue
+            try:
+                self._parser.write(chunk)
+            except Exception:
+                raise invalid_form()
+        return self._events.popleft()
+
+    async def open(self) -> None:
+        """Read until the file's data starts; 400 if the request has no such file."""
+        self._parser = self._create_parser()
+        while (event := await self._next_event()) is not None:
+            kind, value = event
+            if kind != "headers":
+                continue
+            _, options = parse_options_header(value.get(b"content-disposition", b""))
+            name = options.get(b"name", b"").decode("utf-8", "replace")
+            if name == self.field_name and b"filename" in options:
+                self.filename = options[b"filename"].decode("utf-8", "replace")
+                self.content_type = value.get(b"content-type", b"").decode("latin-1") or None
+                return
+        raise invalid_form("فایلی ارسال نشده است")
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        """Yield the file's data up to the end of its part."""
+        while (event := await self._next_event()) is not None:
+            kind, value = event
+            if kind == "end":
+                return
+            if kind == "data" and value:
+                yield value
+        raise invalid_form()
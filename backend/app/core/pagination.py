@@ -0,0 +1,69 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Callable, Hashable, List, Optional, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .cache import TTLCache
+from .config import settings
+
+# List bodies stay plain JSON arrays; paging metadata travels in headers
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+# Totals are only computed on request and reused for a short while
+count_cache = TTLCache(maxsize=1024, ttl=settings.PAGE_COUNT_CACHE_TTL_SECONDS)
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Pack the sort key of the last row on a page into an opaque token."""
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Unpack a token made by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="مکان‌نمای صفحه نامعتبر است"
+        )
+
+
+def keyset_page(query: Select, created_at_column, id_column, cursor: Optional[str], limit: int) -> Select:
+    """Order newest first on (created_at, id) and start right after cursor.
+
+    One extra row is fetched so set_next_cursor can tell whether another
+    page follows.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.where(tuple_(created_at_column, id_column) < tuple_(created_at, row_id))
+    return query.order_by(created_at_column.desc(), id_column.desc()).limit(limit + 1)
+
+
+def set_next_cursor(response: Response, rows: List, limit: int,
+                    sort_key: Callable = lambda row: (row.created_at, row.id)) -> List:
+    """Drop the look-ahead row and advertise the cursor of the next page."""
+    if len(rows) <= limit:
+        return rows
+    rows = rows[:limit]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*sort_key(rows[-1]))
+    return rows
+
+
+async def set_total_count(response: Response, db: AsyncSession, key: Hashable, query: Select) -> None:
+    """Put the cached row count of an unpaginated query in X-Total-Count."""
+    total = count_cache.get(key)
+    if total is None:
+        total = await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+        count_cache.set(key, total)
+    response.headers[TOTAL_COUNT_HEADER] = str(total)
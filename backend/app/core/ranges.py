@@ -0,0 +1,158 @@
+import os
+import uuid
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import anyio
+from fastapi import Request, Response, status
+from starlette.responses import FileResponse
+
+from .conditional import if_range_matches, is_not_modified, validator_headers
+from .config import settings
+
+# More ranges than this (after merging) are answered with the whole file
+MAX_RANGES = 16
+
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+
+def file_etag(sha256: Optional[str], stat_result: os.stat_result) -> str:
+    """Strong ETag for a stored file: its content digest when known, else size and mtime."""
+    if sha256:
+        return f'"{sha256}"'
+    return f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+
+def parse_range_header(header: str, size: int) -> Optional[List[Tuple[int, int]]]:
+    """Byte ranges (inclusive) requested by a Range header, merged and in order.
+
+    Returns None when the header should be ignored (not bytes, malformed or
+    too many ranges), and an empty list when no range overlaps the file.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes":
+        return None
+
+    ranges = []
+    for part in spec.split(","):
+        first, sep, last = (value.strip() for value in part.partition("-"))
+        if not sep or (first and not first.isdigit()) or (last and not last.isdigit()) or not (first or last):
+            return None
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length and size:
+                ranges.append((max(size - length, 0), size - 1))
+            continue
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        if start < size:
+            ranges.append((start, min(int(last), size - 1) if last else size - 1))
+
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    if len(merged) > MAX_RANGES:
+        return None
+    return merged
+
+
+class RangeFileResponse(FileResponse):
+    """FileResponse for the whole file (200), one range (206) or several (206 multipart/byteranges).
+
+    Where the server offers the ASGI ``http.response.zerocopysend``
+    extension the file is handed over by descriptor and offset, so the
+    kernel copies it to the socket (sendfile). Otherwise it is read in
+    DOWNLOAD_CHUNK_SIZE pieces.
+    """
+
+    def __init__(self, path, stat_result: os.stat_result,
+                 ranges: Optional[List[Tuple[int, int]]] = None, **kwargs):
+        super().__init__(path, stat_result=stat_result, **kwargs)
+        self.chunk_size = settings.DOWNLOAD_CHUNK_SIZE
+        self.headers["accept-ranges"] = "bytes"
+        size = stat_result.st_size
+        # (bytes sent first, offset, count) for every piece of the file in the body
+        self.segments = [(b"", 0, size)]
+        self.epilogue = b""
+
+        if ranges and len(ranges) == 1:
+            start, end = ranges[0]
+            self.status_code = status.HTTP_206_PARTIAL_CONTENT
+            self.segments = [(b"", start, end - start + 1)]
+            self.headers["content-range"] = f"bytes {start}-{end}/{size}"
+            self.headers["content-length"] = str(end - start + 1)
+        elif ranges:
+            boundary = uuid.uuid4().hex
+            self.status_code = status.HTTP_206_PARTIAL_CONTENT
+            self.segments = [
+                (
+                    (b"\r\n" if index else b"")
+                    + f"--{boundary}\r\nContent-Type: {self.media_type}\r\n"
+                      f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n".encode("latin-1"),
+                    start,
+                    end - start + 1,
+                )
+                for index, (start, end) in enumerate(ranges)
+            ]
+            self.epilogue = f"\r\n--{boundary}--\r\n".encode("latin-1")
+            self.headers["content-type"] = f"multipart/byteranges; boundary={boundary}"
+            self.headers["content-length"] = str(
+                sum(len(prefix) + count for prefix, _, count in self.segments) + len(self.epilogue)
+            )
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if not self.send_header_only:
+            zerocopy = ZEROCOPY_EXTENSION in scope.get("extensions", {})
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                for prefix, offset, count in self.segments:
+                    if prefix:
+                        await send({"type": "http.response.body", "body": prefix, "more_body": True})
+                    if zerocopy:
+                        await send({
+                            "type": ZEROCOPY_EXTENSION, "file": file.wrapped,
+                            "offset": offset, "count": count, "more_body": True
+                        })
+                        continue
+                    await file.seek(offset)
+                    while count > 0:
+                        chunk = await file.read(min(self.chunk_size, count))
+                        if not chunk:
+                            break
+                        count -= len(chunk)
+                        await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": self.epilogue, "more_body": False})
+        if self.background is not None:
+            await self.background()
+
+
+def serve_file(request: Request, path, stat_result: os.stat_result, etag: str,
+               filename: Optional[str] = None, media_type: Optional[str] = None) -> Response:
+    """Answer a download with 304, 416, 206 or 200 as its conditional and Range headers ask.
+
+    Range is honoured only when If-Range (if sent) still matches, so a
+    resumed download never splices two versions of a file.
+    """
+    last_modified = datetime.utcfromtimestamp(stat_result.st_mtime)
+    headers = validator_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    ranges = None
+    range_header = request.headers.get("range")
+    if range_header is not None and if_range_matches(request, etag, last_modified):
+        ranges = parse_range_header(range_header, stat_result.st_size)
+        if ranges == []:
+            return Response(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={**headers, "Content-Range": f"bytes */{stat_result.st_size}"}
+            )
+    return RangeFileResponse(
+        path, stat_result, ranges, headers=headers, filename=filename,
+        media_type=media_type, method=request.method
+    )
@@ -0,0 +1,37 @@
+from typing import Any, Iterable, List, Optional, Type
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.engine import Row
+
+
+class ListSerializer:
+    """Turns query rows into a JSON list response in one pydantic-core pass.
+
+    Rows (SQLAlchemy Row or ORM objects) are validated against the item
+    schema straight from their attributes and dumped to JSON bytes without
+    leaving Rust. The endpoint returns the Response itself, so FastAPI
+    skips its own response_model validation and encoding; keep
+    ``response_model`` on the route for the OpenAPI schema.
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, item_type: Type[BaseModel]):
+        self.adapter = TypeAdapter(List[item_type])
+
+    def dump_json(self, rows: Iterable[Any]) -> bytes:
+        rows = list(rows)
+        if rows and isinstance(rows[0], Row):
+            # Reading Row attributes by name from pydantic-core costs more
+            # than the rest of the pass; plain dicts are cheap to validate
+            keys = rows[0]._fields
+            items = self.adapter.validate_python([dict(zip(keys, row)) for row in rows])
+        else:
+            items = self.adapter.validate_python(rows, from_attributes=True)
+        return self.adapter.dump_json(items)
+
+    def response(self, rows: Iterable[Any], response: Optional[Response] = None) -> Response:
+        """JSON response for rows, keeping headers already set on ``response``."""
+        headers = dict(response.headers) if response is not None else None
+        return Response(content=self.dump_json(rows), media_type=self.media_type, headers=headers)
@@ -0,0 +1,91 @@
+"""Read-your-writes across workers when reads go to replicas.
+
+A request whose commit wrote something gets a signed "read from the
+primary until" token back, both as a cookie and in the X-Read-Primary
+header. Clients return either one; get_read_db then keeps that user on
+the primary until the token expires, whichever worker serves the read.
+The token is bound to the user, so it cannot be replayed for another.
+"""
+import hashlib
+import hmac
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+
+READ_PRIMARY_COOKIE = "read_primary"
+READ_PRIMARY_HEADER = "X-Read-Primary"
+
+# Set per request by ReadPrimaryMiddleware; record_write fills in the writer
+request_writes_var: ContextVar[Optional[Dict[str, str]]] = ContextVar("request_writes", default=None)
+
+
+def _signature(subject: str, expires: int) -> str:
+    message = f"{subject}|{expires}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()[:32]
+
+
+def issue_token(subject: str) -> str:
+    expires = int(time.time()) + settings.REPLICA_STICKINESS_SECONDS
+    return f"{expires}.{_signature(subject, expires)}"
+
+
+def token_is_current(token: Optional[str], subject: str) -> bool:
+    """Whether token was issued to subject and has not expired."""
+    expires, _, signature = (token or "").partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _signature(subject, int(expires)))
+
+
+def record_write(subject: str) -> None:
+    """Note that the current request committed a write on behalf of subject."""
+    writes = request_writes_var.get()
+    if writes is not None:
+        writes["subject"] = subject
+
+
+def wrote_recently(connection: HTTPConnection, subject: str) -> bool:
+    """Whether the caller sent back a current token from one of its writes."""
+    token = connection.headers.get(READ_PRIMARY_HEADER) or connection.cookies.get(READ_PRIMARY_COOKIE)
+    return token_is_current(token, subject)
+
+
+class ReadPrimaryMiddleware:
+    """Attach a read-primary token to responses of requests that wrote.
+
+    Routes commit before their response starts, so the writer is known by
+    the time the headers go out.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        writes: Dict[str, str] = {}
+
+        async def send_with_token(message: Message) -> None:
+            if message["type"] == "http.response.start" and "subject" in writes:
+                token = issue_token(writes["subject"])
+                headers = MutableHeaders(scope=message)
+                headers[READ_PRIMARY_HEADER] = token
+                headers.append("Set-Cookie", (
+                    f"{READ_PRIMARY_COOKIE}={token}; Max-Age={settings.REPLICA_STICKINESS_SECONDS}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                ))
+            await send(message)
+
+        token = request_writes_var.set(writes)
+        try:
+            await self.app(scope, receive, send_with_token)
+        finally:
+            request_writes_var.reset(token)
@@ -1,16 +1,192 @@
-from sqlalchemy import create_engine
+import asyncio
+import itertools
+import time
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from .core.cache import TTLCache
 from .core.config import settings
+from .core.metrics import LatencyHistogram
+from .core.stickiness import record_write
+
+def get_async_database_url(url: str) -> str:
+    """Return the asyncio driver variant of a database URL."""
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    if url.startswith("postgresql://") or url.startswith("postgresql+psycopg2://"):
+        return "postgresql+psycopg://" + url.split("://", 1)[1]
+    return url
+
+def get_engine_options(url: str) -> dict:
+    """Return connection pool options from settings.
+
+    In-memory SQLite databases live in a single connection, so only
+    pre-ping applies to them.
+    """
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":")):
+        return options
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    return options
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply the tuned SQLite profile to a freshly opened connection."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE)}")
+    # A negative cache_size is read as KiB rather than pages
+    cursor.execute(f"PRAGMA cache_size = -{int(settings.SQLITE_CACHE_SIZE_KB)}")
+    cursor.close()
+
+def configure_sqlite(sync_engine) -> None:
+    """Register set_sqlite_pragmas on every pool connect of a SQLite engine."""
+    if sync_engine.dialect.name == "sqlite":
+        event.listen(sync_engine, "connect", set_sqlite_pragmas)
+
+class PoolMetrics:
+    """Checkout latency and timeout counters for the API connection pool."""
+
+    def __init__(self):
+        self.checkout_latency = LatencyHistogram()
+        self.timeouts = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "checkout_latency": self.checkout_latency.snapshot(),
+            "timeouts": self.timeouts,
+        }
+
+pool_metrics = PoolMetrics()
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+        finally:
+            pool_metrics.checkout_latency.observe(time.perf_counter() - started)
+
+def get_pool_status() -> dict:
+    """Return saturation figures for the API connection pool."""
+    pool = async_engine.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        capacity = pool.size() + settings.DB_MAX_OVERFLOW
+        checked_out = pool.checkedout()
+        status.update(
+            size=pool.size(),
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            checked_out=checked_out,
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            utilization=round(checked_out / capacity, 4) if capacity else 0.0,
+            timeout_seconds=settings.DB_POOL_TIMEOUT,
+        )
+    status.update(pool_metrics.snapshot())
+    status["replicas"] = [
+        {"checked_out": replica.pool.checkedout()} for replica in replica_engines
+    ]
+    return status
 
-engine = create_engine(settings.DATABASE_URL)
+# Synchronous engine for scripts, migrations and schema creation
+engine = create_engine(settings.DATABASE_URL, **get_engine_options(settings.DATABASE_URL))
+configure_sqlite(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine used by the API so database I/O never blocks the event loop.
+# Objects stay readable after commit; relationships must be eager loaded.
+async_database_url = get_async_database_url(settings.DATABASE_URL)
+async_engine_options = get_engine_options(async_database_url)
+if "pool_size" in async_engine_options:
+    async_engine_options["poolclass"] = InstrumentedAsyncQueuePool
+async_engine = create_async_engine(async_database_url, **async_engine_options)
+configure_sqlite(async_engine.sync_engine)
+
+class PrimarySession(Session):
+    """Session bound to the primary database.
+
+    Commits that wrote anything mark the session's subject (set by
+    get_current_user) as a recent writer so their reads skip the replicas:
+    in this worker's recent_writers, and through the read-primary token the
+    response carries back to the client for every other worker.
+    """
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, sync_session_class=PrimarySession,
+    autoflush=False, expire_on_commit=False
+)
+
+# Optional read replicas, used only by routes that depend on get_read_db
+replica_engines = [
+    create_async_engine(get_async_database_url(url), **get_engine_options(get_async_database_url(url)))
+    for url in settings.DATABASE_REPLICA_URLS
+]
+for replica in replica_engines:
+    configure_sqlite(replica.sync_engine)
+ReplicaSessionLocals = [
+    async_sessionmaker(replica, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    for replica in replica_engines
+]
+_replica_cycle = itertools.cycle(ReplicaSessionLocals) if ReplicaSessionLocals else None
+
+# Subjects whose own writes may not have reached the replicas yet, as seen
+# by this worker; other workers learn of them from the client's token
+recent_writers = TTLCache(maxsize=10000, ttl=settings.REPLICA_STICKINESS_SECONDS)
+
+@event.listens_for(PrimarySession, "after_flush")
+def _mark_session_wrote(session, flush_context):
+    session.info["wrote"] = True
+
+@event.listens_for(PrimarySession, "after_commit")
+def _remember_writer(session):
+    subject = session.info.get("subject")
+    if session.info.pop("wrote", False) and subject:
+        recent_writers.set(subject, True)
+        record_write(subject)
+
+def get_read_sessionmaker(subject: str = None, wrote_recently: bool = False) -> async_sessionmaker:
+    """Pick the next replica, or the primary for recent writers."""
+    if _replica_cycle is None or wrote_recently or (subject and recent_writers.get(subject)):
+        return AsyncSessionLocal
+    return next(_replica_cycle)
+
+async def warm_up_pools(connections: int = None) -> None:
+    """Open connections on every async engine before the first request needs them."""
+    connections = settings.DB_POOL_WARMUP_CONNECTIONS if connections is None else connections
+
+    async def ping(db_engine):
+        async with db_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(
+        ping(db_engine)
+        for db_engine in [async_engine, *replica_engines]
+        for _ in range(connections)
+    ))
+
+async def dispose_engines() -> None:
+    """Close all pooled connections, e.g. on worker shutdown."""
+    for db_engine in [async_engine, *replica_engines]:
+        await db_engine.dispose()
+
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close() 
\ No newline at end of file
@@ -1,23 +1,49 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Depends, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.security import HTTPBearer
-import uvicorn
 from pathlib import Path
+from sqlalchemy import text
 
-from .routers import auth, users, applications, evaluations, documents, reports, admin, security_targets
-from .database import engine, Base
+from .routers import auth, users, applications, evaluations, documents, reports, admin, exports, security_targets
+from .database import AsyncSessionLocal, get_pool_status, warm_up_pools, dispose_engines
 from .core.config import settings
+from .core.auth import calibrate_password_hashing, require_role
+from .core.log import RequestIdMiddleware, configure_logging, shutdown_logging
+from .core.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
+from .core.stickiness import READ_PRIMARY_HEADER, ReadPrimaryMiddleware
+from .models import UserRole
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Prepare the worker before it takes traffic.
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+    The schema is managed by Alembic (or init_db.py), never at import time.
+    """
+    app.state.ready = False
+    configure_logging()
+    Path(settings.UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
+    calibrate_password_hashing()
+    await warm_up_pools()
+    async with AsyncSessionLocal() as db:
+        await users.load_active_product_types(db)
+    app.state.ready = True
+    yield
+    app.state.ready = False
+    await dispose_engines()
+    shutdown_logging()
 
 app = FastAPI(
     title="ITRC Common Criteria Evaluation Platform",
     description="سامانه ارزیابی معیارهای مشترک مرکز تحقیقات فناوری اطلاعات",
     version="1.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware configuration
@@ -27,10 +53,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, "X-Request-ID", "ETag", "Last-Modified",
+        "Accept-Ranges", "Content-Range", READ_PRIMARY_HEADER
+    ],
 )
 
-# Static files for uploaded documents
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+app.add_middleware(ReadPrimaryMiddleware)
+app.add_middleware(RequestIdMiddleware)
+
+# Static files for uploaded documents; the directory is created in lifespan
+app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR, check_dir=False), name="uploads")
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
@@ -40,6 +73,7 @@ app.include_router(evaluations.router, prefix="/api/evaluations", tags=["Evaluat
 app.include_router(documents.router, prefix="/api/documents", tags=["Documents"])
 app.include_router(reports.router, prefix="/api/reports", tags=["Reports"])
 app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
+app.include_router(exports.router, prefix="/api/admin/export", tags=["Admin"])
 app.include_router(security_targets.router, prefix="/api/security-targets", tags=["Security Targets"])
 
 @app.get("/")
@@ -54,5 +88,29 @@ async def root():
 async def health_check():
     return {"status": "healthy", "message": "سامانه در حال اجرا است"}
 
+@app.get("/health/ready")
+async def readiness_check(request: Request):
+    """Report whether this worker has finished startup and can reach the database."""
+    if not getattr(request.app.state, "ready", False):
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "starting", "message": "سامانه در حال راه‌اندازی است"}
+        )
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(text("SELECT 1"))
+    except Exception:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "unavailable", "message": "پایگاه داده در دسترس نیست"}
+        )
+    return {"status": "ready", "message": "سامانه آماده پاسخ‌گویی است"}
+
+@app.get("/health/pool")
+async def pool_status(current_user = Depends(require_role([UserRole.ADMIN]))):
+    """Database connection pool statistics (Admin only)."""
+    return get_pool_status()
+
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, Enum, Float, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, Enum, Float, JSON, Index
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 import enum
@@ -49,6 +49,8 @@ class User(Base):
     company = Column(String, nullable=True)  # For applicants
     phone = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
+    # Bumped to invalidate every token issued so far (password change, deactivation, token reuse)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -56,6 +58,16 @@ class User(Base):
     applications = relationship("Application", back_populates="applicant")
     evaluations = relationship("Evaluation", back_populates="evaluator")
 
+class RefreshToken(Base):
+    """An issued refresh token; used_at is set when it is rotated or logged out."""
+    __tablename__ = "refresh_tokens"
+    
+    jti = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    issued_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    used_at = Column(DateTime, nullable=True)
+
 class ProductType(Base):
     __tablename__ = "product_types"
     
@@ -70,12 +82,19 @@ class ProductType(Base):
     required_documents = Column(JSON)  # List of required document types
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     applications = relationship("Application", back_populates="product_type")
 
 class Application(Base):
     __tablename__ = "applications"
+    __table_args__ = (
+        Index("ix_applications_status_submission_date", "status", "submission_date"),
+        Index("ix_applications_applicant_id_created_at", "applicant_id", "created_at"),
+        Index("ix_applications_submission_date", "submission_date"),
+        Index("ix_applications_created_at", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     application_number = Column(String, unique=True, index=True)  # Auto-generated
@@ -89,8 +108,9 @@ class Application(Base):
     estimated_completion_date = Column(DateTime, nullable=True)
     actual_completion_date = Column(DateTime, nullable=True)
     
-    # Additional info
-    description = Column(Text)
+    # Additional info. Long text columns are deferred: list queries skip them and
+    # detail queries load them with undefer_group("application_text").
+    description = deferred(Column(Text), group="application_text")
     evaluation_level = Column(String, default="EAL1")
     company_name = Column(String, nullable=True)
     contact_person = Column(String, nullable=True)
@@ -98,12 +118,12 @@ class Application(Base):
     contact_phone = Column(String, nullable=True)
     
     # Legacy fields (keeping for compatibility)
-    product_description = Column(Text)
+    product_description = deferred(Column(Text), group="application_text")
     technical_contact = Column(String)
     business_contact = Column(String)
-    notes = Column(Text)
+    notes = deferred(Column(Text), group="application_text")
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # keyset paging key
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
@@ -114,6 +134,10 @@ class Application(Base):
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        # One current document per type; re-uploads bump the version
+        Index("ix_documents_application_id_document_type", "application_id", "document_type", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     application_id = Column(Integer, ForeignKey("applications.id"))
@@ -122,6 +146,7 @@ class Document(Base):
     original_filename = Column(String, nullable=False)
     file_path = Column(String, nullable=False)
     file_size = Column(Integer)  # in bytes
+    sha256 = Column(String(64), nullable=True)  # content digest of the current version
     mime_type = Column(String)
     version = Column(Integer, default=1)
     is_approved = Column(Boolean, default=False)
@@ -133,9 +158,63 @@ class Document(Base):
     # Relationships
     application = relationship("Application", back_populates="documents")
     uploader = relationship("User")
+    versions = relationship("DocumentVersion", back_populates="document", order_by="DocumentVersion.version")
+
+class Blob(Base):
+    """One stored file per distinct content; see app/storage.py."""
+    __tablename__ = "blobs"
+    
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)  # DocumentVersion rows using it
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class DocumentVersion(Base):
+    """Every upload of a document; superseded versions keep their blob reference."""
+    __tablename__ = "document_versions"
+    __table_args__ = (
+        Index("ix_document_versions_document_id_version", "document_id", "version", unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
+    version = Column(Integer, nullable=False)
+    sha256 = Column(String(64), ForeignKey("blobs.sha256"), nullable=True)  # null for pre-blob files
+    file_path = Column(String, nullable=False)
+    file_size = Column(Integer)
+    original_filename = Column(String, nullable=False)
+    mime_type = Column(String)
+    
+    uploaded_at = Column(DateTime, default=datetime.utcnow)
+    uploaded_by = Column(Integer, ForeignKey("users.id"))
+    
+    # Relationships
+    document = relationship("Document", back_populates="versions")
+
+class UploadSession(Base):
+    """A resumable upload in progress; its bytes live in blob_store.session_path(id)."""
+    __tablename__ = "upload_sessions"
+    
+    id = Column(String(32), primary_key=True)
+    application_id = Column(Integer, ForeignKey("applications.id"), nullable=False)
+    document_type = Column(Enum(DocumentType), nullable=False)
+    original_filename = Column(String, nullable=False)
+    mime_type = Column(String)
+    total_size = Column(Integer, nullable=False)
+    offset = Column(Integer, nullable=False, default=0)  # bytes received so far
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)  # pushed back by every chunk
 
 class Evaluation(Base):
     __tablename__ = "evaluations"
+    __table_args__ = (
+        Index("ix_evaluations_application_id", "application_id", unique=True),
+        Index("ix_evaluations_evaluator_id", "evaluator_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     application_id = Column(Integer, ForeignKey("applications.id"))
@@ -152,10 +231,10 @@ class Evaluation(Base):
     
     # Overall scores and findings
     overall_score = Column(Float, nullable=True)
-    findings = Column(Text)
-    recommendations = Column(Text)
+    findings = deferred(Column(Text), group="evaluation_text")
+    recommendations = deferred(Column(Text), group="evaluation_text")
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # keyset paging key
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
@@ -163,15 +242,39 @@ class Evaluation(Base):
     evaluator = relationship("User", back_populates="evaluations")
     reports = relationship("Report", back_populates="evaluation")
 
+class ApplicationNumberCounter(Base):
+    """Highest application number reserved so far in each year."""
+    __tablename__ = "application_number_counters"
+    
+    year = Column(Integer, primary_key=True, autoincrement=False)
+    last_value = Column(Integer, nullable=False, default=0)
+
+class StatusRollup(Base):
+    """Running counters kept in step with status transitions by app.rollups."""
+    __tablename__ = "status_rollups"
+    __table_args__ = (
+        Index("ix_status_rollups_key", "scope", "scope_key", "status", "product_type_id", unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    scope = Column(String, nullable=False)  # all, applicant, evaluator, day
+    scope_key = Column(String, nullable=False, default="")  # user id or ISO date; empty for "all"
+    status = Column(String, nullable=False)  # application or evaluation status value
+    product_type_id = Column(Integer, nullable=False, default=0)  # 0 when not tracked
+    count = Column(Integer, nullable=False, default=0)
+
 class Report(Base):
     __tablename__ = "reports"
+    __table_args__ = (
+        Index("ix_reports_evaluation_id_report_type", "evaluation_id", "report_type", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     evaluation_id = Column(Integer, ForeignKey("evaluations.id"))
     report_type = Column(Enum(ReportType), nullable=False)
     
     title = Column(String, nullable=False)
-    content = Column(Text)  # Can store HTML or markdown
+    content = deferred(Column(Text), group="report_text")  # Can store HTML or markdown
     template_version = Column(String, default="1.0")
     
     is_draft = Column(Boolean, default=True)
@@ -261,8 +364,8 @@ class EvaluationHelp(Base):
     id = Column(Integer, primary_key=True, index=True)
     product_class_id = Column(Integer, ForeignKey("product_classes.id"))
     product_subclass_id = Column(Integer, ForeignKey("product_subclasses.id"), nullable=True)
-    help_text_en = Column(Text, nullable=False)
-    help_text_fa = Column(Text, nullable=False)
+    help_text_en = deferred(Column(Text, nullable=False), group="help_text")
+    help_text_fa = deferred(Column(Text, nullable=False), group="help_text")
     evaluation_criteria = Column(JSON)  # Structured evaluation criteria
     examples = Column(JSON)  # Example implementations
     
@@ -295,6 +398,9 @@ class SecurityTarget(Base):
 
 class STClassSelection(Base):
     __tablename__ = "st_class_selections"
+    __table_args__ = (
+        Index("ix_st_class_selections_security_target_id", "security_target_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     security_target_id = Column(Integer, ForeignKey("security_targets.id"))
@@ -317,4 +423,10 @@ class STClassSelection(Base):
     # Relationships
     security_target = relationship("SecurityTarget", back_populates="class_selections")
     product_class = relationship("ProductClass")
-    product_subclass = relationship("ProductSubclass") 
\ No newline at end of file
+    product_subclass = relationship("ProductSubclass") 
+
+# Registers the flush hook that keeps StatusRollup up to date
+from . import rollups  # noqa: E402,F401
+
+# Registers the flush hook and DDL that keep the application search index current
+from . import search  # noqa: E402,F401
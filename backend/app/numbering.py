@@ -0,0 +1,85 @@
+import asyncio
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .core.config import settings
+from .database import async_engine
+from .models import ApplicationNumberCounter
+
+
+def format_application_number(year: int, value: int) -> str:
+    return f"ITRC-{year}-{value:06d}"
+
+
+class ApplicationNumberAllocator:
+    """Hands out application numbers from per-year counter rows.
+
+    Each trip to the database reserves ``block_size`` numbers with one
+    atomic upsert in its own short transaction, so workers never collide
+    and never wait on each other's request transactions. Numbers left in
+    a block when a worker exits, or used by an insert that rolls back,
+    are skipped: gaps are expected.
+    """
+
+    def __init__(self, engine: AsyncEngine, block_size: int):
+        self.engine = engine
+        self.block_size = max(1, block_size)
+        self._lock = asyncio.Lock()
+        self._year: Optional[int] = None
+        self._next = 1
+        self._last = 0
+
+    async def _reserve(self, year: int) -> int:
+        """Reserve the next block for year and return its highest number."""
+        table = ApplicationNumberCounter.__table__
+        async with self.engine.begin() as conn:
+            upsert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(conn.dialect.name)
+            if upsert is not None:
+                return (await conn.execute(
+                    upsert(table)
+                    .values(year=year, last_value=self.block_size)
+                    .on_conflict_do_update(
+                        index_elements=["year"],
+                        set_={"last_value": table.c.last_value + self.block_size}
+                    )
+                    .returning(table.c.last_value)
+                )).scalar_one()
+
+            result = await conn.execute(
+                update(table)
+                .where(table.c.year == year)
+                .values(last_value=table.c.last_value + self.block_size)
+            )
+            if result.rowcount == 0:
+                try:
+                    async with conn.begin_nested():
+                        await conn.execute(insert(table).values(year=year, last_value=self.block_size))
+                    return self.block_size
+                except IntegrityError:
+                    # Another worker created the row first
+                    await conn.execute(
+                        update(table)
+                        .where(table.c.year == year)
+                        .values(last_value=table.c.last_value + self.block_size)
+                    )
+            return await conn.scalar(select(table.c.last_value).where(table.c.year == year))
+
+    async def next_number(self, year: Optional[int] = None) -> str:
+        """Return the next unused number, e.g. ITRC-2026-000123."""
+        year = year or datetime.utcnow().year
+        async with self._lock:
+            if year != self._year or self._next > self._last:
+                self._last = await self._reserve(year)
+                self._next = self._last - self.block_size + 1
+                self._year = year
+            value = self._next
+            self._next += 1
+        return format_application_number(year, value)
+
+
+application_numbers = ApplicationNumberAllocator(async_engine, settings.APPLICATION_NUMBER_BLOCK_SIZE)
@@ -0,0 +1,268 @@
+"""Status rollups for dashboards and analytics.
+
+StatusRollup rows hold running counts of applications per status and
+product type, overall, per applicant and per creation day, plus
+evaluations per evaluator and status. A flush hook applies the changes
+of every insert, status transition and delete in the same transaction,
+so dashboards read a handful of counter rows instead of scanning
+``applications``. ``rebuild_rollups`` recomputes everything from the
+source tables; see rebuild_rollups.py.
+"""
+from collections import Counter
+from typing import List, Tuple
+
+from sqlalchemy import delete, event, func, insert, inspect, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from .models import Application, Evaluation, StatusRollup
+
+SCOPE_ALL = "all"
+SCOPE_APPLICANT = "applicant"
+SCOPE_EVALUATOR = "evaluator"
+SCOPE_DAY = "day"
+
+# (scope, scope_key, status, product_type_id)
+RollupKey = Tuple[str, str, str, int]
+
+KEY_COLUMNS = ["scope", "scope_key", "status", "product_type_id"]
+
+
+def _status_value(status) -> str:
+    return getattr(status, "value", status)
+
+
+def _day(created_at) -> str:
+    if not created_at:
+        return ""
+    return created_at if isinstance(created_at, str) else created_at.date().isoformat()
+
+
+def application_keys(status, applicant_id, product_type_id, created_at) -> List[RollupKey]:
+    """Counters one application contributes to."""
+    status = _status_value(status)
+    product_type_id = product_type_id or 0
+    return [
+        (SCOPE_ALL, "", status, product_type_id),
+        (SCOPE_APPLICANT, str(applicant_id or ""), status, product_type_id),
+        (SCOPE_DAY, _day(created_at), status, 0),
+    ]
+
+
+def evaluation_keys(status, evaluator_id) -> List[RollupKey]:
+    """Counters one evaluation contributes to."""
+    return [(SCOPE_EVALUATOR, str(evaluator_id or ""), status, 0)]
+
+
+def _values_before(obj, attrs, loaded):
+    """Attribute values as they were before the pending flush.
+
+    ``loaded`` holds values fetched by _load_old_values for attributes
+    the session never had (expired after a commit).
+    """
+    values = []
+    for attr in attrs:
+        history = get_history(obj, attr)
+        if history.deleted:
+            values.append(history.deleted[0])
+        elif history.unchanged:
+            values.append(history.unchanged[0])
+        elif attr in loaded:
+            values.append(loaded[attr])
+        else:
+            values.append(getattr(obj, attr))
+    return values
+
+
+def _values_after(obj, attrs, loaded):
+    values = []
+    for attr in attrs:
+        history = get_history(obj, attr)
+        if history.added:
+            values.append(history.added[0])
+        elif attr in loaded:
+            values.append(loaded[attr])
+        else:
+            values.append(getattr(obj, attr))
+    return values
+
+
+def _changed(obj, attrs) -> bool:
+    return any(get_history(obj, attr).has_changes() for attr in attrs)
+
+
+APPLICATION_ATTRS = ("status", "applicant_id", "product_type_id", "created_at")
+EVALUATION_ATTRS = ("status", "evaluator_id")
+
+
+def _tracked_attrs(obj):
+    if isinstance(obj, Application):
+        return APPLICATION_ATTRS
+    if isinstance(obj, Evaluation):
+        return EVALUATION_ATTRS
+    return None
+
+
+def collect_deltas(session: Session, old_values=None) -> Counter:
+    """Counter changes implied by the objects being flushed."""
+    deltas = Counter()
+    old_values = old_values or {}
+
+    def track(obj, attrs, keys_for, sign_old, sign_new):
+        loaded = old_values.get(inspect(obj), {})
+        if sign_old:
+            for key in keys_for(*_values_before(obj, attrs, loaded)):
+                deltas[key] -= 1
+        if sign_new:
+            for key in keys_for(*_values_after(obj, attrs, loaded)):
+                deltas[key] += 1
+
+    for obj in session.new:
+        if isinstance(obj, Application):
+            track(obj, APPLICATION_ATTRS, application_keys, False, True)
+        elif isinstance(obj, Evaluation):
+            track(obj, EVALUATION_ATTRS, evaluation_keys, False, True)
+    for obj in session.dirty:
+        if isinstance(obj, Application) and _changed(obj, APPLICATION_ATTRS):
+            track(obj, APPLICATION_ATTRS, application_keys, True, True)
+        elif isinstance(obj, Evaluation) and _changed(obj, EVALUATION_ATTRS):
+            track(obj, EVALUATION_ATTRS, evaluation_keys, True, True)
+    for obj in session.deleted:
+        if isinstance(obj, Application):
+            track(obj, APPLICATION_ATTRS, application_keys, True, False)
+        elif isinstance(obj, Evaluation):
+            track(obj, EVALUATION_ATTRS, evaluation_keys, True, False)
+
+    return Counter({key: delta for key, delta in deltas.items() if delta})
+
+
+def apply_deltas(connection, deltas: Counter) -> None:
+    """Add deltas to the counter rows, creating missing rows as needed."""
+    table = StatusRollup.__table__
+    upsert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(connection.dialect.name)
+
+    for (scope, scope_key, status, product_type_id), delta in sorted(deltas.items()):
+        values = dict(scope=scope, scope_key=scope_key, status=status, product_type_id=product_type_id)
+        if upsert is not None:
+            connection.execute(
+                upsert(table).values(**values, count=delta).on_conflict_do_update(
+                    index_elements=KEY_COLUMNS, set_={"count": table.c.count + delta}
+                )
+            )
+            continue
+        result = connection.execute(
+            update(table)
+            .where(*(table.c[column] == value for column, value in values.items()))
+            .values(count=table.c.count + delta)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(**values, count=delta))
+
+
+OLD_VALUES_KEY = "rollup_old_values"
+
+
+@event.listens_for(Session, "before_flush")
+def _load_old_values(session, flush_context, instances):
+    """Fetch the stored values of tracked attributes the session does not hold.
+
+    After a commit (or with deferred loading) an attribute can be changed
+    or deleted without its old value ever being loaded; its history is
+    then empty and the transition would count as nothing. The row still
+    has the old values until this flush writes, so read them now.
+    """
+    old_values = {}
+    for obj in list(session.dirty) + list(session.deleted):
+        attrs = _tracked_attrs(obj)
+        state = inspect(obj)
+        if attrs is None or state.key is None:
+            continue
+        if obj not in session.deleted and not _changed(obj, attrs):
+            continue
+        missing = [
+            attr for attr in attrs
+            if not get_history(obj, attr).deleted and not get_history(obj, attr).unchanged
+        ]
+        if not missing:
+            continue
+        mapper = state.mapper
+        columns = [mapper.columns[attr] for attr in missing]
+        row = session.connection().execute(
+            select(*columns).where(*(
+                column == value for column, value in zip(mapper.primary_key, state.identity)
+            ))
+        ).first()
+        if row is not None:
+            old_values[state] = dict(zip(missing, row))
+    session.info[OLD_VALUES_KEY] = old_values
+
+
+@event.listens_for(Session, "after_flush")
+def _update_rollups(session, flush_context):
+    deltas = collect_deltas(session, session.info.pop(OLD_VALUES_KEY, None))
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+
+def compute_rollups(session: Session) -> Counter:
+    """Recount every rollup directly from applications and evaluations."""
+    expected = Counter()
+    rows = session.execute(
+        select(
+            Application.status, Application.applicant_id, Application.product_type_id,
+            func.date(Application.created_at), func.count(Application.id)
+        ).group_by(
+            Application.status, Application.applicant_id, Application.product_type_id,
+            func.date(Application.created_at)
+        )
+    )
+    for status, applicant_id, product_type_id, day, count in rows:
+        for key in application_keys(status, applicant_id, product_type_id, str(day) if day else None):
+            expected[key] += count
+
+    rows = session.execute(
+        select(Evaluation.status, Evaluation.evaluator_id, func.count(Evaluation.id))
+        .group_by(Evaluation.status, Evaluation.evaluator_id)
+    )
+    for status, evaluator_id, count in rows:
+        for key in evaluation_keys(status, evaluator_id):
+            expected[key] += count
+
+    return Counter({key: count for key, count in expected.items() if count})
+
+
+def stored_rollups(session: Session) -> Counter:
+    """Current non-zero counters."""
+    rows = session.execute(
+        select(
+            StatusRollup.scope, StatusRollup.scope_key, StatusRollup.status,
+            StatusRollup.product_type_id, StatusRollup.count
+        ).where(StatusRollup.count != 0)
+    )
+    return Counter({tuple(row[:4]): row[4] for row in rows})
+
+
+def diff_rollups(session: Session) -> List[Tuple[RollupKey, int, int]]:
+    """Return (key, expected, stored) for every counter that is off."""
+    expected = compute_rollups(session)
+    stored = stored_rollups(session)
+    return [
+        (key, expected.get(key, 0), stored.get(key, 0))
+        for key in sorted(set(expected) | set(stored))
+        if expected.get(key, 0) != stored.get(key, 0)
+    ]
+
+
+def rebuild_rollups(session: Session) -> int:
+    """Replace all counters with a fresh recount; returns the number of rows written.
+
+    The caller commits.
+    """
+    expected = compute_rollups(session)
+    session.execute(delete(StatusRollup))
+    if expected:
+        session.execute(insert(StatusRollup), [
+            dict(zip(KEY_COLUMNS, key), count=count) for key, count in expected.items()
+        ])
+    return len(expected)
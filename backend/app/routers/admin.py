@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from ..database import get_db
@@ -9,28 +10,33 @@ from ..schemas import (
     ProductType as ProductTypeSchema, ProductTypeCreate,
     MessageResponse
 )
-from ..core.auth import get_current_active_user, require_role, get_password_hash
+from ..core.auth import (
+    get_current_active_user, require_role, get_password_hash_async,
+    invalidate_principal, principal_cache, revoke_user_tokens
+)
+from ..core.hashing import hashing_pool
+from .users import product_type_cache
 
 router = APIRouter()
 
 @router.get("/users", response_model=List[UserSchema])
 async def get_all_users(
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get all users (Admin only)."""
-    users = db.query(User).all()
+    users = (await db.scalars(select(User))).all()
     return users
 
 @router.post("/users", response_model=UserSchema)
 async def create_user(
     user_data: UserCreate,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create new user (Admin only)."""
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == user_data.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -38,7 +44,7 @@ async def create_user(
         )
     
     # Create user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     db_user = User(
         email=user_data.email,
         hashed_password=hashed_password,
@@ -49,8 +55,8 @@ async def create_user(
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     return db_user
 
@@ -59,10 +65,10 @@ async def update_user(
     user_id: int,
     user_update: UserUpdate,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update user (Admin only)."""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -76,8 +82,11 @@ async def update_user(
     
     from datetime import datetime
     user.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(user)
+    if user.is_active is False:
+        await revoke_user_tokens(db, user.id)
+    await db.commit()
+    await db.refresh(user)
+    invalidate_principal(user.email)
     
     return user
 
@@ -85,10 +94,10 @@ async def update_user(
 async def delete_user(
     user_id: int,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete user (Admin only)."""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -104,29 +113,46 @@ async def delete_user(
     
     # Deactivate instead of delete to maintain referential integrity
     user.is_active = False
-    db.commit()
+    await revoke_user_tokens(db, user.id)
+    await db.commit()
+    invalidate_principal(user.email)
     
     return MessageResponse(message="کاربر غیرفعال شد")
 
 @router.get("/product-types", response_model=List[ProductTypeSchema])
 async def get_all_product_types(
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get all product types (Admin only)."""
-    product_types = db.query(ProductType).all()
+    product_types = (await db.scalars(select(ProductType))).all()
     return product_types
 
 @router.post("/product-types", response_model=ProductTypeSchema)
 async def create_product_type(
     product_type_data: ProductTypeCreate,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create new product type (Admin only)."""
     db_product_type = ProductType(**product_type_data.dict())
     db.add(db_product_type)
-    db.commit()
-    db.refresh(db_product_type)
+    await db.commit()
+    await db.refresh(db_product_type)
+    product_type_cache.clear()
     
-    return db_product_type 
\ No newline at end of file
+    return db_product_type
+
+@router.get("/cache/principals")
+async def get_principal_cache_stats(
+    current_user: User = Depends(require_role([UserRole.ADMIN]))
+):
+    """Get authenticated principal cache statistics (Admin only)."""
+    return principal_cache.stats()
+
+@router.get("/hashing/pool")
+async def get_hashing_pool_stats(
+    current_user: User = Depends(require_role([UserRole.ADMIN]))
+):
+    """Get password hashing pool statistics (Admin only)."""
+    return hashing_pool.stats()
@@ -1,26 +1,119 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Form, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Form, UploadFile, File, Request, Response
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, undefer_group
 from typing import List, Optional
 from datetime import datetime, timedelta
+import logging
 import uuid
 import os
 from pathlib import Path
 
 from ..database import get_db
-from ..models import Application, User, UserRole, ApplicationStatus, ProductType
+from ..models import Application, User, UserRole, ApplicationStatus, ProductType, StatusRollup
+from .. import search
+from ..numbering import application_numbers
+from ..rollups import SCOPE_ALL, SCOPE_APPLICANT, SCOPE_EVALUATOR
 from ..schemas import (
     ApplicationCreate, ApplicationUpdate, Application as ApplicationSchema,
-    ApplicationSummary, DashboardStats
+    ApplicationSummary, DashboardStats, ApplicationStatusCount, ProductTypeCount
 )
-from ..core.auth import get_current_active_user, require_role
+from ..core.auth import get_current_active_user, get_read_db, require_role
+from ..core.config import settings
+from ..core.conditional import check_not_modified, latest, make_etag
+from ..core.pagination import keyset_page, set_next_cursor, set_total_count
+from ..core.serialization import ListSerializer
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
-def generate_application_number() -> str:
+async def generate_application_number() -> str:
     """Generate unique application number."""
-    year = datetime.now().year
-    timestamp = int(datetime.now().timestamp())
-    return f"ITRC-{year}-{timestamp}"
+    return await application_numbers.next_number()
+
+async def load_application_details(db: AsyncSession, application_id: int) -> Optional[Application]:
+    """Load an application with the relationships and long text its schema serializes."""
+    return await db.scalar(
+        select(Application)
+        .options(
+            undefer_group("application_text"),
+            selectinload(Application.applicant),
+            selectinload(Application.product_type),
+        )
+        .where(Application.id == application_id)
+        .execution_options(populate_existing=True)
+    )
+
+UNKNOWN = "نامشخص"  # "Unknown" in Persian
+
+def application_summary_query(*extra_columns):
+    """Select the ApplicationSummary columns, with product type and applicant joined in.
+
+    Columns are labelled with the schema's field names so rows serialize
+    directly through ``application_summaries``; ``extra_columns`` adds
+    optional fields such as applicant_name. One row per application, so
+    list endpoints run a single query however many rows they return.
+    Pages are keyed on (created_at, id).
+    """
+    return (
+        select(
+            Application.id,
+            Application.application_number,
+            Application.product_name,
+            Application.status,
+            Application.submission_date,
+            Application.created_at,
+            func.coalesce(func.nullif(ProductType.name_fa, ""), UNKNOWN).label("product_type_name"),
+            *extra_columns,
+        )
+        .outerjoin(ProductType, Application.product_type_id == ProductType.id)
+        .outerjoin(User, Application.applicant_id == User.id)
+    )
+
+# Serializes list rows in one pass; see ListSerializer
+application_summaries = ListSerializer(ApplicationSummary)
+
+# Statuses shown as "pending" on each role's dashboard; governance and admin use the default
+PENDING_STATUSES = {
+    UserRole.APPLICANT: [ApplicationStatus.DRAFT, ApplicationStatus.SUBMITTED],
+    UserRole.EVALUATOR: [ApplicationStatus.SUBMITTED],
+}
+DEFAULT_PENDING_STATUSES = [ApplicationStatus.SUBMITTED, ApplicationStatus.IN_REVIEW]
+
+async def application_breakdown(db: AsyncSession, scope: str, scope_key: str = "") -> DashboardStats:
+    """Read per-status and per-product-type counts from the status rollups."""
+    rows = (await db.execute(
+        select(
+            StatusRollup.status,
+            StatusRollup.product_type_id,
+            ProductType.name_fa,
+            StatusRollup.count,
+        )
+        .outerjoin(ProductType, StatusRollup.product_type_id == ProductType.id)
+        .where(
+            StatusRollup.scope == scope,
+            StatusRollup.scope_key == scope_key,
+            StatusRollup.count != 0
+        )
+    )).all()
+    
+    by_status = {}
+    by_product_type = {}
+    for status_value, product_type_id, product_type_name, count in rows:
+        app_status = ApplicationStatus(status_value)
+        by_status[app_status] = by_status.get(app_status, 0) + count
+        entry = by_product_type.setdefault(
+            product_type_id, ProductTypeCount(product_type_id=product_type_id or None, product_type_name=product_type_name, count=0)
+        )
+        entry.count += count
+    
+    return DashboardStats(
+        total_applications=sum(by_status.values()),
+        in_evaluation=by_status.get(ApplicationStatus.IN_EVALUATION, 0),
+        completed_applications=by_status.get(ApplicationStatus.COMPLETED, 0),
+        by_status=[ApplicationStatusCount(status=s, count=c) for s, c in by_status.items()],
+        by_product_type=sorted(by_product_type.values(), key=lambda entry: -entry.count),
+    )
 
 @router.post("/", response_model=ApplicationSchema)
 async def create_application(
@@ -33,32 +126,35 @@ async def create_application(
     contact_email: str = Form(""),
     contact_phone: str = Form(""),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create new application (Applicants only)."""
-    print(f"🚀 Creating application for user ID: {current_user.id}, email: {current_user.email}")
-    print(f"📝 Application details: product={product_name}, type={product_type}, company={company_name}")
+    logger.debug("Creating application", extra={
+        "user_id": current_user.id, "product_name": product_name,
+        "product_type": product_type, "company_name": company_name
+    })
     
     # Check if user is applicant
     if current_user.role != UserRole.APPLICANT:
-        print(f"❌ User role {current_user.role} is not APPLICANT for create application")
+        logger.warning("Create application denied", extra={"user_id": current_user.id, "role": current_user.role})
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"فقط متقاضیان می‌توانند درخواست جدید ایجاد کنند. نقش فعلی: {current_user.role}"
         )
     
     # Find product type by name
-    product_type_obj = db.query(ProductType).filter(ProductType.name_en == product_type).first()
+    product_type_obj = await db.scalar(select(ProductType).where(ProductType.name_en == product_type))
     if not product_type_obj:
         # If not found by English name, try to find by ID or create a default one
-        product_type_obj = db.query(ProductType).first()  # Get any product type for now
-        print(f"⚠️  Product type '{product_type}' not found, using default: {product_type_obj.name_en if product_type_obj else 'None'}")
-    else:
-        print(f"✅ Found product type: {product_type_obj.name_en}")
+        product_type_obj = await db.scalar(select(ProductType))  # Get any product type for now
+        logger.warning("Product type not found, using default", extra={
+            "product_type": product_type,
+            "default_product_type": product_type_obj.name_en if product_type_obj else None
+        })
     
     # Create application
     db_application = Application(
-        application_number=generate_application_number(),
+        application_number=await generate_application_number(),
         applicant_id=current_user.id,
         product_name=product_name,
         product_type_id=product_type_obj.id if product_type_obj else 1,
@@ -72,88 +168,64 @@ async def create_application(
         submission_date=datetime.utcnow()
     )
     
-    print(f"💾 Saving application with applicant_id: {db_application.applicant_id}")
-    
     db.add(db_application)
-    db.commit()
-    db.refresh(db_application)
+    await db.commit()
+    db_application = await load_application_details(db, db_application.id)
     
-    print(f"✅ Application created successfully with ID: {db_application.id}, Number: {db_application.application_number}")
+    logger.info("Application created", extra={
+        "application_id": db_application.id, "application_number": db_application.application_number
+    })
     
     return db_application
 
 @router.get("/", response_model=List[ApplicationSummary])
 async def get_applications(
+    response: Response,
     status: Optional[ApplicationStatus] = None,
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    include_total: bool = False,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get applications list based on user role."""
-    query = db.query(Application)
+    """Get applications list based on user role, newest first.
+
+    Pass the X-Next-Cursor header of a response as ``cursor`` to fetch the
+    next page.
+    """
+    query = application_summary_query()
     
     # Filter based on user role
     if current_user.role == UserRole.APPLICANT:
-        query = query.filter(Application.applicant_id == current_user.id)
+        query = query.where(Application.applicant_id == current_user.id)
     elif current_user.role == UserRole.EVALUATOR:
         # Evaluators see applications assigned to them or available for assignment
-        query = query.filter(
+        query = query.where(
             Application.status.in_([ApplicationStatus.SUBMITTED, ApplicationStatus.IN_EVALUATION])
         )
     # Governance and Admin see all applications
     
     if status:
-        query = query.filter(Application.status == status)
-    
-    applications = query.offset(skip).limit(limit).all()
-    
-    # Convert to summary format
-    summaries = []
-    for app in applications:
-        summaries.append(ApplicationSummary(
-            id=app.id,
-            application_number=app.application_number,
-            product_name=app.product_name,
-            status=app.status,
-            submission_date=app.submission_date,
-            product_type_name=app.product_type.name_fa
-        ))
-    
-    return summaries
-
-@router.get("/{application_id}", response_model=ApplicationSchema)
-async def get_application(
-    application_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-):
-    """Get specific application details."""
-    application = db.query(Application).filter(Application.id == application_id).first()
-    if not application:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="درخواست مورد نظر یافت نشد"
-        )
+        query = query.where(Application.status == status)
     
-    # Check access permissions
-    if current_user.role == UserRole.APPLICANT and application.applicant_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="دسترسی غیرمجاز"
-        )
+    if include_total:
+        scope = current_user.id if current_user.role == UserRole.APPLICANT else current_user.role
+        await set_total_count(response, db, ("applications", scope, status), query)
     
-    return application
+    rows = (await db.execute(keyset_page(query, Application.created_at, Application.id, cursor, limit))).all()
+    rows = set_next_cursor(response, rows, limit)
+    
+    return application_summaries.response(rows, response)
 
 @router.put("/{application_id}", response_model=ApplicationSchema)
 async def update_application(
     application_id: int,
     application_update: ApplicationUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update application."""
-    application = db.query(Application).filter(Application.id == application_id).first()
+    application = await db.scalar(select(Application).where(Application.id == application_id))
     if not application:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -185,32 +257,33 @@ async def update_application(
         setattr(application, field, value)
     
     application.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(application)
+    await db.commit()
     
-    return application
+    return await load_application_details(db, application_id)
 
 @router.post("/{application_id}/submit")
 async def submit_application(
     application_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Submit application for evaluation."""
-    print(f"🚀 Submit application {application_id} for user ID: {current_user.id}, role: {current_user.role}")
-    
     # Check if user is applicant
     if current_user.role != UserRole.APPLICANT:
-        print(f"❌ User role {current_user.role} is not APPLICANT for submit application")
+        logger.warning("Submit application denied", extra={
+            "application_id": application_id, "user_id": current_user.id, "role": current_user.role
+        })
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"فقط متقاضیان می‌توانند درخواست ارسال کنند. نقش فعلی: {current_user.role}"
         )
     
-    application = db.query(Application).filter(
+    application = await db.scalar(select(Application).options(
+        selectinload(Application.product_type), selectinload(Application.documents)
+    ).where(
         Application.id == application_id,
         Application.applicant_id == current_user.id
-    ).first()
+    ))
     
     if not application:
         raise HTTPException(
@@ -243,249 +316,229 @@ async def submit_application(
     estimated_days = application.product_type.estimated_days
     application.estimated_completion_date = datetime.utcnow() + timedelta(days=estimated_days)
     
-    db.commit()
+    await db.commit()
     
     return {"message": "درخواست با موفقیت ارسال شد", "application_number": application.application_number}
 
 @router.get("/dashboard/stats", response_model=DashboardStats)
 async def get_dashboard_stats(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get dashboard statistics."""
-    stats = DashboardStats(
-        total_applications=0,
-        pending_applications=0,
-        in_evaluation=0,
-        completed_applications=0
-    )
-    
+    """Get dashboard statistics.
+
+    Totals and per-status / per-product-type breakdowns are read from the
+    status rollups, so the cost does not grow with the applications table.
+    """
     if current_user.role == UserRole.APPLICANT:
         # Stats for applicant's own applications
-        user_apps = db.query(Application).filter(Application.applicant_id == current_user.id)
-        stats.total_applications = user_apps.count()
-        stats.pending_applications = user_apps.filter(
-            Application.status.in_([ApplicationStatus.DRAFT, ApplicationStatus.SUBMITTED])
-        ).count()
-        stats.in_evaluation = user_apps.filter(
-            Application.status == ApplicationStatus.IN_EVALUATION
-        ).count()
-        stats.completed_applications = user_apps.filter(
-            Application.status == ApplicationStatus.COMPLETED
-        ).count()
+        stats = await application_breakdown(db, SCOPE_APPLICANT, str(current_user.id))
         stats.my_applications = stats.total_applications
-        
-    elif current_user.role == UserRole.EVALUATOR:
-        # Stats for evaluator
-        all_apps = db.query(Application)
-        stats.total_applications = all_apps.count()
-        stats.pending_applications = all_apps.filter(
-            Application.status == ApplicationStatus.SUBMITTED
-        ).count()
-        stats.in_evaluation = all_apps.filter(
-            Application.status == ApplicationStatus.IN_EVALUATION
-        ).count()
-        stats.completed_applications = all_apps.filter(
-            Application.status == ApplicationStatus.COMPLETED
-        ).count()
-        
+    else:
+        stats = await application_breakdown(db, SCOPE_ALL)
+    
+    pending_statuses = PENDING_STATUSES.get(current_user.role, DEFAULT_PENDING_STATUSES)
+    stats.pending_applications = sum(
+        entry.count for entry in stats.by_status if entry.status in pending_statuses
+    )
+    
+    if current_user.role == UserRole.EVALUATOR:
         # My evaluations
-        from ..models import Evaluation
-        stats.my_evaluations = db.query(Evaluation).filter(
-            Evaluation.evaluator_id == current_user.id
-        ).count()
-        
-    else:  # Governance or Admin
-        all_apps = db.query(Application)
-        stats.total_applications = all_apps.count()
-        stats.pending_applications = all_apps.filter(
-            Application.status.in_([ApplicationStatus.SUBMITTED, ApplicationStatus.IN_REVIEW])
-        ).count()
-        stats.in_evaluation = all_apps.filter(
-            Application.status == ApplicationStatus.IN_EVALUATION
-        ).count()
-        stats.completed_applications = all_apps.filter(
-            Application.status == ApplicationStatus.COMPLETED
-        ).count()
+        stats.my_evaluations = await db.scalar(
+            select(func.coalesce(func.sum(StatusRollup.count), 0)).where(
+                StatusRollup.scope == SCOPE_EVALUATOR,
+                StatusRollup.scope_key == str(current_user.id)
+            )
+        )
     
     return stats
 
 @router.get("/my", response_model=List[ApplicationSummary])
 async def get_my_applications(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    include_total: bool = False,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get current user's applications."""
-    print(f"🔍 /my endpoint called - User ID: {current_user.id}, email: {current_user.email}, role: {current_user.role}")
-    
+    """Get current user's applications, newest first."""
     # Check if user is applicant
     if current_user.role != UserRole.APPLICANT:
-        print(f"❌ User role {current_user.role} is not APPLICANT, returning 403")
-        print(f"❌ Expected: {UserRole.APPLICANT}, Got: {current_user.role}")
+        logger.warning("My applications denied", extra={"user_id": current_user.id, "role": current_user.role})
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"این صفحه فقط برای متقاضیان در دسترس است. نقش فعلی: {current_user.role}"
         )
     
-    print(f"✅ User role check passed - proceeding to get applications")
+    query = application_summary_query().where(Application.applicant_id == current_user.id)
+    if include_total:
+        await set_total_count(response, db, ("my", current_user.id), query)
     
-    applications = db.query(Application).filter(
-        Application.applicant_id == current_user.id
-    ).all()
+    rows = (await db.execute(keyset_page(query, Application.created_at, Application.id, cursor, limit))).all()
+    rows = set_next_cursor(response, rows, limit)
     
-    print(f"📊 Found {len(applications)} applications for user ID {current_user.id}")
-    for app in applications:
-        print(f"   - App ID: {app.id}, Number: {app.application_number}, Status: {app.status}")
+    logger.debug("My applications loaded", extra={"user_id": current_user.id, "count": len(rows)})
     
-    # Convert to summary format
-    summaries = []
-    for app in applications:
-        print(f"🔍 Processing application: {app.id}, product: {app.product_name}, status: {app.status}")
-        
-        # Fix product_type_name to always return a string
-        product_type_name = "نامشخص"  # Default: "Unknown" in Persian
-        if app.product_type:
-            product_type_name = app.product_type.name_fa
-        elif app.product_type_id:
-            # Try to fetch product type by ID if relationship failed
-            product_type = db.query(ProductType).filter(ProductType.id == app.product_type_id).first()
-            if product_type:
-                product_type_name = product_type.name_fa
-        
-        summaries.append(ApplicationSummary(
-            id=app.id,
-            application_number=app.application_number,
-            product_name=app.product_name,
-            status=app.status,
-            submission_date=app.submission_date,
-            product_type_name=product_type_name
-        ))
-    
-    print(f"✅ Returning {len(summaries)} application summaries")
-    return summaries
+    return application_summaries.response(rows, response)
 
 @router.get("/dashboard/list", response_model=List[ApplicationSummary])
 async def get_dashboard_applications(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    include_total: bool = False,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get applications for dashboard based on user role."""
-    print(f"🎛️ Dashboard request from user ID: {current_user.id}, email: {current_user.email}, role: {current_user.role}")
-    
-    applications = []
+    """Get applications for dashboard based on user role, newest first."""
+    query = application_summary_query(Application.evaluation_level)
+    # Everyone but the applicant also sees who applied
+    applicant_name = func.coalesce(func.nullif(User.company, ""), User.full_name).label("applicant_name")
     
     if current_user.role == UserRole.APPLICANT:
         # Applicants see their own applications
-        applications = db.query(Application).filter(
-            Application.applicant_id == current_user.id
-        ).order_by(Application.created_at.desc()).all()
-        print(f"📋 Applicant dashboard: Found {len(applications)} applications")
+        query = query.where(Application.applicant_id == current_user.id)
+        scope = current_user.id
         
     elif current_user.role == UserRole.EVALUATOR:
         # Evaluators see submitted applications available for evaluation
-        applications = db.query(Application).filter(
+        query = query.add_columns(applicant_name).where(
             Application.status.in_([ApplicationStatus.SUBMITTED, ApplicationStatus.IN_EVALUATION])
-        ).order_by(Application.submission_date.desc()).all()
-        print(f"📋 Evaluator dashboard: Found {len(applications)} applications")
+        )
+        scope = current_user.role
         
-    elif current_user.role in [UserRole.GOVERNANCE, UserRole.ADMIN]:
+    else:
         # Governance and Admin see all applications
-        applications = db.query(Application).order_by(Application.created_at.desc()).all()
-        print(f"📋 Admin/Governance dashboard: Found {len(applications)} applications")
+        query = query.add_columns(applicant_name)
+        scope = current_user.role
     
-    # Convert to summary format
-    summaries = []
-    for app in applications:
-        print(f"🔍 Processing application: {app.id}, status: {app.status}")
-        
-        # Fix product_type_name to always return a string
-        product_type_name = "نامشخص"  # Default: "Unknown" in Persian
-        if app.product_type:
-            product_type_name = app.product_type.name_fa
-        elif app.product_type_id:
-            # Try to fetch product type by ID if relationship failed
-            product_type = db.query(ProductType).filter(ProductType.id == app.product_type_id).first()
-            if product_type:
-                product_type_name = product_type.name_fa
-        
-        # Add applicant name for non-applicant users
-        applicant_name = None
-        if current_user.role != UserRole.APPLICANT and app.applicant:
-            applicant_name = app.applicant.company or app.applicant.full_name
-        
-        summaries.append(ApplicationSummary(
-            id=app.id,
-            application_number=app.application_number,
-            product_name=app.product_name,
-            status=app.status,
-            submission_date=app.submission_date,
-            product_type_name=product_type_name,
-            applicant_name=applicant_name,
-            evaluation_level=app.evaluation_level
-        ))
-    
-    print(f"✅ Dashboard returning {len(summaries)} application summaries")
-    return summaries
+    if include_total:
+        await set_total_count(response, db, ("dashboard", scope), query)
+    
+    rows = (await db.execute(keyset_page(query, Application.created_at, Application.id, cursor, limit))).all()
+    rows = set_next_cursor(response, rows, limit)
+    logger.debug("Dashboard applications loaded", extra={
+        "user_id": current_user.id, "role": current_user.role, "count": len(rows)
+    })
+    
+    return application_summaries.response(rows, response)
 
 @router.get("/available", response_model=List[ApplicationSummary])
 async def get_available_applications(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    include_total: bool = False,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get applications available for evaluation."""
-    print(f"🔍 /available endpoint called - User ID: {current_user.id}, email: {current_user.email}, role: {current_user.role}")
-    
+    """Get applications available for evaluation, newest first."""
     # Check if user has evaluator, governance, or admin role
     allowed_roles = [UserRole.EVALUATOR, UserRole.GOVERNANCE, UserRole.ADMIN]
     if current_user.role not in allowed_roles:
-        print(f"❌ User role {current_user.role} not in allowed roles: {allowed_roles}")
+        logger.warning("Available applications denied", extra={"user_id": current_user.id, "role": current_user.role})
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"دسترسی غیرمجاز. نقش فعلی: {current_user.role}"
         )
     
-    print(f"✅ User role check passed - proceeding to get available applications")
+    query = application_summary_query(
+        Application.evaluation_level,
+        func.coalesce(
+            func.nullif(Application.company_name, ""), func.nullif(User.company, ""),
+            func.nullif(User.full_name, ""), UNKNOWN
+        ).label("applicant_name"),
+    ).where(Application.status == ApplicationStatus.SUBMITTED)
+    if include_total:
+        await set_total_count(response, db, ("available",), query)
     
-    applications = db.query(Application).filter(
-        Application.status == ApplicationStatus.SUBMITTED
-    ).all()
+    rows = (await db.execute(keyset_page(query, Application.created_at, Application.id, cursor, limit))).all()
+    rows = set_next_cursor(response, rows, limit)
     
-    print(f"📊 Found {len(applications)} available applications")
+    logger.debug("Available applications loaded", extra={"user_id": current_user.id, "count": len(rows)})
     
-    # Convert to summary format
-    summaries = []
-    for app in applications:
-        print(f"🔍 Processing application: {app.id}, product: {app.product_name}, status: {app.status}")
-        
-        # Fix product_type_name to always return a string
-        product_type_name = "نامشخص"  # Default: "Unknown" in Persian
-        if app.product_type:
-            product_type_name = app.product_type.name_fa
-        elif app.product_type_id:
-            # Try to fetch product type by ID if relationship failed
-            product_type = db.query(ProductType).filter(ProductType.id == app.product_type_id).first()
-            if product_type:
-                product_type_name = product_type.name_fa
+    return application_summaries.response(rows, response)
 
-        # Add applicant name for evaluators
-        applicant_name = "نامشخص"
-        if app.company_name:
-            applicant_name = app.company_name
-        elif app.applicant and app.applicant.company:
-            applicant_name = app.applicant.company
-        elif app.applicant:
-            applicant_name = app.applicant.full_name
-        
-        summaries.append(ApplicationSummary(
-            id=app.id,
-            application_number=app.application_number,
-            product_name=app.product_name,
-            status=app.status,
-            submission_date=app.submission_date,
-            product_type_name=product_type_name,
-            applicant_name=applicant_name,
-            evaluation_level=app.evaluation_level
-        ))
-    
-    print(f"✅ Returning {len(summaries)} application summaries for evaluator")
-    return summaries 
\ No newline at end of file
+@router.get("/search", response_model=List[ApplicationSummary])
+async def search_applications(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Search applications by product, company, description, number or applicant name.
+
+    Results are ranked by relevance and limited to what the user may list,
+    as in GET /. Arabic and Persian spellings of yeh and kaf, Persian
+    digits and ZWNJ-joined words match each other.
+    """
+    tokens = search.search_tokens(q)
+    if not tokens:
+        return []
+
+    query = application_summary_query()
+    if current_user.role == UserRole.APPLICANT:
+        query = query.where(Application.applicant_id == current_user.id)
+    elif current_user.role == UserRole.EVALUATOR:
+        query = query.where(
+            Application.status.in_([ApplicationStatus.SUBMITTED, ApplicationStatus.IN_EVALUATION])
+        )
+
+    query = search.search_applications(query, db.get_bind().dialect.name, tokens)
+    if query is None:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="جستجو روی این پایگاه داده پشتیبانی نمی‌شود"
+        )
+
+    rows = (await db.execute(query.limit(limit).offset(offset))).all()
+    return application_summaries.response(rows)
+
+# Declared after the fixed paths so /my and /available are not captured by {application_id}
+@router.get("/{application_id}", response_model=ApplicationSchema)
+async def get_application(
+    application_id: int,
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get specific application details.
+
+    Answers If-None-Match / If-Modified-Since with 304 after a single
+    version query, without loading the application.
+    """
+    version = (await db.execute(
+        select(
+            Application.applicant_id, Application.updated_at,
+            User.updated_at.label("applicant_updated_at"),
+            ProductType.updated_at.label("product_type_updated_at")
+        )
+        .outerjoin(User, Application.applicant_id == User.id)
+        .outerjoin(ProductType, Application.product_type_id == ProductType.id)
+        .where(Application.id == application_id)
+    )).first()
+    if not version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="درخواست مورد نظر یافت نشد"
+        )
+    
+    # Check access permissions
+    if current_user.role == UserRole.APPLICANT and version.applicant_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="دسترسی غیرمجاز"
+        )
+    
+    # The payload nests the applicant and the product type, so their updates count too
+    validators = (version.updated_at, version.applicant_updated_at, version.product_type_updated_at)
+    not_modified = check_not_modified(
+        request, response, make_etag("application", application_id, *validators), latest(*validators)
+    )
+    if not_modified:
+        return not_modified
+    
+    return await load_application_details(db, application_id)
@@ -1,20 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from datetime import timedelta
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_db
 from ..models import User, UserRole
-from ..schemas import Token, UserCreate, User as UserSchema, LoginRequest
-from ..core.auth import authenticate_user, create_access_token, get_password_hash, get_current_active_user
-from ..core.config import settings
+from ..schemas import (
+    Token, TokenPair, RefreshRequest, UserCreate, User as UserSchema,
+    LoginRequest, MessageResponse
+)
+from ..core.auth import (
+    authenticate_user, create_token_pair, get_password_hash_async,
+    get_current_active_user, invalidate_principal, rotate_refresh_token,
+    revoke_refresh_token, revoke_user_tokens
+)
 
 router = APIRouter()
 
 @router.post("/login", response_model=Token)
-async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+async def login(login_data: LoginRequest, db: AsyncSession = Depends(get_db)):
     """User login endpoint."""
-    user = authenticate_user(db, login_data.email, login_data.password)
+    user = await authenticate_user(db, login_data.email, login_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -22,22 +28,30 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
+    tokens = await create_token_pair(db, user)
+    await db.commit()
     
     return {
-        "access_token": access_token,
-        "token_type": "bearer",
+        **tokens,
         "user": user
     }
 
+@router.post("/refresh", response_model=TokenPair)
+async def refresh(refresh_data: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    """Exchange a refresh token for a new access and refresh token."""
+    return await rotate_refresh_token(db, refresh_data.refresh_token)
+
+@router.post("/logout", response_model=MessageResponse)
+async def logout(refresh_data: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    """Revoke a refresh token."""
+    await revoke_refresh_token(db, refresh_data.refresh_token)
+    return MessageResponse(message="خروج با موفقیت انجام شد")
+
 @router.post("/register", response_model=UserSchema)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """User registration endpoint."""
     # Check if user already exists
-    db_user = db.query(User).filter(User.email == user_data.email).first()
+    db_user = await db.scalar(select(User).where(User.email == user_data.email))
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -45,7 +59,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     db_user = User(
         email=user_data.email,
         hashed_password=hashed_password,
@@ -56,8 +70,8 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     return db_user
 
@@ -71,16 +85,19 @@ async def change_password(
     current_password: str,
     new_password: str,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Change user password."""
-    if not authenticate_user(db, current_user.email, current_password):
+    user = await authenticate_user(db, current_user.email, current_password)
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="رمز عبور فعلی نادرست است"
         )
     
-    current_user.hashed_password = get_password_hash(new_password)
-    db.commit()
+    user.hashed_password = await get_password_hash_async(new_password)
+    await revoke_user_tokens(db, user.id)
+    await db.commit()
+    invalidate_principal(user.email)
     
     return {"message": "رمز عبور با موفقیت تغییر یافت"} 
\ No newline at end of file
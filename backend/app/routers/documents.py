@@ -1,41 +1,149 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-from typing import List
-import os
-import uuid
-import aiofiles
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import Iterator, List, Optional, Tuple
 from pathlib import Path
+from datetime import datetime, timedelta
+import io
+import json
+import mimetypes
+import re
+import unicodedata
+import uuid
+import zipfile
+import aiofiles.os
 
 from ..database import get_db
-from ..models import Document, Application, User, UserRole, DocumentType
-from ..schemas import Document as DocumentSchema, DocumentUpload, MessageResponse
+from ..models import Document, DocumentVersion, Application, User, UserRole, DocumentType, UploadSession
+from ..schemas import (
+    Document as DocumentSchema, DocumentVersion as DocumentVersionSchema, DocumentUpload, MessageResponse,
+    UploadSession as UploadSessionSchema, UploadSessionCreate
+)
+from ..storage import StagedBlob, blob_store, file_too_large
 from ..core.auth import get_current_active_user, require_role
 from ..core.config import settings
+from ..core.multipart import MultipartFileStream
+from ..core.ranges import file_etag, serve_file
 
 router = APIRouter()
 
-async def save_upload_file(upload_file: UploadFile, destination: Path) -> None:
-    """Save uploaded file to disk."""
-    async with aiofiles.open(destination, 'wb') as f:
-        content = await upload_file.read()
-        await f.write(content)
-
 def get_file_extension(filename: str) -> str:
     """Get file extension."""
     return Path(filename).suffix.lower()
 
-@router.post("/upload/{application_id}", response_model=DocumentSchema)
-async def upload_document(
+def archive_member_name(filename: Optional[str], fallback: str) -> str:
+    """A client-supplied file name reduced to a safe single ZIP entry name.
+
+    Only the last component after any ``/``, ``\\`` or drive ``:`` is kept,
+    so extractors on any platform cannot be steered outside the folder;
+    control characters are dropped. ``fallback`` is used when nothing
+    usable is left.
+    """
+    name = re.split(r"[/\\:]", filename or "")[-1]
+    name = "".join(char for char in name if unicodedata.category(char) != "Cc").strip()
+    return fallback if name in ("", ".", "..") else name
+
+async def save_document_version(
+    db: AsyncSession,
     application_id: int,
     document_type: DocumentType,
-    file: UploadFile = File(...),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-):
-    """Upload document for an application."""
+    staged: StagedBlob,
+    original_filename: str,
+    mime_type: Optional[str],
+    uploaded_by: int
+) -> Document:
+    """Make staged content the current version of an application's document.
+
+    The first upload of a type creates the Document; later ones bump its
+    version. Every upload is kept as a DocumentVersion holding a blob
+    reference, so earlier versions stay downloadable without extra copies.
+    Anything else the caller added to ``db`` is committed in the same
+    transaction. If that commit fails, the blob moved into place is left
+    unreferenced for collect_garbage rather than orphaned.
+    """
+    try:
+        existing_doc = await db.scalar(select(Document).where(
+            Document.application_id == application_id,
+            Document.document_type == document_type
+        ))
+        if existing_doc and not await db.scalar(
+            select(func.count()).select_from(DocumentVersion).where(DocumentVersion.document_id == existing_doc.id)
+        ):
+            # Uploaded before versions were kept: its own file becomes the previous version
+            db.add(DocumentVersion(
+                document_id=existing_doc.id,
+                version=existing_doc.version,
+                file_path=existing_doc.file_path,
+                file_size=existing_doc.file_size,
+                original_filename=existing_doc.original_filename,
+                mime_type=existing_doc.mime_type,
+                uploaded_at=existing_doc.uploaded_at,
+                uploaded_by=existing_doc.uploaded_by
+            ))
+        
+        file_path = await blob_store.add(db, staged)
+    except BaseException:
+        staged.temp_path.unlink(missing_ok=True)
+        raise
+    
+    try:
+        fields = dict(
+            filename=f"{staged.sha256}{get_file_extension(original_filename)}",
+            original_filename=original_filename,
+            file_path=str(file_path),
+            file_size=staged.size,
+            sha256=staged.sha256,
+            mime_type=mime_type
+        )
+        if existing_doc:
+            # Update existing document
+            for field, value in fields.items():
+                setattr(existing_doc, field, value)
+            existing_doc.version += 1
+            existing_doc.is_approved = False
+            document = existing_doc
+        else:
+            # Create new document record
+            document = Document(
+                application_id=application_id,
+                document_type=document_type,
+                version=1,
+                uploaded_by=uploaded_by,
+                **fields
+            )
+            db.add(document)
+            await db.flush()
+        
+        db.add(DocumentVersion(
+            document_id=document.id,
+            version=document.version,
+            sha256=staged.sha256,
+            file_path=str(file_path),
+            file_size=staged.size,
+            original_filename=original_filename,
+            mime_type=mime_type,
+            uploaded_by=uploaded_by
+        ))
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        await blob_store.disown(db, staged.sha256, staged.size)
+        await db.commit()
+        raise
+    await db.refresh(document)
+    return document
+
+async def check_upload_allowed(
+    db: AsyncSession,
+    application_id: int,
+    filename: Optional[str],
+    current_user: User
+) -> None:
+    """Check that the user may upload a file with this name to the application."""
     # Check if application exists and user has access
-    application = db.query(Application).filter(Application.id == application_id).first()
+    application = await db.scalar(select(Application).where(Application.id == application_id))
     if not application:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -50,94 +158,242 @@ async def upload_document(
         )
     
     # Validate file
-    if not file.filename:
+    if not filename:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="نام فایل نامعتبر است"
         )
     
-    file_extension = get_file_extension(file.filename)
+    file_extension = get_file_extension(filename)
     if file_extension not in settings.ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"فرمت فایل مجاز نیست. فرمت‌های مجاز: {', '.join(settings.ALLOWED_EXTENSIONS)}"
         )
+
+# The body is read by MultipartFileStream rather than declared as a File
+# parameter, so it is only read after the checks and goes straight to disk;
+# the schema below keeps the form in the API docs.
+UPLOAD_FORM = {
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {"schema": {
+            "type": "object",
+            "required": ["file"],
+            "properties": {"file": {"type": "string", "format": "binary"}},
+        }}},
+    }
+}
+
+@router.post("/upload/{application_id}", response_model=DocumentSchema, openapi_extra=UPLOAD_FORM)
+async def upload_document(
+    application_id: int,
+    document_type: DocumentType,
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Upload document for an application."""
+    upload = MultipartFileStream(request)
+    if upload.too_large(settings.MAX_FILE_SIZE):
+        raise file_too_large()
+    await upload.open()
+    await check_upload_allowed(db, application_id, upload.filename, current_user)
     
-    # Check file size
-    file_content = await file.read()
-    if len(file_content) > settings.MAX_FILE_SIZE:
+    # Stream to staging; the size limit is enforced while receiving
+    staged = await blob_store.receive(upload.chunks())
+    return await save_document_version(
+        db, application_id, document_type, staged, upload.filename, upload.content_type, current_user.id
+    )
+
+# Resumable uploads: create a session, PUT the file in pieces with a
+# Content-Range header each, GET the session to learn how much arrived
+# after an interruption, then complete it.
+
+CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+async def get_upload_session(db: AsyncSession, session_id: str, current_user: User) -> UploadSession:
+    upload_session = await db.scalar(select(UploadSession).where(UploadSession.id == session_id))
+    if not upload_session or upload_session.expires_at < datetime.utcnow():
         raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail="حجم فایل بیش از حد مجاز است"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="جلسه بارگذاری یافت نشد یا منقضی شده است"
         )
+    if upload_session.created_by != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="دسترسی غیرمجاز"
+        )
+    return upload_session
+
+@router.post("/uploads/{application_id}", response_model=UploadSessionSchema, status_code=status.HTTP_201_CREATED)
+async def create_upload_session(
+    application_id: int,
+    document_type: DocumentType,
+    upload: UploadSessionCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Start a resumable upload of a document for an application."""
+    await check_upload_allowed(db, application_id, upload.filename, current_user)
+    if upload.size < 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="حجم فایل نامعتبر است"
+        )
+    if upload.size > settings.MAX_FILE_SIZE:
+        raise file_too_large()
     
-    # Reset file pointer
-    await file.seek(0)
+    upload_session = UploadSession(
+        id=uuid.uuid4().hex,
+        application_id=application_id,
+        document_type=document_type,
+        original_filename=upload.filename,
+        mime_type=upload.mime_type or mimetypes.guess_type(upload.filename)[0] or "application/octet-stream",
+        total_size=upload.size,
+        offset=0,
+        created_by=current_user.id,
+        expires_at=datetime.utcnow() + timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+    )
+    db.add(upload_session)
+    await db.commit()
+    return upload_session
+
+@router.get("/uploads/{session_id}", response_model=UploadSessionSchema)
+async def get_upload_status(
+    session_id: str,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Report how many bytes of a resumable upload have been received."""
+    return await get_upload_session(db, session_id, current_user)
+
+@router.put("/uploads/{session_id}", response_model=UploadSessionSchema)
+async def upload_chunk(
+    session_id: str,
+    request: Request,
+    content_range: str = Header(...),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Receive the next piece of a resumable upload.
+
+    The body is written straight into the session's file at the offset
+    given by ``Content-Range: bytes start-end/total``, which must be the
+    current offset. If the connection drops, the bytes that arrived count.
+    """
+    upload_session = await get_upload_session(db, session_id, current_user)
+    match = CONTENT_RANGE.match(content_range.strip())
+    if not match or int(match[3]) != upload_session.total_size or int(match[2]) < int(match[1]):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="سرآیند Content-Range نامعتبر است"
+        )
+    start, end = int(match[1]), int(match[2])
+    if start != upload_session.offset:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"بخش ارسالی باید از بایت {upload_session.offset} شروع شود"
+        )
+    if end >= upload_session.total_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="حجم داده ارسالی بیش از حجم اعلام شده فایل است"
+        )
+    # Don't hold a pooled connection while the body trickles in
+    await db.commit()
     
-    # Create upload directory if it doesn't exist
-    upload_dir = Path(settings.UPLOAD_DIR) / str(application_id)
-    upload_dir.mkdir(parents=True, exist_ok=True)
+    written = await blob_store.write_chunk(
+        blob_store.session_path(session_id), start, request.stream(), limit=end - start + 1
+    )
     
-    # Generate unique filename
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = upload_dir / unique_filename
+    # Only advance from the offset this chunk was written at; a concurrent retry loses
+    result = await db.execute(
+        update(UploadSession)
+        .where(UploadSession.id == session_id, UploadSession.offset == start)
+        .values(
+            offset=start + written,
+            expires_at=datetime.utcnow() + timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="بخش دیگری از این فایل هم‌زمان در حال ارسال است"
+        )
+    await db.commit()
+    return await db.scalar(
+        select(UploadSession).where(UploadSession.id == session_id).execution_options(populate_existing=True)
+    )
+
+@router.post("/uploads/{session_id}/complete", response_model=DocumentSchema)
+async def complete_upload(
+    session_id: str,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Turn a fully received upload into the application's document, as upload_document does."""
+    upload_session = await get_upload_session(db, session_id, current_user)
+    if upload_session.offset != upload_session.total_size:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"بارگذاری کامل نشده است: {upload_session.offset} از {upload_session.total_size} بایت دریافت شده"
+        )
     
-    # Save file
-    await save_upload_file(file, file_path)
+    session_path = blob_store.session_path(session_id)
+    try:
+        received = (await aiofiles.os.stat(session_path)).st_size
+    except FileNotFoundError:
+        received = 0
+    if received != upload_session.total_size:
+        # The file lost bytes (or vanished) after they were counted: resume from what is really there
+        upload_session.offset = min(received, upload_session.total_size)
+        await db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"بارگذاری کامل نشده است: {upload_session.offset} از {upload_session.total_size} بایت دریافت شده"
+        )
     
-    # Check if document of this type already exists for this application
-    existing_doc = db.query(Document).filter(
-        Document.application_id == application_id,
-        Document.document_type == document_type
-    ).first()
+    staged = await blob_store.stage_file(session_path, upload_session.total_size)
+    # Removed with the document commit, so a failed completion can be retried
+    await db.delete(upload_session)
+    document = await save_document_version(
+        db,
+        upload_session.application_id,
+        upload_session.document_type,
+        staged,
+        upload_session.original_filename,
+        upload_session.mime_type,
+        current_user.id
+    )
+    session_path.unlink(missing_ok=True)
+    return document
+
+@router.delete("/uploads/{session_id}", response_model=MessageResponse)
+async def cancel_upload(
+    session_id: str,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Abandon a resumable upload and discard what was received."""
+    upload_session = await get_upload_session(db, session_id, current_user)
+    await db.delete(upload_session)
+    await db.commit()
+    blob_store.session_path(session_id).unlink(missing_ok=True)
     
-    if existing_doc:
-        # Update existing document
-        # Delete old file
-        old_file_path = Path(existing_doc.file_path)
-        if old_file_path.exists():
-            old_file_path.unlink()
-        
-        # Update database record
-        existing_doc.filename = unique_filename
-        existing_doc.original_filename = file.filename
-        existing_doc.file_path = str(file_path)
-        existing_doc.file_size = len(file_content)
-        existing_doc.mime_type = file.content_type
-        existing_doc.version += 1
-        existing_doc.is_approved = False
-        
-        db.commit()
-        db.refresh(existing_doc)
-        return existing_doc
-    else:
-        # Create new document record
-        db_document = Document(
-            application_id=application_id,
-            document_type=document_type,
-            filename=unique_filename,
-            original_filename=file.filename,
-            file_path=str(file_path),
-            file_size=len(file_content),
-            mime_type=file.content_type,
-            uploaded_by=current_user.id
-        )
-        
-        db.add(db_document)
-        db.commit()
-        db.refresh(db_document)
-        
-        return db_document
+    return MessageResponse(message="بارگذاری لغو شد")
 
 @router.get("/application/{application_id}", response_model=List[DocumentSchema])
 async def get_application_documents(
     application_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get all documents for an application."""
     # Check if application exists and user has access
-    application = db.query(Application).filter(Application.id == application_id).first()
+    application = await db.scalar(select(Application).where(Application.id == application_id))
     if not application:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -151,17 +407,172 @@ async def get_application_documents(
             detail="دسترسی غیرمجاز"
         )
     
-    documents = db.query(Document).filter(Document.application_id == application_id).all()
+    documents = (await db.scalars(select(Document).where(Document.application_id == application_id))).all()
     return documents
 
+# Already compressed; deflating them again only costs CPU
+STORED_EXTENSIONS = {".zip", ".docx", ".pdf"}
+
+class ZipSink(io.RawIOBase):
+    """Write-only, unseekable target for zipfile, emptied after every write."""
+    
+    def __init__(self):
+        self.data = bytearray()
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, b) -> int:
+        self.data += b
+        return len(b)
+    
+    def drain(self) -> bytes:
+        chunk = bytes(self.data)
+        self.data.clear()
+        return chunk
+
+def stream_document_bundle(
+    entries: List[Tuple[str, str, datetime]],
+    manifest: Optional[dict]
+) -> Iterator[bytes]:
+    """Yield a ZIP of (archive name, file path, modified) entries as it is built.
+
+    Each piece of a file is passed on as soon as zipfile has written it, so
+    memory stays at one DOWNLOAD_CHUNK_SIZE and nothing touches disk. A
+    plain generator on purpose: StreamingResponse runs every step in the
+    threadpool, keeping file reads and compression off the event loop.
+    """
+    sink = ZipSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        if manifest is not None:
+            archive.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2))
+            yield sink.drain()
+        for name, file_path, modified in entries:
+            info = zipfile.ZipInfo(name, date_time=modified.timetuple()[:6])
+            if get_file_extension(name) in STORED_EXTENSIONS:
+                info.compress_type = zipfile.ZIP_STORED
+            else:
+                info.compress_type = zipfile.ZIP_DEFLATED
+            with open(file_path, "rb") as source, archive.open(info, "w") as target:
+                while chunk := source.read(settings.DOWNLOAD_CHUNK_SIZE):
+                    target.write(chunk)
+                    yield sink.drain()
+            yield sink.drain()
+    yield sink.drain()
+
+@router.get("/application/{application_id}/bundle")
+async def download_application_bundle(
+    application_id: int,
+    manifest: bool = True,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Download every document of an application as one ZIP, streamed as it is built.
+
+    Files are stored under ``<document type>/<original name>``; with
+    ``manifest`` a manifest.json lists each one with its version and SHA-256.
+    """
+    # Check if application exists and user has access
+    application = await db.scalar(select(Application).where(Application.id == application_id))
+    if not application:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="درخواست مورد نظر یافت نشد"
+        )
+    
+    # Check permissions
+    if current_user.role == UserRole.APPLICANT and application.applicant_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="دسترسی غیرمجاز"
+        )
+    
+    documents = (await db.scalars(
+        select(Document).where(Document.application_id == application_id).order_by(Document.document_type)
+    )).all()
+    
+    entries = []
+    listed = []
+    for document in documents:
+        name = f"{document.document_type.value}/{archive_member_name(document.original_filename, document.filename)}"
+        # Checked now: once streaming starts there is no way to report an error
+        missing = not Path(document.file_path).is_file()
+        if not missing:
+            entries.append((name, document.file_path, document.uploaded_at or datetime.utcnow()))
+        listed.append({
+            "path": name,
+            "document_type": document.document_type.value,
+            "original_filename": document.original_filename,
+            "version": document.version,
+            "file_size": document.file_size,
+            "sha256": document.sha256,
+            "mime_type": document.mime_type,
+            "uploaded_at": document.uploaded_at.isoformat() if document.uploaded_at else None,
+            "is_approved": document.is_approved,
+            "missing": missing,
+        })
+    
+    bundle_manifest = None
+    if manifest:
+        bundle_manifest = {
+            "application_id": application.id,
+            "application_number": application.application_number,
+            "product_name": application.product_name,
+            "generated_at": datetime.utcnow().isoformat(),
+            "documents": listed,
+        }
+    
+    filename = f"{application.application_number or application.id}-documents.zip"
+    return StreamingResponse(
+        stream_document_bundle(entries, bundle_manifest),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/{document_id}/versions", response_model=List[DocumentVersionSchema])
+async def get_document_versions(
+    document_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """List every uploaded version of a document, oldest first."""
+    document = await db.scalar(
+        select(Document).options(selectinload(Document.application)).where(Document.id == document_id)
+    )
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="سند مورد نظر یافت نشد"
+        )
+    
+    # Check permissions
+    if current_user.role == UserRole.APPLICANT and document.application.applicant_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="دسترسی غیرمجاز"
+        )
+    
+    versions = (await db.scalars(
+        select(DocumentVersion).where(DocumentVersion.document_id == document_id).order_by(DocumentVersion.version)
+    )).all()
+    return versions
+
 @router.get("/download/{document_id}")
 async def download_document(
     document_id: int,
+    request: Request,
+    version: Optional[int] = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Download a document."""
-    document = db.query(Document).filter(Document.id == document_id).first()
+    """Download a document; ``version`` selects an earlier upload.
+
+    Supports Range (including several ranges), If-Range and conditional GETs,
+    so interrupted downloads can resume and viewers can fetch single pages.
+    """
+    document = await db.scalar(
+        select(Document).options(selectinload(Document.application)).where(Document.id == document_id)
+    )
     if not document:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -176,27 +587,46 @@ async def download_document(
             detail="دسترسی غیرمجاز"
         )
     
-    file_path = Path(document.file_path)
-    if not file_path.exists():
+    source = document
+    if version is not None and version != document.version:
+        source = await db.scalar(select(DocumentVersion).where(
+            DocumentVersion.document_id == document_id,
+            DocumentVersion.version == version
+        ))
+        if not source:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="نسخه مورد نظر یافت نشد"
+            )
+    
+    file_path = Path(source.file_path)
+    try:
+        stat_result = await aiofiles.os.stat(file_path)
+    except FileNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="فایل یافت نشد"
         )
     
-    return FileResponse(
-        path=file_path,
-        filename=document.original_filename,
-        media_type=document.mime_type
+    return serve_file(
+        request,
+        file_path,
+        stat_result,
+        etag=file_etag(source.sha256, stat_result),
+        filename=source.original_filename,
+        media_type=source.mime_type
     )
 
 @router.delete("/{document_id}", response_model=MessageResponse)
 async def delete_document(
     document_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a document."""
-    document = db.query(Document).filter(Document.id == document_id).first()
+    document = await db.scalar(
+        select(Document).options(selectinload(Document.application)).where(Document.id == document_id)
+    )
     if not document:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -218,14 +648,21 @@ async def delete_document(
                 detail="امکان حذف سند از درخواست ارسال شده وجود ندارد"
             )
     
-    # Delete file from disk
-    file_path = Path(document.file_path)
-    if file_path.exists():
-        file_path.unlink()
+    # Release the blob of every version; files from before the blob store are deleted directly
+    versions = (await db.scalars(select(DocumentVersion).where(DocumentVersion.document_id == document_id))).all()
+    legacy_paths = {version.file_path for version in versions if not version.sha256}
+    if not versions and not blob_store.owns(document.file_path):
+        legacy_paths.add(document.file_path)
+    for version in versions:
+        if version.sha256:
+            await blob_store.release(db, version.sha256)
+        await db.delete(version)
+    for legacy_path in legacy_paths:
+        Path(legacy_path).unlink(missing_ok=True)
     
     # Delete from database
-    db.delete(document)
-    db.commit()
+    await db.delete(document)
+    await db.commit()
     
     return MessageResponse(message="سند با موفقیت حذف شد")
 
@@ -234,10 +671,10 @@ async def approve_document(
     document_id: int,
     approval_notes: str = "",
     current_user: User = Depends(require_role([UserRole.EVALUATOR, UserRole.GOVERNANCE, UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Approve a document (Evaluators and above only)."""
-    document = db.query(Document).filter(Document.id == document_id).first()
+    document = await db.scalar(select(Document).where(Document.id == document_id))
     if not document:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -246,7 +683,7 @@ async def approve_document(
     
     document.is_approved = True
     document.approval_notes = approval_notes
-    db.commit()
+    await db.commit()
     
     return MessageResponse(message="سند تأیید شد")
 
@@ -255,10 +692,10 @@ async def reject_document(
     document_id: int,
     rejection_notes: str,
     current_user: User = Depends(require_role([UserRole.EVALUATOR, UserRole.GOVERNANCE, UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Reject a document (Evaluators and above only)."""
-    document = db.query(Document).filter(Document.id == document_id).first()
+    document = await db.scalar(select(Document).where(Document.id == document_id))
     if not document:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -267,6 +704,6 @@ async def reject_document(
     
     document.is_approved = False
     document.approval_notes = rejection_notes
-    db.commit()
+    await db.commit()
     
     return MessageResponse(message="سند رد شد") 
\ No newline at end of file
@@ -1,27 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, selectinload, undefer_group
 from typing import List, Optional
 from datetime import datetime
 
 from ..database import get_db
 from ..models import Evaluation, Application, User, UserRole, ApplicationStatus
 from ..schemas import (
-    EvaluationCreate, EvaluationUpdate, Evaluation as EvaluationSchema,
+    EvaluationCreate, EvaluationUpdate, Evaluation as EvaluationSchema, EvaluationSummary,
     MessageResponse
 )
-from ..core.auth import get_current_active_user, require_role
+from ..core.auth import get_current_active_user, get_read_db, require_role
+from ..core.config import settings
+from ..core.conditional import check_not_modified, latest, make_etag
+from ..core.pagination import keyset_page, set_next_cursor, set_total_count
+from ..core.serialization import ListSerializer
 
 router = APIRouter()
 
+# Relationships serialized by the EvaluationSummary list schema
+EVALUATION_SUMMARY = (
+    selectinload(Evaluation.evaluator),
+    selectinload(Evaluation.application).selectinload(Application.applicant),
+    selectinload(Evaluation.application).selectinload(Application.product_type),
+)
+
+# The Evaluation schema also serializes the long text columns
+EVALUATION_DETAILS = EVALUATION_SUMMARY + (
+    undefer_group("evaluation_text"),
+    selectinload(Evaluation.application).undefer_group("application_text"),
+)
+
+evaluation_summaries = ListSerializer(EvaluationSummary)
+
+async def load_evaluation_details(db: AsyncSession, evaluation_id: int) -> Optional[Evaluation]:
+    """Load an evaluation with the relationships its schema serializes."""
+    return await db.scalar(
+        select(Evaluation)
+        .options(*EVALUATION_DETAILS)
+        .where(Evaluation.id == evaluation_id)
+        .execution_options(populate_existing=True)
+    )
+
 @router.post("/", response_model=EvaluationSchema)
 async def create_evaluation(
     evaluation_data: EvaluationCreate,
     current_user: User = Depends(require_role([UserRole.EVALUATOR, UserRole.GOVERNANCE, UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create new evaluation (Evaluators and above only)."""
     # Check if application exists
-    application = db.query(Application).filter(Application.id == evaluation_data.application_id).first()
+    application = await db.scalar(select(Application).where(Application.id == evaluation_data.application_id))
     if not application:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -36,9 +66,9 @@ async def create_evaluation(
         )
     
     # Check if evaluation already exists
-    existing_evaluation = db.query(Evaluation).filter(
+    existing_evaluation = await db.scalar(select(Evaluation).where(
         Evaluation.application_id == evaluation_data.application_id
-    ).first()
+    ))
     if existing_evaluation:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -57,41 +87,82 @@ async def create_evaluation(
     application.status = ApplicationStatus.IN_EVALUATION
     
     db.add(db_evaluation)
-    db.commit()
-    db.refresh(db_evaluation)
+    await db.commit()
     
-    return db_evaluation
+    return await load_evaluation_details(db, db_evaluation.id)
 
-@router.get("/", response_model=List[EvaluationSchema])
+@router.get("/", response_model=List[EvaluationSummary])
 async def get_evaluations(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    include_total: bool = False,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get evaluations list based on user role."""
-    query = db.query(Evaluation)
+    """Get evaluations list based on user role, newest first.
+
+    Pass the X-Next-Cursor header of a response as ``cursor`` to fetch the
+    next page.
+    """
+    query = select(Evaluation).options(*EVALUATION_SUMMARY)
     
     if current_user.role == UserRole.EVALUATOR:
         # Evaluators see only their own evaluations
-        query = query.filter(Evaluation.evaluator_id == current_user.id)
+        query = query.where(Evaluation.evaluator_id == current_user.id)
     elif current_user.role == UserRole.APPLICANT:
         # Applicants see evaluations of their applications
-        query = query.join(Application).filter(Application.applicant_id == current_user.id)
+        query = query.join(Application).where(Application.applicant_id == current_user.id)
     # Governance and Admin see all evaluations
     
-    evaluations = query.offset(skip).limit(limit).all()
-    return evaluations
+    if include_total:
+        scope = current_user.role if current_user.role in [UserRole.GOVERNANCE, UserRole.ADMIN] else current_user.id
+        await set_total_count(response, db, ("evaluations", scope), query)
+    
+    evaluations = (await db.scalars(keyset_page(query, Evaluation.created_at, Evaluation.id, cursor, limit))).all()
+    return evaluation_summaries.response(set_next_cursor(response, evaluations, limit), response)
+
+@router.get("/my", response_model=List[EvaluationSummary])
+async def get_my_evaluations(
+    current_user: User = Depends(require_role([UserRole.EVALUATOR])),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get current evaluator's evaluations."""
+    evaluations = (await db.scalars(select(Evaluation).options(*EVALUATION_SUMMARY).where(
+        Evaluation.evaluator_id == current_user.id
+    ))).all()
+    return evaluation_summaries.response(evaluations)
 
 @router.get("/{evaluation_id}", response_model=EvaluationSchema)
 async def get_evaluation(
     evaluation_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get specific evaluation details."""
-    evaluation = db.query(Evaluation).filter(Evaluation.id == evaluation_id).first()
-    if not evaluation:
+    """Get specific evaluation details.
+
+    Answers If-None-Match / If-Modified-Since with 304 after a single
+    version query, without loading the evaluation.
+    """
+    evaluator = aliased(User)
+    applicant = aliased(User)
+    version = (await db.execute(
+        select(
+            Evaluation.evaluator_id,
+            Application.applicant_id,
+            Evaluation.updated_at,
+            Application.updated_at.label("application_updated_at"),
+            evaluator.updated_at.label("evaluator_updated_at"),
+            applicant.updated_at.label("applicant_updated_at"),
+        )
+        .join(Application, Evaluation.application_id == Application.id)
+        .outerjoin(evaluator, Evaluation.evaluator_id == evaluator.id)
+        .outerjoin(applicant, Application.applicant_id == applicant.id)
+        .where(Evaluation.id == evaluation_id)
+    )).first()
+    if not version:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="ارزیابی مورد نظر یافت نشد"
@@ -99,9 +170,9 @@ async def get_evaluation(
     
     # Check permissions
     can_view = False
-    if current_user.role == UserRole.EVALUATOR and evaluation.evaluator_id == current_user.id:
+    if current_user.role == UserRole.EVALUATOR and version.evaluator_id == current_user.id:
         can_view = True
-    elif current_user.role == UserRole.APPLICANT and evaluation.application.applicant_id == current_user.id:
+    elif current_user.role == UserRole.APPLICANT and version.applicant_id == current_user.id:
         can_view = True
     elif current_user.role in [UserRole.GOVERNANCE, UserRole.ADMIN]:
         can_view = True
@@ -112,17 +183,28 @@ async def get_evaluation(
             detail="دسترسی غیرمجاز"
         )
     
-    return evaluation
+    # The payload nests the application and both users, so their updates count too
+    timestamps = (
+        version.updated_at, version.application_updated_at,
+        version.evaluator_updated_at, version.applicant_updated_at
+    )
+    not_modified = check_not_modified(
+        request, response, make_etag("evaluation", evaluation_id, *timestamps), latest(*timestamps)
+    )
+    if not_modified:
+        return not_modified
+    
+    return await load_evaluation_details(db, evaluation_id)
 
 @router.put("/{evaluation_id}", response_model=EvaluationSchema)
 async def update_evaluation(
     evaluation_id: int,
     evaluation_update: EvaluationUpdate,
     current_user: User = Depends(require_role([UserRole.EVALUATOR, UserRole.GOVERNANCE, UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update evaluation."""
-    evaluation = db.query(Evaluation).filter(Evaluation.id == evaluation_id).first()
+    evaluation = await db.scalar(select(Evaluation).where(Evaluation.id == evaluation_id))
     if not evaluation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -142,19 +224,20 @@ async def update_evaluation(
         setattr(evaluation, field, value)
     
     evaluation.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(evaluation)
+    await db.commit()
     
-    return evaluation
+    return await load_evaluation_details(db, evaluation_id)
 
 @router.post("/{evaluation_id}/complete", response_model=MessageResponse)
 async def complete_evaluation(
     evaluation_id: int,
     current_user: User = Depends(require_role([UserRole.EVALUATOR, UserRole.GOVERNANCE, UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Complete evaluation."""
-    evaluation = db.query(Evaluation).filter(Evaluation.id == evaluation_id).first()
+    evaluation = await db.scalar(
+        select(Evaluation).options(selectinload(Evaluation.application)).where(Evaluation.id == evaluation_id)
+    )
     if not evaluation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -182,7 +265,7 @@ async def complete_evaluation(
     # Check if all required reports are created
     from ..models import Report, ReportType
     required_reports = [ReportType.ETR, ReportType.TRP, ReportType.VTR]
-    existing_reports = db.query(Report).filter(Report.evaluation_id == evaluation_id).all()
+    existing_reports = (await db.scalars(select(Report).where(Report.evaluation_id == evaluation_id))).all()
     existing_report_types = [report.report_type for report in existing_reports]
     
     missing_reports = set(required_reports) - set(existing_report_types)
@@ -200,7 +283,7 @@ async def complete_evaluation(
     evaluation.application.status = ApplicationStatus.COMPLETED
     evaluation.application.actual_completion_date = datetime.utcnow()
     
-    db.commit()
+    await db.commit()
     
     return MessageResponse(message="ارزیابی با موفقیت تکمیل شد")
 
@@ -208,11 +291,11 @@ async def complete_evaluation(
 async def get_evaluation_by_application(
     application_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get evaluation for a specific application."""
     # Check if application exists
-    application = db.query(Application).filter(Application.id == application_id).first()
+    application = await db.scalar(select(Application).where(Application.id == application_id))
     if not application:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -232,7 +315,9 @@ async def get_evaluation_by_application(
             detail="دسترسی غیرمجاز"
         )
     
-    evaluation = db.query(Evaluation).filter(Evaluation.application_id == application_id).first()
+    evaluation = await db.scalar(
+        select(Evaluation).options(*EVALUATION_DETAILS).where(Evaluation.application_id == application_id)
+    )
     return evaluation
 
 @router.post("/{evaluation_id}/assign", response_model=MessageResponse)
@@ -240,10 +325,10 @@ async def assign_evaluator(
     evaluation_id: int,
     evaluator_id: int,
     current_user: User = Depends(require_role([UserRole.GOVERNANCE, UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Assign evaluator to evaluation (Governance and Admin only)."""
-    evaluation = db.query(Evaluation).filter(Evaluation.id == evaluation_id).first()
+    evaluation = await db.scalar(select(Evaluation).where(Evaluation.id == evaluation_id))
     if not evaluation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -251,11 +336,11 @@ async def assign_evaluator(
         )
     
     # Check if new evaluator exists and has correct role
-    new_evaluator = db.query(User).filter(
+    new_evaluator = await db.scalar(select(User).where(
         User.id == evaluator_id,
         User.role == UserRole.EVALUATOR,
         User.is_active == True
-    ).first()
+    ))
     
     if not new_evaluator:
         raise HTTPException(
@@ -264,17 +349,6 @@ async def assign_evaluator(
         )
     
     evaluation.evaluator_id = evaluator_id
-    db.commit()
+    await db.commit()
     
     return MessageResponse(message=f"ارزیابی به {new_evaluator.full_name} واگذار شد")
-
-@router.get("/my", response_model=List[EvaluationSchema])
-async def get_my_evaluations(
-    current_user: User = Depends(require_role([UserRole.EVALUATOR])),
-    db: Session = Depends(get_db)
-):
-    """Get current evaluator's evaluations."""
-    evaluations = db.query(Evaluation).filter(
-        Evaluation.evaluator_id == current_user.id
-    ).all()
-    return evaluations 
\ No newline at end of file
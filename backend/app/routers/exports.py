@@ -0,0 +1,179 @@
+import csv
+import enum
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, select
+
+from ..database import get_read_sessionmaker
+from ..models import Application, ApplicationStatus, Evaluation, ProductType, Report, User, UserRole
+from ..core.auth import require_role
+from ..core.config import settings
+
+router = APIRouter()
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+def applications_export_query() -> Select:
+    return (
+        select(
+            Application.id,
+            Application.application_number,
+            Application.product_name,
+            Application.product_version,
+            Application.status,
+            Application.evaluation_level,
+            Application.product_type_id,
+            ProductType.name_en.label("product_type"),
+            Application.applicant_id,
+            User.email.label("applicant_email"),
+            Application.company_name,
+            Application.submission_date,
+            Application.estimated_completion_date,
+            Application.actual_completion_date,
+            Application.created_at,
+            Application.updated_at,
+        )
+        .outerjoin(ProductType, Application.product_type_id == ProductType.id)
+        .outerjoin(User, Application.applicant_id == User.id)
+    )
+
+def evaluations_export_query() -> Select:
+    return (
+        select(
+            Evaluation.id,
+            Evaluation.application_id,
+            Application.application_number,
+            Application.status.label("application_status"),
+            Application.product_type_id,
+            Evaluation.evaluator_id,
+            User.email.label("evaluator_email"),
+            Evaluation.status,
+            Evaluation.start_date,
+            Evaluation.end_date,
+            Evaluation.document_review_completed,
+            Evaluation.security_testing_completed,
+            Evaluation.vulnerability_assessment_completed,
+            Evaluation.overall_score,
+            Evaluation.created_at,
+            Evaluation.updated_at,
+        )
+        .join(Application, Evaluation.application_id == Application.id)
+        .outerjoin(User, Evaluation.evaluator_id == User.id)
+    )
+
+def reports_export_query() -> Select:
+    return (
+        select(
+            Report.id,
+            Report.evaluation_id,
+            Evaluation.application_id,
+            Application.application_number,
+            Application.status.label("application_status"),
+            Application.product_type_id,
+            Report.report_type,
+            Report.title,
+            Report.template_version,
+            Report.is_draft,
+            Report.is_approved,
+            Report.approved_by,
+            Report.approval_date,
+            Report.created_at,
+            Report.updated_at,
+        )
+        .join(Evaluation, Report.evaluation_id == Evaluation.id)
+        .join(Application, Evaluation.application_id == Application.id)
+    )
+
+# entity -> (query builder, ordering column, column the date range applies to)
+EXPORTS = {
+    "applications": (applications_export_query, Application.id, Application.created_at),
+    "evaluations": (evaluations_export_query, Evaluation.id, Evaluation.created_at),
+    "reports": (reports_export_query, Report.id, Report.created_at),
+}
+
+def export_value(value):
+    """Convert a column value into something JSON and CSV can carry."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+async def stream_export(query: Select, export_format: str, subject: str) -> AsyncIterator[bytes]:
+    """Yield the query's rows as NDJSON or CSV, one chunk of rows at a time.
+
+    Rows come from a server-side cursor, so memory stays flat however many
+    rows match. The session is opened here because the response body is
+    produced after the endpoint has returned.
+    """
+    async with get_read_sessionmaker(subject)() as db:
+        result = await db.stream(query.execution_options(yield_per=settings.EXPORT_CHUNK_SIZE))
+        columns = list(result.keys())
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if export_format == "csv":
+            writer.writerow(columns)
+
+        async for partition in result.partitions():
+            for row in partition:
+                values = [export_value(value) for value in row]
+                if export_format == "csv":
+                    writer.writerow(values)
+                else:
+                    buffer.write(json.dumps(dict(zip(columns, values)), ensure_ascii=False))
+                    buffer.write("\n")
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            # CSV header of an empty export
+            yield buffer.getvalue().encode("utf-8")
+
+@router.get("/{entity}")
+async def export_entity(
+    entity: str,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    status_filter: Optional[ApplicationStatus] = Query(None, alias="status"),
+    product_type_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: User = Depends(require_role([UserRole.GOVERNANCE, UserRole.ADMIN]))
+):
+    """Stream applications, evaluations or reports as NDJSON or CSV (Governance and Admin only).
+
+    ``status`` and ``product_type_id`` filter on the related application;
+    ``created_from`` / ``created_to`` bound the exported rows' own creation time.
+    """
+    if entity not in EXPORTS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="نوع خروجی پشتیبانی نمی‌شود"
+        )
+    build_query, id_column, created_column = EXPORTS[entity]
+
+    query = build_query()
+    if status_filter:
+        query = query.where(Application.status == status_filter)
+    if product_type_id is not None:
+        query = query.where(Application.product_type_id == product_type_id)
+    if created_from:
+        query = query.where(created_column >= created_from)
+    if created_to:
+        query = query.where(created_column < created_to)
+    query = query.order_by(id_column)
+
+    filename = f"{entity}-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+    return StreamingResponse(
+        stream_export(query, format, current_user.email),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -1,17 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, undefer_group
+from typing import List, Optional
 
 from ..database import get_db
-from ..models import Report, Evaluation, User, UserRole, ReportType
+from ..models import Report, Evaluation, Application, User, UserRole, ReportType
 from ..schemas import (
-    ReportCreate, ReportUpdate, Report as ReportSchema,
+    ReportCreate, ReportUpdate, Report as ReportSchema, ReportSummary,
     MessageResponse
 )
-from ..core.auth import get_current_active_user, require_role
+from ..core.auth import get_current_active_user, get_read_db, require_role
+from ..core.conditional import check_not_modified, make_etag
+from ..core.serialization import ListSerializer
 
 router = APIRouter()
 
+report_summaries = ListSerializer(ReportSummary)
+
 # Report templates for different types
 REPORT_TEMPLATES = {
     ReportType.ETR: {
@@ -90,15 +96,27 @@ REPORT_TEMPLATES = {
     }
 }
 
+async def load_report_details(db: AsyncSession, report_id: int) -> Optional[Report]:
+    """Load a report with its content and the evaluation its permission checks read."""
+    return await db.scalar(
+        select(Report)
+        .options(
+            undefer_group("report_text"),
+            selectinload(Report.evaluation).selectinload(Evaluation.application),
+        )
+        .where(Report.id == report_id)
+        .execution_options(populate_existing=True)
+    )
+
 @router.post("/", response_model=ReportSchema)
 async def create_report(
     report_data: ReportCreate,
     current_user: User = Depends(require_role([UserRole.EVALUATOR, UserRole.GOVERNANCE, UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create new report."""
     # Check if evaluation exists
-    evaluation = db.query(Evaluation).filter(Evaluation.id == report_data.evaluation_id).first()
+    evaluation = await db.scalar(select(Evaluation).where(Evaluation.id == report_data.evaluation_id))
     if not evaluation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -113,10 +131,10 @@ async def create_report(
         )
     
     # Check if report of this type already exists
-    existing_report = db.query(Report).filter(
+    existing_report = await db.scalar(select(Report).where(
         Report.evaluation_id == report_data.evaluation_id,
         Report.report_type == report_data.report_type
-    ).first()
+    ))
     
     if existing_report:
         raise HTTPException(
@@ -142,20 +160,21 @@ async def create_report(
     )
     
     db.add(db_report)
-    db.commit()
-    db.refresh(db_report)
+    await db.commit()
     
-    return db_report
+    return await load_report_details(db, db_report.id)
 
-@router.get("/evaluation/{evaluation_id}", response_model=List[ReportSchema])
+@router.get("/evaluation/{evaluation_id}", response_model=List[ReportSummary])
 async def get_evaluation_reports(
     evaluation_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all reports for an evaluation."""
     # Check if evaluation exists
-    evaluation = db.query(Evaluation).filter(Evaluation.id == evaluation_id).first()
+    evaluation = await db.scalar(
+        select(Evaluation).options(selectinload(Evaluation.application)).where(Evaluation.id == evaluation_id)
+    )
     if not evaluation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -177,29 +196,39 @@ async def get_evaluation_reports(
             detail="دسترسی غیرمجاز"
         )
     
-    reports = db.query(Report).filter(Report.evaluation_id == evaluation_id).all()
-    return reports
+    reports = (await db.scalars(select(Report).where(Report.evaluation_id == evaluation_id))).all()
+    return report_summaries.response(reports)
 
 @router.get("/{report_id}", response_model=ReportSchema)
 async def get_report(
     report_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get specific report details."""
-    report = db.query(Report).filter(Report.id == report_id).first()
-    if not report:
+    """Get specific report details.
+
+    Answers If-None-Match / If-Modified-Since with 304 after a single
+    version query, without loading the report content.
+    """
+    version = (await db.execute(
+        select(Report.updated_at, Evaluation.evaluator_id, Application.applicant_id)
+        .join(Evaluation, Report.evaluation_id == Evaluation.id)
+        .join(Application, Evaluation.application_id == Application.id)
+        .where(Report.id == report_id)
+    )).first()
+    if not version:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="گزارش مورد نظر یافت نشد"
         )
     
     # Check permissions
-    evaluation = report.evaluation
     can_view = False
-    if current_user.role == UserRole.EVALUATOR and evaluation.evaluator_id == current_user.id:
+    if current_user.role == UserRole.EVALUATOR and version.evaluator_id == current_user.id:
         can_view = True
-    elif current_user.role == UserRole.APPLICANT and evaluation.application.applicant_id == current_user.id:
+    elif current_user.role == UserRole.APPLICANT and version.applicant_id == current_user.id:
         can_view = True
     elif current_user.role in [UserRole.GOVERNANCE, UserRole.ADMIN]:
         can_view = True
@@ -210,17 +239,23 @@ async def get_report(
             detail="دسترسی غیرمجاز"
         )
     
-    return report
+    not_modified = check_not_modified(
+        request, response, make_etag("report", report_id, version.updated_at), version.updated_at
+    )
+    if not_modified:
+        return not_modified
+    
+    return await load_report_details(db, report_id)
 
 @router.put("/{report_id}", response_model=ReportSchema)
 async def update_report(
     report_id: int,
     report_update: ReportUpdate,
     current_user: User = Depends(require_role([UserRole.EVALUATOR, UserRole.GOVERNANCE, UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update report."""
-    report = db.query(Report).filter(Report.id == report_id).first()
+    report = await load_report_details(db, report_id)
     if not report:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -249,19 +284,22 @@ async def update_report(
     
     from datetime import datetime
     report.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(report)
+    await db.commit()
     
-    return report
+    return await load_report_details(db, report_id)
 
 @router.post("/{report_id}/finalize", response_model=MessageResponse)
 async def finalize_report(
     report_id: int,
     current_user: User = Depends(require_role([UserRole.EVALUATOR, UserRole.GOVERNANCE, UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Finalize report (mark as non-draft)."""
-    report = db.query(Report).filter(Report.id == report_id).first()
+    report = await db.scalar(
+        select(Report).options(
+            selectinload(Report.evaluation).selectinload(Evaluation.application)
+        ).where(Report.id == report_id)
+    )
     if not report:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -283,7 +321,7 @@ async def finalize_report(
         )
     
     report.is_draft = False
-    db.commit()
+    await db.commit()
     
     return MessageResponse(message="گزارش نهایی شد")
 
@@ -291,10 +329,10 @@ async def finalize_report(
 async def approve_report(
     report_id: int,
     current_user: User = Depends(require_role([UserRole.GOVERNANCE, UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Approve report (Governance and Admin only)."""
-    report = db.query(Report).filter(Report.id == report_id).first()
+    report = await db.scalar(select(Report).where(Report.id == report_id))
     if not report:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -317,7 +355,7 @@ async def approve_report(
     report.is_approved = True
     report.approved_by = current_user.id
     report.approval_date = datetime.utcnow()
-    db.commit()
+    await db.commit()
     
     return MessageResponse(message="گزارش تأیید شد")
 
@@ -325,10 +363,14 @@ async def approve_report(
 async def delete_report(
     report_id: int,
     current_user: User = Depends(require_role([UserRole.EVALUATOR, UserRole.GOVERNANCE, UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete report."""
-    report = db.query(Report).filter(Report.id == report_id).first()
+    report = await db.scalar(
+        select(Report).options(
+            selectinload(Report.evaluation).selectinload(Evaluation.application)
+        ).where(Report.id == report_id)
+    )
     if not report:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -350,7 +392,7 @@ async def delete_report(
             detail="امکان حذف گزارش تأیید شده وجود ندارد"
         )
     
-    db.delete(report)
-    db.commit()
+    await db.delete(report)
+    await db.commit()
     
     return MessageResponse(message="گزارش حذف شد") 
\ No newline at end of file
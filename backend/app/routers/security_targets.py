@@ -1,5 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, undefer_group
 from typing import List, Optional
 from datetime import datetime
 
@@ -12,21 +14,53 @@ from ..schemas import (
     SecurityTargetCreate, SecurityTargetUpdate, SecurityTarget as SecurityTargetSchema,
     ProductClassSchema, STClassSelectionCreate, EvaluationHelpSchema
 )
-from ..core.auth import get_current_active_user
+from ..core.auth import get_current_active_user, get_read_db
+from ..core.conditional import check_not_modified, latest, make_etag
 
 router = APIRouter()
 
 @router.get("/product-types/{product_type_id}/classes", response_model=List[ProductClassSchema])
 async def get_product_classes(
     product_type_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get all classes for a specific product type."""
-    classes = db.query(ProductClass).filter(
+    """Get all classes for a specific product type.
+
+    The catalog's version is the count and latest update of its classes and
+    subclasses, so If-None-Match / If-Modified-Since are answered with 304
+    after one aggregate query.
+    """
+    version = (await db.execute(
+        select(
+            func.count(func.distinct(ProductClass.id)).label("classes"),
+            func.max(ProductClass.updated_at).label("classes_updated_at"),
+            func.count(ProductSubclass.id).label("subclasses"),
+            func.max(ProductSubclass.updated_at).label("subclasses_updated_at"),
+        )
+        .select_from(ProductClass)
+        .outerjoin(ProductSubclass, ProductSubclass.product_class_id == ProductClass.id)
+        .where(
+            ProductClass.product_type_id == product_type_id,
+            ProductClass.is_active == True
+        )
+    )).one()
+    not_modified = check_not_modified(
+        request, response,
+        make_etag("product-classes", product_type_id, *version),
+        latest(version.classes_updated_at, version.subclasses_updated_at)
+    )
+    if not_modified:
+        return not_modified
+    
+    classes = (await db.scalars(select(ProductClass).options(
+        selectinload(ProductClass.subclasses)
+    ).where(
         ProductClass.product_type_id == product_type_id,
         ProductClass.is_active == True
-    ).order_by(ProductClass.order).all()
+    ).order_by(ProductClass.order))).all()
     
     return classes
 
@@ -34,11 +68,11 @@ async def get_product_classes(
 async def get_security_target(
     application_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get security target for an application."""
     # Check application access
-    application = db.query(Application).filter(Application.id == application_id).first()
+    application = await db.scalar(select(Application).where(Application.id == application_id))
     if not application:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -53,9 +87,9 @@ async def get_security_target(
         )
     
     # Get or create security target
-    security_target = db.query(SecurityTarget).filter(
+    security_target = await db.scalar(select(SecurityTarget).where(
         SecurityTarget.application_id == application_id
-    ).first()
+    ))
     
     if not security_target:
         security_target = SecurityTarget(
@@ -63,13 +97,16 @@ async def get_security_target(
             status="draft"
         )
         db.add(security_target)
-        db.commit()
-        db.refresh(security_target)
+        await db.commit()
+        await db.refresh(security_target)
     
     # Load class selections with related data
-    security_target.class_selections = db.query(STClassSelection).filter(
-        STClassSelection.security_target_id == security_target.id
-    ).all()
+    security_target = await db.scalar(
+        select(SecurityTarget)
+        .options(selectinload(SecurityTarget.class_selections))
+        .where(SecurityTarget.id == security_target.id)
+        .execution_options(populate_existing=True)
+    )
     
     return security_target
 
@@ -78,11 +115,11 @@ async def add_class_selection(
     application_id: int,
     selection: STClassSelectionCreate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Add or update a class selection in the security target."""
     # Check application access
-    application = db.query(Application).filter(Application.id == application_id).first()
+    application = await db.scalar(select(Application).where(Application.id == application_id))
     if not application:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -97,9 +134,9 @@ async def add_class_selection(
         )
     
     # Get security target
-    security_target = db.query(SecurityTarget).filter(
+    security_target = await db.scalar(select(SecurityTarget).where(
         SecurityTarget.application_id == application_id
-    ).first()
+    ))
     
     if not security_target:
         security_target = SecurityTarget(
@@ -107,15 +144,15 @@ async def add_class_selection(
             status="draft"
         )
         db.add(security_target)
-        db.commit()
-        db.refresh(security_target)
+        await db.commit()
+        await db.refresh(security_target)
     
     # Check if selection already exists
-    existing = db.query(STClassSelection).filter(
+    existing = await db.scalar(select(STClassSelection).where(
         STClassSelection.security_target_id == security_target.id,
         STClassSelection.product_class_id == selection.product_class_id,
         STClassSelection.product_subclass_id == selection.product_subclass_id
-    ).first()
+    ))
     
     if existing:
         # Update existing
@@ -135,7 +172,7 @@ async def add_class_selection(
         )
         db.add(new_selection)
     
-    db.commit()
+    await db.commit()
     
     return {"message": "Class selection saved successfully"}
 
@@ -144,11 +181,11 @@ async def remove_class_selection(
     application_id: int,
     selection_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Remove a class selection from the security target."""
     # Check application access
-    application = db.query(Application).filter(Application.id == application_id).first()
+    application = await db.scalar(select(Application).where(Application.id == application_id))
     if not application:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -162,9 +199,9 @@ async def remove_class_selection(
             detail="Only applicants can modify their security targets"
         )
     
-    selection = db.query(STClassSelection).filter(
+    selection = await db.scalar(select(STClassSelection).where(
         STClassSelection.id == selection_id
-    ).first()
+    ))
     
     if not selection:
         raise HTTPException(
@@ -172,8 +209,8 @@ async def remove_class_selection(
             detail="Selection not found"
         )
     
-    db.delete(selection)
-    db.commit()
+    await db.delete(selection)
+    await db.commit()
     
     return {"message": "Class selection removed successfully"}
 
@@ -182,19 +219,19 @@ async def get_evaluation_help(
     class_id: int,
     subclass_id: Optional[int] = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get evaluation help for a specific class or subclass."""
-    query = db.query(EvaluationHelp).filter(
+    query = select(EvaluationHelp).options(undefer_group("help_text")).where(
         EvaluationHelp.product_class_id == class_id
     )
     
     if subclass_id:
-        query = query.filter(EvaluationHelp.product_subclass_id == subclass_id)
+        query = query.where(EvaluationHelp.product_subclass_id == subclass_id)
     else:
-        query = query.filter(EvaluationHelp.product_subclass_id == None)
+        query = query.where(EvaluationHelp.product_subclass_id == None)
     
-    help_text = query.first()
+    help_text = await db.scalar(query)
     
     if not help_text:
         raise HTTPException(
@@ -208,11 +245,11 @@ async def get_evaluation_help(
 async def submit_security_target(
     application_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Submit security target for evaluation."""
     # Check application access
-    application = db.query(Application).filter(Application.id == application_id).first()
+    application = await db.scalar(select(Application).where(Application.id == application_id))
     if not application:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -226,9 +263,9 @@ async def submit_security_target(
             detail="Only applicants can submit their security targets"
         )
     
-    security_target = db.query(SecurityTarget).filter(
+    security_target = await db.scalar(select(SecurityTarget).where(
         SecurityTarget.application_id == application_id
-    ).first()
+    ))
     
     if not security_target:
         raise HTTPException(
@@ -237,9 +274,9 @@ async def submit_security_target(
         )
     
     # Check if at least one class is selected
-    selections = db.query(STClassSelection).filter(
+    selections = await db.scalar(select(func.count(STClassSelection.id)).where(
         STClassSelection.security_target_id == security_target.id
-    ).count()
+    ))
     
     if selections == 0:
         raise HTTPException(
@@ -255,7 +292,7 @@ async def submit_security_target(
     application.status = ApplicationStatus.SUBMITTED
     application.submission_date = datetime.utcnow()
     
-    db.commit()
+    await db.commit()
     
     return {"message": "Security target submitted successfully"}
 
@@ -264,7 +301,7 @@ async def evaluate_class_selection(
     selection_id: int,
     evaluation_data: dict,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Evaluate a class selection (Evaluators only)."""
     # Check if user is an evaluator
@@ -275,9 +312,9 @@ async def evaluate_class_selection(
         )
     
     # Get the class selection
-    selection = db.query(STClassSelection).filter(
+    selection = await db.scalar(select(STClassSelection).where(
         STClassSelection.id == selection_id
-    ).first()
+    ))
     
     if not selection:
         raise HTTPException(
@@ -291,7 +328,7 @@ async def evaluate_class_selection(
     selection.evaluator_notes = evaluation_data.get("evaluator_notes")
     selection.updated_at = datetime.utcnow()
     
-    db.commit()
-    db.refresh(selection)
+    await db.commit()
+    await db.refresh(selection)
     
     return selection 
\ No newline at end of file
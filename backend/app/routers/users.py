@@ -1,14 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
 from ..database import get_db
 from ..models import User, UserRole, ProductType
 from ..schemas import User as UserSchema, UserUpdate, ProductType as ProductTypeSchema
-from ..core.auth import get_current_active_user, require_role
+from ..core.auth import get_current_active_user, require_role, invalidate_principal
+from ..core.cache import TTLCache
+from ..core.config import settings
 
 router = APIRouter()
 
+# Active product types only change through the admin API, which clears this cache
+product_type_cache = TTLCache(maxsize=1, ttl=settings.REFERENCE_CACHE_TTL_SECONDS)
+
+async def load_active_product_types(db: AsyncSession) -> List[ProductTypeSchema]:
+    """Return active product types, reading the database only on a cache miss."""
+    product_types = product_type_cache.get("active")
+    if product_types is None:
+        rows = (await db.scalars(select(ProductType).where(ProductType.is_active == True))).all()
+        product_types = [ProductTypeSchema.model_validate(row) for row in rows]
+        product_type_cache.set("active", product_types)
+    return product_types
+
 @router.get("/me", response_model=UserSchema)
 async def get_current_user_profile(current_user: User = Depends(get_current_active_user)):
     """Get current user profile."""
@@ -18,39 +33,43 @@ async def get_current_user_profile(current_user: User = Depends(get_current_acti
 async def update_current_user_profile(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update current user profile."""
+    # current_user may come from the principal cache, so load a copy
+    # attached to this session before changing it
+    user = await db.scalar(select(User).where(User.id == current_user.id))
+    
     # Update fields
     update_data = user_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         if field != "is_active":  # Users can't change their own active status
-            setattr(current_user, field, value)
+            setattr(user, field, value)
     
     from datetime import datetime
-    current_user.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(current_user)
+    user.updated_at = datetime.utcnow()
+    await db.commit()
+    await db.refresh(user)
+    invalidate_principal(user.email)
     
-    return current_user
+    return user
 
 @router.get("/evaluators", response_model=List[UserSchema])
 async def get_evaluators(
     current_user: User = Depends(require_role([UserRole.GOVERNANCE, UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get list of evaluators (Governance and Admin only)."""
-    evaluators = db.query(User).filter(
+    evaluators = (await db.scalars(select(User).where(
         User.role == UserRole.EVALUATOR,
         User.is_active == True
-    ).all()
+    ))).all()
     return evaluators
 
 @router.get("/product-types", response_model=List[ProductTypeSchema])
 async def get_product_types(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get list of available product types."""
-    product_types = db.query(ProductType).filter(ProductType.is_active == True).all()
-    return product_types 
\ No newline at end of file
+    return await load_active_product_types(db) 
\ No newline at end of file
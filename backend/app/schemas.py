@@ -37,11 +37,21 @@ class User(UserBase):
 # Authentication schemas
 class Token(BaseModel):
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str
     user: User
 
+class TokenPair(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
 class TokenData(BaseModel):
     email: Optional[str] = None
+    token_version: int = 0
 
 class LoginRequest(BaseModel):
     email: EmailStr
@@ -122,6 +132,30 @@ class ApplicationSummary(BaseModel):
     class Config:
         from_attributes = True
 
+class ApplicationBrief(BaseModel):
+    """Application nested in list entries, without its long text fields."""
+    id: int
+    application_number: str
+    product_name: str
+    product_version: Optional[str] = None
+    product_type_id: int
+    technical_contact: Optional[str] = None
+    business_contact: Optional[str] = None
+    applicant_id: int
+    status: ApplicationStatus
+    submission_date: Optional[datetime] = None
+    estimated_completion_date: Optional[datetime] = None
+    actual_completion_date: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
+
+    # Related objects
+    applicant: User
+    product_type: ProductType
+
+    class Config:
+        from_attributes = True
+
 # Document schemas
 class DocumentBase(BaseModel):
     document_type: DocumentType
@@ -136,6 +170,7 @@ class Document(DocumentBase):
     filename: str
     original_filename: str
     file_size: int
+    sha256: Optional[str] = None
     mime_type: str
     is_approved: bool
     approval_notes: Optional[str] = None
@@ -144,6 +179,39 @@ class Document(DocumentBase):
     class Config:
         from_attributes = True
 
+class DocumentVersion(BaseModel):
+    id: int
+    document_id: int
+    version: int
+    sha256: Optional[str] = None
+    file_size: Optional[int] = None
+    original_filename: str
+    mime_type: Optional[str] = None
+    uploaded_at: datetime
+    uploaded_by: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    size: int
+    mime_type: Optional[str] = None
+
+class UploadSession(BaseModel):
+    id: str
+    application_id: int
+    document_type: DocumentType
+    original_filename: str
+    mime_type: Optional[str] = None
+    total_size: int
+    offset: int
+    created_at: datetime
+    expires_at: datetime
+
+    class Config:
+        from_attributes = True
+
 # Evaluation schemas
 class EvaluationBase(BaseModel):
     findings: Optional[str] = None
@@ -183,6 +251,28 @@ class Evaluation(EvaluationBase):
     class Config:
         from_attributes = True
 
+class EvaluationSummary(BaseModel):
+    """Evaluation list entry; findings and recommendations come from the detail endpoint."""
+    id: int
+    application_id: int
+    evaluator_id: int
+    start_date: datetime
+    end_date: Optional[datetime] = None
+    status: str
+    document_review_completed: bool
+    security_testing_completed: bool
+    vulnerability_assessment_completed: bool
+    overall_score: Optional[float] = None
+    created_at: datetime
+    updated_at: datetime
+
+    # Related objects
+    evaluator: User
+    application: ApplicationBrief
+
+    class Config:
+        from_attributes = True
+
 # Report schemas
 class ReportBase(BaseModel):
     report_type: ReportType
@@ -212,7 +302,34 @@ class Report(ReportBase):
     class Config:
         from_attributes = True
 
+class ReportSummary(BaseModel):
+    """Report list entry; the content comes from the detail endpoint."""
+    id: int
+    evaluation_id: int
+    report_type: ReportType
+    title: str
+    template_version: str
+    is_draft: bool
+    is_approved: bool
+    approved_by: Optional[int] = None
+    approval_date: Optional[datetime] = None
+    file_path: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
 # Dashboard schemas
+class ApplicationStatusCount(BaseModel):
+    status: ApplicationStatus
+    count: int
+
+class ProductTypeCount(BaseModel):
+    product_type_id: Optional[int] = None
+    product_type_name: Optional[str] = None
+    count: int
+
 class DashboardStats(BaseModel):
     total_applications: int = 0
     pending_applications: int = 0
@@ -220,10 +337,8 @@ class DashboardStats(BaseModel):
     completed_applications: int = 0
     my_applications: Optional[int] = None
     my_evaluations: Optional[int] = None
-
-class ApplicationStatusCount(BaseModel):
-    status: ApplicationStatus
-    count: int
+    by_status: List[ApplicationStatusCount] = []
+    by_product_type: List[ProductTypeCount] = []
 
 # Protection Profile schemas
 class ProtectionProfileBase(BaseModel):
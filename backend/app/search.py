@@ -0,0 +1,220 @@
+"""Full-text search over applications.
+
+Each application has one search document: product name, company name,
+description, application number and applicant name, run through
+``normalize_persian``. The documents live in ``application_search``:
+an FTS5 table on SQLite, or a table with a generated tsvector column and
+a GIN index on PostgreSQL. A flush hook rewrites the documents of
+applications (and of applicants whose name changed) in the same
+transaction, so the index never lags behind the data.
+
+The table is created by migration 0005, or by ``Base.metadata.create_all``
+through the after_create hook below. It is not a mapped model.
+"""
+import re
+from typing import Iterable, List, Optional
+
+from sqlalchemy import Select, column, event, func, select, table, text
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import PASSIVE_NO_INITIALIZE, get_history
+
+from .database import Base
+from .models import Application, User
+
+SEARCH_TABLE = "application_search"
+
+# Lightweight handles for queries against the unmapped search table
+sqlite_search = table(SEARCH_TABLE, column("rowid"), column("document"))
+postgresql_search = table(SEARCH_TABLE, column("application_id"), column("tsv"))
+
+_CHAR_MAP = str.maketrans({
+    "\u064a": "\u06cc",  # Arabic yeh -> Persian yeh
+    "\u0649": "\u06cc",  # alef maksura -> Persian yeh
+    "\u0643": "\u06a9",  # Arabic kaf -> Persian kaf
+    "\u0640": None,      # tatweel
+    **{chr(0x06F0 + digit): str(digit) for digit in range(10)},  # Persian digits
+    **{chr(0x0660 + digit): str(digit) for digit in range(10)},  # Arabic-Indic digits
+})
+_DIACRITICS = re.compile("[\u064b-\u065f\u0670]")
+_ZWNJ = "\u200c"
+_ZWNJ_WORDS = re.compile(r"\S*\u200c\S*")
+_TOKENS = re.compile(r"\w+")
+
+
+def normalize_persian(value: str, keep_joined: bool = True) -> str:
+    """Fold the spelling variants Persian text is commonly typed with.
+
+    Arabic yeh/kaf become their Persian forms, diacritics and tatweel are
+    dropped, Persian and Arabic-Indic digits become ASCII and Latin text is
+    case-folded. A zero-width non-joiner splits a word into its parts;
+    with ``keep_joined`` the joined spelling is kept as well, so "می‌شود"
+    is found by "می شود" and by "میشود".
+    """
+    value = _DIACRITICS.sub("", value.translate(_CHAR_MAP)).casefold()
+    parts = [value.replace(_ZWNJ, " ")]
+    if keep_joined:
+        parts += [word.replace(_ZWNJ, "") for word in _ZWNJ_WORDS.findall(value)]
+    return " ".join(parts)
+
+
+def search_tokens(query: str) -> List[str]:
+    """Split a user query into normalized search terms."""
+    return _TOKENS.findall(normalize_persian(query, keep_joined=False))
+
+
+def build_document(*fields: Optional[str]) -> str:
+    return normalize_persian(" ".join(field for field in fields if field))
+
+
+# Documents are assembled from the database so every field is current
+DOCUMENT_QUERY = (
+    select(
+        Application.id,
+        Application.product_name,
+        Application.company_name,
+        Application.description,
+        Application.application_number,
+        User.full_name,
+        User.company,
+    )
+    .outerjoin(User, Application.applicant_id == User.id)
+)
+
+
+def _supported(connection) -> bool:
+    return connection.dialect.name in ("sqlite", "postgresql")
+
+
+def create_search_index(connection) -> None:
+    """Create the search table for the connection's dialect."""
+    if connection.dialect.name == "sqlite":
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+            "USING fts5(document, tokenize = 'unicode61 remove_diacritics 2')"
+        ))
+    elif connection.dialect.name == "postgresql":
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+            "application_id INTEGER PRIMARY KEY REFERENCES applications(id) ON DELETE CASCADE, "
+            "document TEXT NOT NULL, "
+            "tsv tsvector GENERATED ALWAYS AS (to_tsvector('simple', document)) STORED)"
+        ))
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_tsv ON {SEARCH_TABLE} USING GIN (tsv)"
+        ))
+
+
+def drop_search_index(connection) -> None:
+    if _supported(connection):
+        connection.execute(text(f"DROP TABLE IF EXISTS {SEARCH_TABLE}"))
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_search_index(target, connection, **kw):
+    create_search_index(connection)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_search_index(target, connection, **kw):
+    drop_search_index(connection)
+
+
+def _delete_documents(connection, application_ids: Iterable[int]) -> None:
+    key = "rowid" if connection.dialect.name == "sqlite" else "application_id"
+    for application_id in application_ids:
+        connection.execute(
+            text(f"DELETE FROM {SEARCH_TABLE} WHERE {key} = :id"), {"id": application_id}
+        )
+
+
+def reindex_applications(connection, application_ids: Optional[Iterable[int]] = None) -> int:
+    """Rewrite the search documents of the given applications, or of all of them."""
+    if not _supported(connection):
+        return 0
+    query = DOCUMENT_QUERY
+    if application_ids is not None:
+        application_ids = list(application_ids)
+        if not application_ids:
+            return 0
+        query = query.where(Application.id.in_(application_ids))
+        if connection.dialect.name == "sqlite":
+            _delete_documents(connection, application_ids)
+    elif connection.dialect.name == "sqlite":
+        connection.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+
+    if connection.dialect.name == "sqlite":
+        insert = text(f"INSERT INTO {SEARCH_TABLE} (rowid, document) VALUES (:id, :document)")
+    else:
+        insert = text(
+            f"INSERT INTO {SEARCH_TABLE} (application_id, document) VALUES (:id, :document) "
+            "ON CONFLICT (application_id) DO UPDATE SET document = excluded.document"
+        )
+    rows = [
+        {"id": row.id, "document": build_document(
+            row.product_name, row.company_name, row.description,
+            row.application_number, row.full_name, row.company
+        )}
+        for row in connection.execute(query)
+    ]
+    if rows:
+        connection.execute(insert, rows)
+    return len(rows)
+
+
+INDEXED_APPLICATION_ATTRS = ("product_name", "company_name", "description", "application_number", "applicant_id")
+INDEXED_USER_ATTRS = ("full_name", "company")
+
+
+def _changed(obj, attrs) -> bool:
+    # Deferred columns that were never loaded cannot have changed; don't load them to find out
+    return any(get_history(obj, attr, PASSIVE_NO_INITIALIZE).has_changes() for attr in attrs)
+
+
+@event.listens_for(Session, "after_flush")
+def _update_search_index(session, flush_context):
+    connection = session.connection()
+    if not _supported(connection):
+        return
+
+    stale = {obj.id for obj in session.new if isinstance(obj, Application)}
+    stale |= {
+        obj.id for obj in session.dirty
+        if isinstance(obj, Application) and _changed(obj, INDEXED_APPLICATION_ATTRS)
+    }
+    renamed_users = [
+        obj.id for obj in session.dirty
+        if isinstance(obj, User) and _changed(obj, INDEXED_USER_ATTRS)
+    ]
+    if renamed_users:
+        stale |= set(connection.scalars(
+            select(Application.id).where(Application.applicant_id.in_(renamed_users))
+        ))
+    deleted = [obj.id for obj in session.deleted if isinstance(obj, Application)]
+
+    if stale:
+        reindex_applications(connection, stale)
+    if deleted:
+        _delete_documents(connection, deleted)
+
+
+def search_applications(query: Select, dialect_name: str, tokens: List[str]) -> Optional[Select]:
+    """Restrict an applications query to matches for every token, best first.
+
+    Tokens are prefix-matched, so "امنیت" also finds "امنیتی". Returns None
+    when the dialect has no search index.
+    """
+    if dialect_name == "sqlite":
+        match_query = " ".join(f'"{token}"*' for token in tokens)
+        return (
+            query.join(sqlite_search, sqlite_search.c.rowid == Application.id)
+            .where(sqlite_search.c.document.op("MATCH")(match_query))
+            .order_by(text(f"bm25({SEARCH_TABLE})"), Application.id.desc())
+        )
+    if dialect_name == "postgresql":
+        ts_query = func.to_tsquery("simple", " & ".join(f"{token}:*" for token in tokens))
+        return (
+            query.join(postgresql_search, postgresql_search.c.application_id == Application.id)
+            .where(postgresql_search.c.tsv.op("@@")(ts_query))
+            .order_by(func.ts_rank(postgresql_search.c.tsv, ts_query).desc(), Application.id.desc())
+        )
+    return None
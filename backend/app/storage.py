@@ -0,0 +1,312 @@
+"""Content-addressed storage for uploaded documents.
+
+Each distinct file is stored once, under UPLOAD_DIR/blobs/ab/cd/<sha256>,
+and the ``blobs`` table counts the DocumentVersion rows that use it.
+Identical uploads share one blob and superseded versions cost nothing
+extra. Blobs are only removed by ``collect_garbage`` (see gc_blobs.py),
+once unreferenced for a grace period, never inline by a request.
+
+Resumable uploads write their chunks straight into one file per session
+under UPLOAD_DIR/blobs/sessions, at the offset each chunk declares; on
+completion that file is hashed and moved into the store like any upload.
+
+A new reference is recorded (and its row locked by the request's
+transaction) before the blob file is moved into place. The collector
+deletes the row and unlinks the file in one transaction, so it can never
+remove a file that a concurrent upload is about to use.
+"""
+import asyncio
+import hashlib
+import os
+import shutil
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import AsyncIterator, Optional, Tuple
+
+import aiofiles
+import aiofiles.os
+from fastapi import HTTPException, status
+from starlette.requests import ClientDisconnect
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .core.config import settings
+from .models import Blob, UploadSession
+
+
+def file_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail="حجم فایل بیش از حد مجاز است"
+    )
+
+
+@dataclass
+class StagedBlob:
+    """A fully received file waiting to be moved into the store."""
+    temp_path: Path
+    sha256: str
+    size: int
+
+
+class BlobStore:
+    def __init__(self, root: Optional[str] = None):
+        self._root = root
+
+    @property
+    def blob_dir(self) -> Path:
+        return Path(self._root or settings.UPLOAD_DIR) / "blobs"
+
+    @property
+    def staging_dir(self) -> Path:
+        # Inside blob_dir, so moving a staged file into place is a rename
+        return self.blob_dir / "staging"
+
+    @property
+    def sessions_dir(self) -> Path:
+        return self.blob_dir / "sessions"
+
+    def path(self, sha256: str) -> Path:
+        return self.blob_dir / sha256[:2] / sha256[2:4] / sha256
+
+    def owns(self, file_path: str) -> bool:
+        """Whether file_path is a blob (as opposed to a pre-blob upload)."""
+        path = Path(file_path)
+        return path == self.path(path.name)
+
+    def new_staging_path(self) -> Path:
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        return self.staging_dir / f"{uuid.uuid4().hex}.part"
+
+    async def receive(self, chunks: AsyncIterator[bytes]) -> StagedBlob:
+        """Write an upload into a staging file as it arrives, enforcing MAX_FILE_SIZE and hashing it.
+
+        Incoming pieces are gathered and written in UPLOAD_CHUNK_SIZE blocks,
+        so memory use does not depend on the file's size and an oversized
+        file is refused as soon as the limit is passed. On any failure,
+        including 413, the staging file is removed.
+        """
+        temp_path = self.new_staging_path()
+        digest = hashlib.sha256()
+        size = 0
+        buffer = bytearray()
+        try:
+            async with aiofiles.open(temp_path, 'wb') as f:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > settings.MAX_FILE_SIZE:
+                        raise file_too_large()
+                    digest.update(chunk)
+                    buffer += chunk
+                    if len(buffer) >= settings.UPLOAD_CHUNK_SIZE:
+                        await f.write(bytes(buffer))
+                        buffer.clear()
+                await f.write(bytes(buffer))
+                await f.flush()
+                await asyncio.to_thread(os.fsync, f.fileno())
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        return StagedBlob(temp_path, digest.hexdigest(), size)
+
+    def session_path(self, session_id: str) -> Path:
+        return self.sessions_dir / f"{session_id}.part"
+
+    async def write_chunk(self, path: Path, offset: int, chunks: AsyncIterator[bytes], limit: int) -> int:
+        """Write a request body into path starting at offset; return the bytes written.
+
+        At most ``limit`` bytes are accepted. If the client disconnects
+        midway, what arrived is kept so the upload resumes from there.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        written = 0
+        async with aiofiles.open(path, 'r+b' if path.exists() else 'wb') as f:
+            await f.seek(offset)
+            try:
+                async for chunk in chunks:
+                    if written + len(chunk) > limit:
+                        raise HTTPException(
+                            status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="حجم داده ارسالی بیش از حجم اعلام شده فایل است"
+                        )
+                    await f.write(chunk)
+                    written += len(chunk)
+            except ClientDisconnect:
+                pass
+            finally:
+                await f.flush()
+                await asyncio.to_thread(os.fsync, f.fileno())
+        return written
+
+    async def stage_file(self, path: Path, size: int) -> StagedBlob:
+        """Stage a fully written session file for ``add`` and hash it.
+
+        The staged copy is a hard link, so the session file stays until the
+        caller's commit succeeds and a failed completion can be retried. The
+        file must hold exactly ``size`` bytes (else 409); it is never padded
+        or cut to fit.
+        """
+        temp_path = self.new_staging_path()
+
+        def link_and_digest() -> Tuple[str, int]:
+            try:
+                os.link(path, temp_path)
+            except FileNotFoundError:
+                # Nothing was ever sent; only right for an empty file
+                temp_path.touch()
+            except OSError:
+                # No hard links on this filesystem
+                shutil.copyfile(path, temp_path)
+            digest = hashlib.sha256()
+            received = 0
+            with open(temp_path, 'rb') as f:
+                while chunk := f.read(settings.UPLOAD_CHUNK_SIZE):
+                    digest.update(chunk)
+                    received += len(chunk)
+            return digest.hexdigest(), received
+
+        try:
+            sha256, received = await asyncio.to_thread(link_and_digest)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        if received != size:
+            temp_path.unlink(missing_ok=True)
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"فایل دریافت شده ناقص است: {received} از {size} بایت"
+            )
+        return StagedBlob(temp_path, sha256, size)
+
+    async def add(self, db: AsyncSession, staged: StagedBlob) -> Path:
+        """Record one more reference to the staged content and move it into place.
+
+        The caller commits. If the content is already stored the staged copy
+        is simply dropped.
+        """
+        try:
+            await self.add_ref(db, staged.sha256, staged.size)
+            path = self.path(staged.sha256)
+            if path.exists():
+                await aiofiles.os.remove(staged.temp_path)
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                await aiofiles.os.replace(staged.temp_path, path)
+        except BaseException:
+            staged.temp_path.unlink(missing_ok=True)
+            raise
+        return path
+
+    async def add_ref(self, db: AsyncSession, sha256: str, size: int) -> None:
+        table = Blob.__table__
+        now = datetime.utcnow()
+        upsert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(db.get_bind().dialect.name)
+        if upsert is not None:
+            await db.execute(
+                upsert(table)
+                .values(sha256=sha256, size=size, ref_count=1, created_at=now, updated_at=now)
+                .on_conflict_do_update(
+                    index_elements=["sha256"],
+                    set_={"ref_count": table.c.ref_count + 1, "updated_at": now}
+                )
+            )
+            return
+        result = await db.execute(
+            update(table).where(table.c.sha256 == sha256)
+            .values(ref_count=table.c.ref_count + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            await db.execute(insert(table).values(
+                sha256=sha256, size=size, ref_count=1, created_at=now, updated_at=now
+            ))
+
+    async def disown(self, db: AsyncSession, sha256: str, size: int) -> None:
+        """Make sure a blob file has a row, without adding a reference. The caller commits.
+
+        For files moved into place by a transaction that then rolled back:
+        unless something else refers to the content, collect_garbage removes
+        them once the grace period has passed.
+        """
+        table = Blob.__table__
+        now = datetime.utcnow()
+        upsert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(db.get_bind().dialect.name)
+        if upsert is not None:
+            await db.execute(
+                upsert(table)
+                .values(sha256=sha256, size=size, ref_count=0, created_at=now, updated_at=now)
+                .on_conflict_do_update(index_elements=["sha256"], set_={"updated_at": now})
+            )
+            return
+        result = await db.execute(update(table).where(table.c.sha256 == sha256).values(updated_at=now))
+        if result.rowcount == 0:
+            await db.execute(insert(table).values(
+                sha256=sha256, size=size, ref_count=0, created_at=now, updated_at=now
+            ))
+
+    async def release(self, db: AsyncSession, sha256: str) -> None:
+        """Drop one reference; the file stays until collect_garbage runs. The caller commits."""
+        table = Blob.__table__
+        await db.execute(
+            update(table).where(table.c.sha256 == sha256)
+            .values(ref_count=table.c.ref_count - 1, updated_at=datetime.utcnow())
+        )
+
+    def collect_garbage(self, session: Session, grace: timedelta, dry_run: bool = False) -> Tuple[int, int]:
+        """Delete blobs unreferenced for longer than grace, and stale staging files.
+
+        Returns (blobs removed, bytes freed). Each blob's row is deleted and
+        its file unlinked before that row's transaction commits.
+        """
+        cutoff = datetime.utcnow() - grace
+        removed = freed = 0
+        candidates = session.execute(
+            select(Blob.sha256, Blob.size).where(Blob.ref_count <= 0, Blob.updated_at < cutoff)
+        ).all()
+        for sha256, size in candidates:
+            if dry_run:
+                removed, freed = removed + 1, freed + size
+                continue
+            # Re-checked under the row lock: an upload may have revived it meanwhile
+            deleted = session.execute(
+                delete(Blob)
+                .where(Blob.sha256 == sha256, Blob.ref_count <= 0, Blob.updated_at < cutoff)
+                .returning(Blob.sha256)
+            ).first()
+            if deleted:
+                self.path(sha256).unlink(missing_ok=True)
+                removed, freed = removed + 1, freed + size
+            session.commit()
+
+        # Leftovers of uploads that died between staging and commit
+        if self.staging_dir.exists() and not dry_run:
+            for temp_path in self.staging_dir.iterdir():
+                if datetime.utcfromtimestamp(temp_path.stat().st_mtime) < cutoff:
+                    temp_path.unlink(missing_ok=True)
+        return removed, freed
+
+    def expire_upload_sessions(self, session: Session, dry_run: bool = False) -> int:
+        """Delete resumable upload sessions past their expiry, with their partial files."""
+        now = datetime.utcnow()
+        expired = session.scalars(select(UploadSession.id).where(UploadSession.expires_at < now)).all()
+        if dry_run:
+            return len(expired)
+        removed = 0
+        for session_id in expired:
+            # Re-checked: a chunk may have arrived and extended it meanwhile
+            deleted = session.execute(
+                delete(UploadSession)
+                .where(UploadSession.id == session_id, UploadSession.expires_at < now)
+                .returning(UploadSession.id)
+            ).first()
+            if deleted:
+                self.session_path(session_id).unlink(missing_ok=True)
+                removed += 1
+            session.commit()
+        return removed
+
+
+blob_store = BlobStore()
@@ -0,0 +1,7 @@
+"""Benchmarks for the API's performance work.
+
+Run from backend/ as modules, e.g. ``python -m benchmarks.login --help``.
+They need the packages in requirements.txt and start their own server on
+a throwaway SQLite database; nothing is written outside a temporary
+directory.
+"""
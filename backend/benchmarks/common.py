@@ -0,0 +1,207 @@
+"""Shared pieces of the benchmarks: a throwaway database, a server to run
+against, seeding through the API and result tables.
+
+``serve`` can start the API from any checkout of the backend, so a change
+is measured before and after by pointing ``--backend-dir`` at a worktree
+of the older revision, e.g.::
+
+    git worktree add /tmp/before <commit>~1
+    python -m benchmarks.upload --backend-dir /tmp/before/backend
+"""
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+PASSWORD = "bench-password"
+
+SERVER = """
+import sys
+sys.path.insert(0, {backend_dir!r})
+sys.path.append({bench_dir!r})
+from app.core.config import settings
+settings.DATABASE_URL = {database_url!r}
+settings.UPLOAD_DIR = {upload_dir!r}
+for name, value in {overrides!r}.items():
+    setattr(settings, name, value)
+from app import models
+from app.database import Base, engine
+Base.metadata.create_all(engine)
+from app.main import app
+setup = {setup!r}
+if setup:
+    import importlib
+    module, function = setup.split(":")
+    getattr(importlib.import_module(module), function)(app)
+import uvicorn
+uvicorn.run(app, host="127.0.0.1", port={port}, log_level="warning")
+"""
+
+
+def work_dir() -> Path:
+    return Path(tempfile.mkdtemp(prefix="itrc-bench-"))
+
+
+def configure(directory: Path, **overrides) -> None:
+    """Point this process's settings at a SQLite database in directory.
+
+    Must run before any other app module is imported.
+    """
+    from app.core.config import settings
+
+    settings.DATABASE_URL = f"sqlite:///{directory}/bench.db"
+    settings.UPLOAD_DIR = str(directory / "uploads")
+    settings.PASSWORD_HASH_TARGET_MS = 0
+    settings.LOG_LEVEL = "WARNING"
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Server:
+    def __init__(self, process: subprocess.Popen, base_url: str):
+        self.process = process
+        self.base_url = base_url
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def proc_status(self, field: str) -> int:
+        """A kB field of /proc/<pid>/status, in bytes (e.g. VmHWM, VmRSS)."""
+        for line in Path(f"/proc/{self.pid}/status").read_text().splitlines():
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) * 1024
+        raise KeyError(field)
+
+    def written_bytes(self) -> int:
+        """Bytes the server has caused to be written to storage so far."""
+        for line in Path(f"/proc/{self.pid}/io").read_text().splitlines():
+            if line.startswith("write_bytes:"):
+                return int(line.split()[1])
+        raise KeyError("write_bytes")
+
+    def cpu_seconds(self) -> float:
+        """User plus system CPU time the server has used so far."""
+        fields = Path(f"/proc/{self.pid}/stat").read_text().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+    def reset_peak_rss(self) -> None:
+        Path(f"/proc/{self.pid}/clear_refs").write_text("5")
+
+
+@contextmanager
+def serve(directory: Path, backend_dir: Path = BACKEND_DIR, setup: Optional[str] = None,
+          **overrides) -> Iterator[Server]:
+    """Run the API from backend_dir in a uvicorn process on a fresh database.
+
+    ``setup`` names a ``module:function`` of this checkout called with the
+    app before it starts, for routes that only exist in a benchmark.
+    """
+    port = free_port()
+    overrides = {"PASSWORD_HASH_TARGET_MS": 0, "LOG_LEVEL": "WARNING", **overrides}
+    (directory / "uploads").mkdir(parents=True, exist_ok=True)
+    code = SERVER.format(
+        backend_dir=str(Path(backend_dir).resolve()),
+        bench_dir=str(BACKEND_DIR),
+        database_url=f"sqlite:///{directory}/bench.db",
+        upload_dir=str(directory / "uploads"),
+        overrides=overrides,
+        setup=setup,
+        port=port,
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-c", code], cwd=directory,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited:\n{process.stderr.read()}")
+            try:
+                if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError("server did not start")
+            time.sleep(0.1)
+        yield Server(process, base_url)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def register(client: httpx.Client, email: str, role: str) -> Dict[str, str]:
+    """Create a user through the API and return Authorization headers."""
+    response = client.post("/api/auth/register", json={
+        "email": email, "password": PASSWORD, "full_name": f"{role} bench", "role": role, "company": "bench"
+    })
+    response.raise_for_status()
+    response = client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def seed_application(client: httpx.Client) -> Dict:
+    """A product type and one application; returns its applicant's headers and the application id."""
+    admin = register(client, "admin@example.com", "admin")
+    applicant = register(client, "applicant@example.com", "applicant")
+    client.post("/api/admin/product-types", headers=admin, json={
+        "name_en": "Software", "name_fa": "نرم‌افزار", "protection_profile": "pp", "required_documents": []
+    }).raise_for_status()
+    response = client.post("/api/applications/", headers=applicant, data={
+        "product_name": "bench", "product_type": "Software", "company_name": "bench"
+    })
+    response.raise_for_status()
+    return {"headers": applicant, "application_id": response.json()["id"]}
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def median(values: List[float]) -> float:
+    return statistics.median(values) if values else 0.0
+
+
+def mib(size: float) -> str:
+    return f"{size / 1024 / 1024:.1f} MiB"
+
+
+def report(title: str, rows: List[Dict[str, object]]) -> None:
+    """Print rows as an aligned table."""
+    print(f"\n{title}")
+    if not rows:
+        return
+    columns = list(rows[0])
+    widths = {c: max(len(str(c)), *(len(str(row[c])) for row in rows)) for c in columns}
+    print("  ".join(str(c).ljust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(str(row[c]).ljust(widths[c]) for c in columns))
+
+
+def cpu_count() -> int:
+    return len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
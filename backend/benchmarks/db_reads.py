@@ -0,0 +1,186 @@
+"""Throughput of a DB-bound read route, AsyncSession vs synchronous Session.
+
+Requests go to two handlers in the same server, both running the
+evaluator's query from GET /api/applications/dashboard/list:
+
+- /api/applications/dashboard/list: the route itself, AsyncSession;
+- /bench/sync-dashboard-list: the same query through a synchronous
+  Session, as every handler ran before the async engine.
+
+The database is seeded with mostly completed applications, so filling
+a page of submitted ones walks a good part of the created_at index.
+While requests run, a probe requests /health every few milliseconds;
+its latency shows how long the event loop is blocked.
+
+--latency-ms adds a wait to every statement in the thread that runs it,
+standing in for the round trip to a database server: the synchronous
+Session waits on the event loop, aiosqlite in its connection thread.
+
+    python -m benchmarks.db_reads --rows 100000 --concurrency 16 --seconds 10 --latency-ms 2
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+from .common import cpu_count, median, percentile, register, report, serve, work_dir
+
+PATHS = {
+    "AsyncSession": "/api/applications/dashboard/list",
+    "sync Session (before)": "/bench/sync-dashboard-list",
+}
+
+
+def seed(rows: int, submitted_every: int) -> None:
+    from datetime import datetime, timedelta
+
+    from sqlalchemy import insert
+
+    from app.database import engine
+    from app.models import Application, ApplicationStatus, ProductType, User, UserRole
+
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(User).values(
+            email="bench-applicant@example.com", hashed_password="x", full_name="bench", role=UserRole.APPLICANT
+        ))
+        conn.execute(insert(ProductType).values(
+            name_en="Software", name_fa="نرم‌افزار", protection_profile="pp", required_documents=[]
+        ))
+        for start in range(0, rows, 10000):
+            conn.execute(insert(Application), [dict(
+                application_number=f"ITRC-2026-{i:06d}", product_name=f"product {i}", product_type_id=1,
+                applicant_id=1, company_name="bench",
+                status=ApplicationStatus.SUBMITTED if i % submitted_every == 0 else ApplicationStatus.COMPLETED,
+                submission_date=now - timedelta(minutes=i), created_at=now - timedelta(minutes=i),
+            ) for i in range(start, min(rows, start + 10000))])
+
+
+def add_statement_latency(seconds: float) -> None:
+    """Make every statement on both engines wait ``seconds`` before it runs."""
+    from sqlalchemy import event
+    from sqlalchemy.util import await_only
+
+    from app.database import async_engine, engine
+
+    def wait(statement):
+        time.sleep(seconds)
+
+    @event.listens_for(engine, "connect")
+    def on_sync_connect(dbapi_connection, connection_record):
+        dbapi_connection.set_trace_callback(wait)
+
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def on_async_connect(dbapi_connection, connection_record):
+        # The callback must be installed from aiosqlite's connection thread, where statements run
+        driver = dbapi_connection.driver_connection
+        await_only(driver._execute(driver._conn.set_trace_callback, wait))
+
+    engine.dispose()  # reopen the connections seeding left in the pool
+
+
+def add_sync_dashboard(app):
+    """Seed the database and register the synchronous handler."""
+    from fastapi import Depends, Query, Response
+    from sqlalchemy import func
+
+    from app.core.auth import get_current_active_user
+    from app.core.config import settings
+    from app.core.pagination import keyset_page, set_next_cursor
+    from app.database import SessionLocal
+    from app.models import Application, ApplicationStatus, User
+    from app.routers.applications import application_summaries, application_summary_query
+
+    seed(int(os.environ["BENCH_ROWS"]), int(os.environ["BENCH_SUBMITTED_EVERY"]))
+    latency = float(os.environ["BENCH_LATENCY_MS"]) / 1000
+    if latency:
+        add_statement_latency(latency)
+
+    @app.get("/bench/sync-dashboard-list")
+    async def sync_dashboard_list(
+        response: Response,
+        limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+        current_user: User = Depends(get_current_active_user),
+    ):
+        applicant_name = func.coalesce(func.nullif(User.company, ""), User.full_name).label("applicant_name")
+        query = application_summary_query(Application.evaluation_level).add_columns(applicant_name).where(
+            Application.status.in_([ApplicationStatus.SUBMITTED, ApplicationStatus.IN_EVALUATION])
+        )
+        with SessionLocal() as db:
+            rows = db.execute(keyset_page(query, Application.created_at, Application.id, None, limit)).all()
+        return application_summaries.response(set_next_cursor(response, rows, limit), response)
+
+
+async def run(base_url: str, path: str, headers: dict, limit: int, concurrency: int, seconds: float,
+              probe_interval: float):
+    request_times, probe_times, failures = [], [], 0
+    deadline = time.perf_counter() + seconds
+    limits = httpx.Limits(max_connections=concurrency + 1)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        async def read():
+            nonlocal failures
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.get(path, params={"limit": limit}, headers=headers)
+                if response.status_code == 200 and len(response.json()) == limit:
+                    request_times.append(time.perf_counter() - started)
+                else:
+                    failures += 1
+
+        async def probe():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                await client.get("/health")
+                probe_times.append(time.perf_counter() - started)
+                await asyncio.sleep(probe_interval)
+
+        started = time.perf_counter()
+        await asyncio.gather(probe(), *(read() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests/s": f"{len(request_times) / elapsed:.1f}",
+        "p50 ms": f"{median(request_times) * 1000:.0f}",
+        "p99 ms": f"{percentile(request_times, 0.99) * 1000:.0f}",
+        "health p50 ms": f"{median(probe_times) * 1000:.1f}",
+        "health p99 ms": f"{percentile(probe_times, 0.99) * 1000:.1f}",
+        "failed": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000, help="applications seeded")
+    parser.add_argument("--submitted-every", type=int, default=50, help="one submitted application per N")
+    parser.add_argument("--limit", type=int, default=50, help="page size requested")
+    parser.add_argument("--concurrency", type=int, default=16, help="simultaneous requests")
+    parser.add_argument("--seconds", type=float, default=10, help="duration of each run")
+    parser.add_argument("--latency-ms", type=float, default=0, help="simulated database round trip per statement")
+    parser.add_argument("--probe-interval", type=float, default=0.005, help="seconds between /health probes")
+    args = parser.parse_args()
+
+    os.environ["BENCH_ROWS"] = str(args.rows)
+    os.environ["BENCH_SUBMITTED_EVERY"] = str(args.submitted_every)
+    os.environ["BENCH_LATENCY_MS"] = str(args.latency_ms)
+    with serve(work_dir(), setup="benchmarks.db_reads:add_sync_dashboard") as server:
+        with httpx.Client(base_url=server.base_url, timeout=60) as client:
+            headers = register(client, "evaluator@example.com", "evaluator")
+
+        rows = []
+        for name, path in PATHS.items():
+            result = asyncio.run(run(
+                server.base_url, path, headers, args.limit, args.concurrency, args.seconds, args.probe_interval
+            ))
+            rows.append({"handler": name, **result})
+    report(
+        f"Evaluator dashboard list, {args.rows} applications (1 in {args.submitted_every} submitted), "
+        f"{args.latency_ms:g} ms per statement, {args.concurrency} concurrent clients, {args.seconds:g}s each, "
+        f"{cpu_count()} CPU(s)", rows
+    )
+
+
+if __name__ == "__main__":
+    main()
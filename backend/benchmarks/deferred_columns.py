@@ -0,0 +1,104 @@
+"""Loading list rows with and without their large text columns.
+
+Applications, evaluations and reports are seeded with long texts, then
+loaded through an AsyncSession the way list and permission-check queries
+load them: as is, with the text groups deferred, and with the groups
+undeferred, which is how every query read them before.
+
+    python -m benchmarks.deferred_columns --rows 2000 --text-kib 16
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from datetime import datetime
+
+from .common import configure, median, mib, report, work_dir
+
+DIRECTORY = work_dir()
+configure(DIRECTORY)
+
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.orm import undefer_group  # noqa: E402
+
+from app.database import AsyncSessionLocal, Base, async_engine, engine  # noqa: E402
+from app.models import (  # noqa: E402
+    Application, ApplicationStatus, Evaluation, ProductType, Report, ReportType, User, UserRole
+)
+
+QUERIES = {
+    "applications": (Application, "application_text"),
+    "evaluations": (Evaluation, "evaluation_text"),
+    "reports": (Report, "report_text"),
+}
+
+
+def seed(rows: int, text_kib: int) -> None:
+    text = ("متن طولانی ارزیابی " * 1024)[: text_kib * 1024]
+    now = datetime.utcnow()
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User).values(
+            email="bench@example.com", hashed_password="x", full_name="bench", role=UserRole.EVALUATOR
+        ))
+        conn.execute(insert(ProductType).values(name_en="Software", name_fa="نرم‌افزار", protection_profile="pp"))
+        conn.execute(insert(Application), [dict(
+            product_name=f"product {i}", product_type_id=1, applicant_id=1, company_name="bench",
+            status=ApplicationStatus.IN_EVALUATION, created_at=now, updated_at=now,
+            description=text, product_description=text, notes=text,
+        ) for i in range(rows)])
+        conn.execute(insert(Evaluation), [dict(
+            application_id=i + 1, evaluator_id=1, status="in_progress", created_at=now, updated_at=now,
+            findings=text, recommendations=text,
+        ) for i in range(rows)])
+        conn.execute(insert(Report), [dict(
+            evaluation_id=i + 1, report_type=list(ReportType)[0], title=f"report {i}",
+            content=text * 2, created_at=now, updated_at=now,
+        ) for i in range(rows)])
+
+
+async def load(query) -> int:
+    async with AsyncSessionLocal() as db:
+        return len((await db.scalars(query)).all())
+
+
+async def measure(query, repeat: int):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await load(query)
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    await load(query)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return median(times), peak
+
+
+async def run(rows: int, repeat: int):
+    results = []
+    for name, (model, group) in QUERIES.items():
+        for mode, query in (
+            ("deferred", select(model).limit(rows)),
+            ("all columns (before)", select(model).options(undefer_group(group)).limit(rows)),
+        ):
+            seconds, peak = await measure(query, repeat)
+            results.append({"rows": f"{rows} {name}", "load": mode,
+                            "median ms": f"{seconds * 1000:.0f}", "peak memory": mib(peak)})
+    await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--text-kib", type=int, default=16, help="size of each long text column")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    seed(args.rows, args.text_kib)
+    report(f"List loads, {args.text_kib} KiB per text column", asyncio.run(run(args.rows, args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
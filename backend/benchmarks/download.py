@@ -0,0 +1,93 @@
+"""Throughput of large document downloads through GET /api/documents/download.
+
+One large document is uploaded, then clients fetch it from a uvicorn
+worker: whole-file downloads in parallel, resuming the last tenth with a
+Range request, and viewer-style single-page ranges. Bytes received,
+elapsed time and the worker's CPU time are reported per scenario.
+
+Measure an older revision with --backend-dir, e.g. the tree before Range
+support:
+
+    git worktree add /tmp/before bdf70e2~1
+    python -m benchmarks.download --backend-dir /tmp/before/backend
+"""
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import httpx
+
+from .common import BACKEND_DIR, mib, report, seed_application, serve, work_dir
+from .upload import make_file, upload
+
+PAGE_SIZE = 64 * 1024
+
+
+def fetch(base_url: str, headers: dict, document_id: int, byte_range: str = None) -> tuple:
+    """Download the document once; returns the status and the body size."""
+    if byte_range:
+        headers = {**headers, "Range": f"bytes={byte_range}"}
+    received = 0
+    with httpx.Client(base_url=base_url, timeout=600) as client:
+        with client.stream("GET", f"/api/documents/download/{document_id}", headers=headers) as response:
+            for chunk in response.iter_raw(1024 * 1024):
+                received += len(chunk)
+    return response.status_code, received
+
+
+def measure(server, requests: list, clients: int) -> dict:
+    cpu = server.cpu_seconds()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        results = list(pool.map(lambda request: request(), requests))
+    elapsed = time.perf_counter() - started
+    received = sum(size for _, size in results)
+    return {
+        "status": ",".join(sorted({str(status) for status, _ in results})),
+        "received": mib(received),
+        "seconds": f"{elapsed:.2f}",
+        "MiB/s": f"{received / 1024 / 1024 / elapsed:.0f}",
+        "requests/s": f"{len(requests) / elapsed:.1f}",
+        "worker CPU s": f"{server.cpu_seconds() - cpu:.2f}",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend-dir", type=Path, default=BACKEND_DIR, help="checkout of backend/ to measure")
+    parser.add_argument("--size-mib", type=int, default=200, help="size of the document")
+    parser.add_argument("--clients", type=int, default=4, help="simultaneous downloads")
+    parser.add_argument("--downloads", type=int, default=8, help="whole-file downloads")
+    parser.add_argument("--pages", type=int, default=50, help="single-page range requests")
+    args = parser.parse_args()
+    directory = work_dir()
+    size = args.size_mib * 1024 * 1024
+    path = make_file(directory / "download.bin", size)
+
+    with serve(directory / "server", backend_dir=args.backend_dir.resolve(), MAX_FILE_SIZE=size) as server:
+        with httpx.Client(base_url=server.base_url, timeout=60) as client:
+            seeded = seed_application(client)
+        upload(server.base_url, seeded["headers"], seeded["application_id"], path)
+        path.unlink()
+
+        def request(byte_range=None):
+            return lambda: fetch(server.base_url, seeded["headers"], 1, byte_range)
+
+        pages = random.Random(0)
+        scenarios = [
+            (f"{args.downloads} whole downloads", [request() for _ in range(args.downloads)], args.clients),
+            ("resume the last 10%", [request(f"{size - size // 10}-")], 1),
+            (f"{args.pages} {PAGE_SIZE // 1024} KiB pages", [
+                request(f"{offset}-{offset + PAGE_SIZE - 1}")
+                for offset in (pages.randrange(0, size - PAGE_SIZE) for _ in range(args.pages))
+            ], args.clients),
+        ]
+        fetch(server.base_url, seeded["headers"], 1, "0-0")  # warm up
+        rows = [{"run": name, **measure(server, requests, clients)} for name, requests, clients in scenarios]
+    report(f"Downloads of a {args.size_mib} MiB document ({args.backend_dir.resolve()})", rows)
+
+
+if __name__ == "__main__":
+    main()
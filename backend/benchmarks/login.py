@@ -0,0 +1,116 @@
+"""Login throughput and event-loop stalls under bcrypt load.
+
+Logins run against two handlers in the same server:
+
+- /api/auth/login: AsyncSession queries, bcrypt in the hashing pool;
+- /bench/blocking-login: the handler as it was before the async engine,
+  a synchronous Session query and bcrypt verified on the event loop.
+
+While they run, a probe requests /health every few milliseconds. Its
+latency shows how long the event loop is blocked: every other request
+on the worker waits that long.
+
+    python -m benchmarks.login --concurrency 16 --seconds 10
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from .common import PASSWORD, cpu_count, median, percentile, register, report, serve, work_dir
+
+PATHS = {"async + pool": "/api/auth/login", "blocking (before)": "/bench/blocking-login"}
+
+
+def add_blocking_login(app):
+    """Register the pre-async login handler under /bench/blocking-login."""
+    from fastapi import HTTPException
+
+    from app.core.auth import pwd_context
+    from app.database import SessionLocal
+    from app.models import User
+    from app.schemas import LoginRequest
+
+    @app.post("/bench/blocking-login")
+    async def blocking_login(login_data: LoginRequest):
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter(User.email == login_data.email).first()
+            if not user or not pwd_context.verify(login_data.password, user.hashed_password):
+                raise HTTPException(status_code=401)
+        finally:
+            db.close()
+        return {"email": user.email}
+
+
+async def run(base_url: str, path: str, emails, concurrency: int, seconds: float, probe_interval: float):
+    login_times, probe_times, failures = [], [], 0
+    deadline = time.perf_counter() + seconds
+    limits = httpx.Limits(max_connections=concurrency + 1)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        async def login(worker: int):
+            nonlocal failures
+            i = worker
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.post(path, json={"email": emails[i % len(emails)], "password": PASSWORD})
+                if response.status_code == 200:
+                    login_times.append(time.perf_counter() - started)
+                else:
+                    failures += 1
+                i += concurrency
+
+        async def probe():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                await client.get("/health")
+                probe_times.append(time.perf_counter() - started)
+                await asyncio.sleep(probe_interval)
+
+        started = time.perf_counter()
+        await asyncio.gather(probe(), *(login(worker) for worker in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "logins/s": f"{len(login_times) / elapsed:.1f}",
+        "login p50 ms": f"{median(login_times) * 1000:.0f}",
+        "login p99 ms": f"{percentile(login_times, 0.99) * 1000:.0f}",
+        "health p50 ms": f"{median(probe_times) * 1000:.1f}",
+        "health p99 ms": f"{percentile(probe_times, 0.99) * 1000:.1f}",
+        "health max ms": f"{max(probe_times, default=0) * 1000:.1f}",
+        "failed": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=16, help="simultaneous logins")
+    parser.add_argument("--seconds", type=float, default=10, help="duration of each run")
+    parser.add_argument("--users", type=int, default=32, help="accounts to log in as")
+    parser.add_argument("--hash-ms", type=int, default=50, help="bcrypt cost target (PASSWORD_HASH_TARGET_MS)")
+    parser.add_argument("--probe-interval", type=float, default=0.005, help="seconds between /health probes")
+    args = parser.parse_args()
+
+    with serve(work_dir(), setup="benchmarks.login:add_blocking_login",
+               PASSWORD_HASH_TARGET_MS=args.hash_ms) as server:
+        with httpx.Client(base_url=server.base_url, timeout=60) as client:
+            emails = [f"user{i}@example.com" for i in range(args.users)]
+            for email in emails:
+                register(client, email, "applicant")
+
+        rows = []
+        for name, path in PATHS.items():
+            result = asyncio.run(run(
+                server.base_url, path, emails, args.concurrency, args.seconds, args.probe_interval
+            ))
+            rows.append({"handler": name, **result})
+    report(
+        f"Login, {args.concurrency} concurrent clients, {args.seconds:g}s each, "
+        f"bcrypt ~{args.hash_ms} ms, {cpu_count()} CPU(s)", rows
+    )
+
+
+if __name__ == "__main__":
+    main()
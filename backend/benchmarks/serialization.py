@@ -0,0 +1,107 @@
+"""Serializing application list rows into a JSON response body.
+
+The rows come from application_summary_query on a seeded database; only
+the serialization is timed.
+
+- before: an ApplicationSummary built per row in Python, then FastAPI's
+  response_model pass and JSONResponse (stdlib json), as the list routes
+  did before ListSerializer;
+- orjson: the same models through ORJSONResponse, the app's default
+  response class for other endpoints;
+- ListSerializer: one pydantic-core validate and dump of the rows.
+
+    python -m benchmarks.serialization --rows 10000
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from .common import configure, median, report, work_dir
+
+DIRECTORY = work_dir()
+configure(DIRECTORY)
+
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import Application, ApplicationStatus, ProductType, User, UserRole  # noqa: E402
+from app.routers.applications import application_summaries, application_summary_query  # noqa: E402
+from app.schemas import ApplicationSummary  # noqa: E402
+
+RESPONSE_FIELD = create_response_field(name="Response_bench", type_=List[ApplicationSummary])
+
+
+def seed(rows: int) -> None:
+    now = datetime.utcnow()
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User).values(
+            email="bench@example.com", hashed_password="x", full_name="bench", role=UserRole.APPLICANT
+        ))
+        conn.execute(insert(ProductType).values(name_en="Software", name_fa="نرم‌افزار", protection_profile="pp"))
+        conn.execute(insert(Application), [dict(
+            application_number=f"ITRC-2026-{i:06d}", product_name=f"محصول {i}", product_type_id=1,
+            applicant_id=1, company_name="bench", status=ApplicationStatus.SUBMITTED,
+            submission_date=now - timedelta(minutes=i), created_at=now - timedelta(minutes=i),
+        ) for i in range(rows)])
+
+
+def summaries(rows):
+    return [
+        ApplicationSummary(
+            id=row.id,
+            application_number=row.application_number,
+            product_name=row.product_name,
+            status=row.status,
+            submission_date=row.submission_date,
+            product_type_name=row.product_type_name,
+        )
+        for row in rows
+    ]
+
+
+def before(rows) -> bytes:
+    content = asyncio.run(serialize_response(field=RESPONSE_FIELD, response_content=summaries(rows)))
+    return JSONResponse(content=content).body
+
+
+def with_orjson(rows) -> bytes:
+    content = asyncio.run(serialize_response(field=RESPONSE_FIELD, response_content=summaries(rows)))
+    return ORJSONResponse(content=content).body
+
+
+def list_serializer(rows) -> bytes:
+    return application_summaries.response(rows).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    seed(args.rows)
+    with SessionLocal() as db:
+        rows = db.execute(application_summary_query()).all()
+
+    results, reference = [], before(rows)
+    for name, serialize in (("before", before), ("orjson", with_orjson), ("ListSerializer", list_serializer)):
+        serialize(rows)  # warm up
+        times = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            body = serialize(rows)
+            times.append(time.perf_counter() - started)
+        results.append({"path": name, "median ms": f"{median(times) * 1000:.0f}",
+                        "min ms": f"{min(times) * 1000:.0f}", "body KiB": len(body) // 1024,
+                        "same body": body == reference})
+    report(f"Serializing {len(rows)} ApplicationSummary rows", results)
+
+
+if __name__ == "__main__":
+    main()
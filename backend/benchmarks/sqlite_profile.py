@@ -0,0 +1,125 @@
+"""Concurrent reads and writes on SQLite, default pragmas vs the tuned profile.
+
+Reader tasks page through applications while writer tasks insert them,
+all through the async engine and its pool, as API workers would. Each
+profile gets a fresh database file, since WAL mode persists in the file.
+"default" is SQLite's own profile (rollback journal, synchronous=FULL);
+"tuned" is what configure_sqlite applies (SQLITE_* settings).
+
+    python -m benchmarks.sqlite_profile --readers 16 --writers 4 --seconds 10
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from .common import configure, median, percentile, report, work_dir
+
+DIRECTORY = work_dir()
+configure(DIRECTORY)
+
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.database import Base, configure_sqlite, get_async_database_url, get_engine_options  # noqa: E402
+from app.models import Application, ApplicationStatus, ProductType, User, UserRole  # noqa: E402
+
+READ = (
+    select(Application.id, Application.application_number, Application.product_name, Application.status)
+    .order_by(Application.created_at.desc(), Application.id.desc())
+    .limit(50)
+)
+
+
+def application_row(i: int) -> dict:
+    now = datetime.utcnow()
+    return dict(
+        product_name=f"product {i}", product_type_id=1, applicant_id=1, company_name="bench",
+        status=ApplicationStatus.SUBMITTED, created_at=now - timedelta(seconds=i), updated_at=now,
+        description="x" * 500,
+    )
+
+
+def seed(url: str, tuned: bool, rows: int) -> None:
+    engine = create_engine(url)
+    if tuned:
+        configure_sqlite(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User).values(
+            email="bench@example.com", hashed_password="x", full_name="bench", role=UserRole.APPLICANT
+        ))
+        conn.execute(insert(ProductType).values(name_en="Software", name_fa="نرم‌افزار", protection_profile="pp"))
+        conn.execute(insert(Application), [application_row(i) for i in range(rows)])
+    engine.dispose()
+
+
+async def run(url: str, tuned: bool, readers: int, writers: int, seconds: float) -> dict:
+    async_url = get_async_database_url(url)
+    engine = create_async_engine(async_url, **get_engine_options(async_url))
+    if tuned:
+        configure_sqlite(engine.sync_engine)
+    read_times, write_times, errors = [], [], []
+    deadline = time.perf_counter() + seconds
+
+    async def reader():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                async with engine.connect() as conn:
+                    (await conn.execute(READ)).all()
+                read_times.append(time.perf_counter() - started)
+            except OperationalError as exc:
+                errors.append(str(exc.orig))
+
+    async def writer(worker: int):
+        i = 1_000_000 * (worker + 1)
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                async with engine.begin() as conn:
+                    await conn.execute(insert(Application).values(**application_row(i)))
+                write_times.append(time.perf_counter() - started)
+            except OperationalError as exc:
+                errors.append(str(exc.orig))
+            i += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(reader() for _ in range(readers)), *(writer(w) for w in range(writers)))
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    return {
+        "reads/s": f"{len(read_times) / elapsed:.0f}",
+        "read p50 ms": f"{median(read_times) * 1000:.1f}",
+        "read p99 ms": f"{percentile(read_times, 0.99) * 1000:.1f}",
+        "writes/s": f"{len(write_times) / elapsed:.0f}",
+        "write p50 ms": f"{median(write_times) * 1000:.1f}",
+        "write p99 ms": f"{percentile(write_times, 0.99) * 1000:.1f}",
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=5000, help="applications seeded before the run")
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    rows = []
+    for profile, tuned in (("default", False), ("tuned", True)):
+        url = f"sqlite:///{DIRECTORY}/{profile}.db"
+        seed(url, tuned, args.rows)
+        result = asyncio.run(run(url, tuned, args.readers, args.writers, args.seconds))
+        rows.append({"profile": profile, **result})
+    report(
+        f"SQLite, {args.readers} readers + {args.writers} writers, pool {settings.DB_POOL_SIZE}"
+        f"+{settings.DB_MAX_OVERFLOW}, {args.seconds:g}s", rows
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Import time of app.main, its side effects, and time until a worker is ready.
+
+Each import runs in a fresh interpreter, in a directory that already has
+an uploads/ directory as a deployed backend does. Importing should not
+create or connect to the database; that only happens once the worker
+starts (lifespan).
+
+    python -m benchmarks.startup --repeat 10
+    python -m benchmarks.startup --backend-dir /tmp/before/backend
+"""
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from .common import BACKEND_DIR, median, report, serve, work_dir
+
+IMPORT = """
+import sys, time
+sys.path.insert(0, {backend_dir!r})
+from app.core.config import settings
+settings.DATABASE_URL = {database_url!r}
+settings.UPLOAD_DIR = {upload_dir!r}
+started = time.perf_counter()
+import app.main
+print(time.perf_counter() - started)
+"""
+
+
+def time_import(backend_dir: Path, directory: Path):
+    database = directory / "import.db"
+    (directory / "uploads").mkdir(exist_ok=True)
+    code = IMPORT.format(
+        backend_dir=str(backend_dir), database_url=f"sqlite:///{database}", upload_dir="uploads"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=directory, capture_output=True, text=True, check=True
+    )
+    seconds = float(result.stdout.strip().splitlines()[-1])
+    created = database.exists()
+    database.unlink(missing_ok=True)
+    return seconds, created
+
+
+def slowest_imports(backend_dir: Path, directory: Path, count: int):
+    """The modules with the largest cumulative import time (python -X importtime)."""
+    (directory / "uploads").mkdir(exist_ok=True)
+    code = IMPORT.format(
+        backend_dir=str(backend_dir), database_url=f"sqlite:///{directory}/importtime.db", upload_dir="uploads"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=directory, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if name.count(".") == 0 or name.strip().startswith("app"):
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def time_to_ready(backend_dir: Path) -> float:
+    started = time.perf_counter()
+    with serve(work_dir(), backend_dir=backend_dir) as server:
+        # /health/ready only exists from the lifespan change on
+        response = httpx.get(f"{server.base_url}/health/ready")
+        if response.status_code == 404:
+            response = httpx.get(f"{server.base_url}/health")
+        response.raise_for_status()
+        return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend-dir", type=Path, default=BACKEND_DIR, help="checkout of backend/ to measure")
+    parser.add_argument("--repeat", type=int, default=10, help="imports to time")
+    parser.add_argument("--top", type=int, default=8, help="slowest imports to list")
+    args = parser.parse_args()
+    backend_dir = args.backend_dir.resolve()
+    directory = work_dir()
+
+    time_import(backend_dir, directory)  # warm the bytecode cache
+    runs = [time_import(backend_dir, directory) for _ in range(args.repeat)]
+    seconds = [run[0] for run in runs]
+    report(f"import app.main ({backend_dir})", [{
+        "median ms": f"{median(seconds) * 1000:.0f}",
+        "min ms": f"{min(seconds) * 1000:.0f}",
+        "max ms": f"{max(seconds) * 1000:.0f}",
+        "creates database": any(run[1] for run in runs),
+        "server ready s": f"{time_to_ready(backend_dir):.2f}",
+    }])
+    report("Slowest imports (cumulative)", [
+        {"module": name, "ms": f"{cumulative / 1000:.1f}"}
+        for cumulative, name in slowest_imports(backend_dir, directory, args.top)
+    ])
+
+
+if __name__ == "__main__":
+    main()
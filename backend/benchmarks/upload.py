@@ -0,0 +1,95 @@
+"""Server memory and disk writes while receiving document uploads.
+
+Concurrent clients upload files through POST /api/documents/upload to a
+uvicorn worker; the worker's peak RSS above its idle size and the bytes
+it wrote to storage are read from /proc. A second run sends a file over
+MAX_FILE_SIZE and records how much the worker wrote before refusing it.
+
+Measure an older revision with --backend-dir, e.g. the tree before
+streaming uploads:
+
+    git worktree add /tmp/before a9a84f1~1
+    python -m benchmarks.upload --backend-dir /tmp/before/backend
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import httpx
+
+from .common import BACKEND_DIR, mib, report, seed_application, serve, work_dir
+
+# One document type per client, so simultaneous uploads create separate documents
+DOCUMENT_TYPES = ["security_target", "assurance_life_cycle", "administrative_guidance", "development",
+                  "tests", "vulnerability_assessment", "composition", "other"]
+
+
+def make_file(path: Path, size: int) -> Path:
+    block = bytes(range(256)) * 4096
+    with open(path, "wb") as f:
+        for offset in range(0, size, len(block)):
+            f.write(block[: min(len(block), size - offset)])
+    return path
+
+
+def upload(base_url: str, headers: dict, application_id: int, path: Path, document_type: str = "other") -> int:
+    with httpx.Client(base_url=base_url, timeout=600) as client, open(path, "rb") as f:
+        response = client.post(
+            f"/api/documents/upload/{application_id}", params={"document_type": document_type},
+            headers=headers, files={"file": (f"{path.stem}.pdf", f, "application/pdf")},
+        )
+        return response.status_code
+
+
+def measure(server, seeded, path: Path, clients: int) -> dict:
+    idle_rss = server.proc_status("VmRSS")
+    server.reset_peak_rss()
+    written = server.written_bytes()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        statuses = list(pool.map(
+            lambda document_type: upload(
+                server.base_url, seeded["headers"], seeded["application_id"], path, document_type
+            ),
+            DOCUMENT_TYPES[:clients]
+        ))
+    elapsed = time.perf_counter() - started
+    return {
+        "status": ",".join(sorted(set(map(str, statuses)))),
+        "seconds": f"{elapsed:.2f}",
+        "peak RSS over idle": mib(server.proc_status("VmHWM") - idle_rss),
+        "written": mib(server.written_bytes() - written),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend-dir", type=Path, default=BACKEND_DIR, help="checkout of backend/ to measure")
+    parser.add_argument("--size-mib", type=int, default=100, help="size of each upload")
+    parser.add_argument("--clients", type=int, default=4, choices=range(1, len(DOCUMENT_TYPES) + 1),
+                        metavar=f"1-{len(DOCUMENT_TYPES)}", help="simultaneous uploads")
+    parser.add_argument("--limit-mib", type=int, default=20, help="MAX_FILE_SIZE for the oversized run")
+    args = parser.parse_args()
+    directory = work_dir()
+    path = make_file(directory / "upload.bin", args.size_mib * 1024 * 1024)
+
+    rows = []
+    with serve(directory / "accepted", backend_dir=args.backend_dir.resolve(),
+               MAX_FILE_SIZE=2 * args.size_mib * 1024 * 1024) as server:
+        with httpx.Client(base_url=server.base_url, timeout=60) as client:
+            seeded = seed_application(client)
+        upload(server.base_url, seeded["headers"], seeded["application_id"], make_file(directory / "w.bin", 1024))
+        rows.append({"run": f"{args.clients} x {args.size_mib} MiB", **measure(server, seeded, path, args.clients)})
+
+    with serve(directory / "refused", backend_dir=args.backend_dir.resolve(),
+               MAX_FILE_SIZE=args.limit_mib * 1024 * 1024) as server:
+        with httpx.Client(base_url=server.base_url, timeout=60) as client:
+            seeded = seed_application(client)
+        rows.append({"run": f"{args.size_mib} MiB over a {args.limit_mib} MiB limit",
+                     **measure(server, seeded, path, 1)})
+    report(f"Uploads ({args.backend_dir.resolve()})", rows)
+
+
+if __name__ == "__main__":
+    main()
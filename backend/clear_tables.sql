@@ -2,6 +2,7 @@
 SET session_replication_role = 'replica';
 
 -- Clear tables in reverse order of dependencies
+TRUNCATE TABLE status_rollups;
 TRUNCATE TABLE evaluations CASCADE;
 TRUNCATE TABLE security_targets CASCADE;
 TRUNCATE TABLE applications CASCADE;
@@ -14,6 +15,7 @@ TRUNCATE TABLE users CASCADE;
 SET session_replication_role = 'origin';
 
 -- Reset sequences
+ALTER SEQUENCE status_rollups_id_seq RESTART WITH 1;
 ALTER SEQUENCE evaluations_id_seq RESTART WITH 1;
 ALTER SEQUENCE security_targets_id_seq RESTART WITH 1;
 ALTER SEQUENCE applications_id_seq RESTART WITH 1;
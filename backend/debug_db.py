@@ -2,12 +2,12 @@
 """
 Debug script to check database contents
 """
-from app.database import get_db
+from app.database import SessionLocal
 from app.models import Application, User, ProductType
 
 def debug_database():
     """Check database contents"""
-    db = next(get_db())
+    db = SessionLocal()
     
     print("🔍 USERS IN DATABASE:")
     users = db.query(User).all()
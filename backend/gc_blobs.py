@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Delete stored document blobs that no version refers to any more, and
+resumable upload sessions that were abandoned.
+
+Deleting a document only drops its blob references; run this periodically
+(e.g. from cron) to reclaim the disk space.
+
+Usage:
+    python gc_blobs.py                  # delete blobs unreferenced for BLOB_GC_GRACE_HOURS
+    python gc_blobs.py --dry-run        # only report what would be deleted
+    python gc_blobs.py --grace-hours 0  # ignore the grace period
+"""
+
+import argparse
+import sys
+from datetime import timedelta
+
+from app.core.config import settings
+from app.database import SessionLocal
+from app.storage import blob_store
+
+def main():
+    parser = argparse.ArgumentParser(description="Garbage-collect unreferenced document blobs")
+    parser.add_argument("--dry-run", action="store_true", help="only report, do not delete")
+    parser.add_argument("--grace-hours", type=float, default=settings.BLOB_GC_GRACE_HOURS,
+                        help="keep blobs unreferenced for less than this many hours")
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    try:
+        sessions = blob_store.expire_upload_sessions(db, dry_run=args.dry_run)
+        removed, freed = blob_store.collect_garbage(db, timedelta(hours=args.grace_hours), dry_run=args.dry_run)
+        if args.dry_run:
+            print(f"🔍 {removed} blobs ({freed / 1024 / 1024:.1f} MiB) and {sessions} expired uploads would be deleted")
+        else:
+            print(f"✅ Deleted {removed} blobs, freed {freed / 1024 / 1024:.1f} MiB; expired {sessions} uploads")
+        return 0
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
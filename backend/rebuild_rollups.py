@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Recompute the status rollups from the applications and evaluations tables
+and verify that the stored counters match.
+
+Usage:
+    python rebuild_rollups.py          # rebuild, then verify
+    python rebuild_rollups.py --check  # only report drift (exit code 1 if any)
+"""
+
+import argparse
+import sys
+
+from app.database import SessionLocal
+from app.rollups import diff_rollups, rebuild_rollups
+
+def report(mismatches):
+    for (scope, scope_key, status, product_type_id), expected, stored in mismatches:
+        print(f"  {scope}:{scope_key or '-'} status={status} product_type={product_type_id} "
+              f"expected={expected} stored={stored}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or verify status rollups")
+    parser.add_argument("--check", action="store_true", help="only verify, do not rewrite")
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    try:
+        mismatches = diff_rollups(db)
+        if args.check:
+            if mismatches:
+                print(f"❌ {len(mismatches)} rollup counters are out of date:")
+                report(mismatches)
+                return 1
+            print("✅ Rollups match the source tables")
+            return 0
+        
+        if mismatches:
+            print(f"🔧 Fixing {len(mismatches)} rollup counters:")
+            report(mismatches)
+        rows = rebuild_rollups(db)
+        db.commit()
+        
+        mismatches = diff_rollups(db)
+        if mismatches:
+            print("❌ Rollups still differ after rebuild:")
+            report(mismatches)
+            return 1
+        print(f"✅ Rebuilt {rows} rollup counters")
+        return 0
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Shared fixtures: the API on a throwaway SQLite database.
+
+Settings are adjusted before any app module is imported, because the
+engines and caches are built from them at import time.
+"""
+import asyncio
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import event
+
+from app.core.config import settings
+
+WORK_DIR = Path(tempfile.mkdtemp(prefix="itrc-tests-"))
+settings.DATABASE_URL = f"sqlite:///{WORK_DIR}/test.db"
+settings.UPLOAD_DIR = str(WORK_DIR / "uploads")
+settings.PASSWORD_HASH_TARGET_MS = 0
+# Long enough that no test sees a principal reload it did not cause
+settings.PRINCIPAL_CACHE_TTL_SECONDS = 600
+
+from app.core.auth import pwd_context  # noqa: E402
+from app.database import Base, async_engine, engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+# Cheap hashes; the cost is irrelevant to what the tests check
+pwd_context.update(bcrypt__default_rounds=4, bcrypt__min_rounds=4)
+
+PASSWORD = "pw123456"
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def database():
+    """The schema, created once per run; yields the synchronous engine."""
+    Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest_asyncio.fixture(scope="session")
+async def client(database):
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            yield client
+
+
+async def register(client: AsyncClient, email: str, role: str) -> dict:
+    """Create a user and return Authorization headers for them."""
+    response = await client.post("/api/auth/register", json={
+        "email": email, "password": PASSWORD, "full_name": f"{role} user", "role": role, "company": "co"
+    })
+    assert response.status_code == 200, response.text
+    response = await client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest_asyncio.fixture(scope="session")
+async def users(client):
+    """Headers for one applicant, one evaluator and one admin, plus a product type."""
+    headers = {
+        "applicant": await register(client, "applicant@example.com", "applicant"),
+        "evaluator": await register(client, "evaluator@example.com", "evaluator"),
+        "admin": await register(client, "admin@example.com", "admin"),
+    }
+    response = await client.post("/api/admin/product-types", headers=headers["admin"], json={
+        "name_en": "Software", "name_fa": "نرم‌افزار", "protection_profile": "pp", "required_documents": []
+    })
+    assert response.status_code == 200, response.text
+    return headers
+
+
+@pytest.fixture
+def create_application(client, users):
+    """Create an application as the applicant and return its id."""
+    async def create(name: str) -> int:
+        response = await client.post("/api/applications/", headers=users["applicant"], data={
+            "product_name": name, "product_type": "Software", "company_name": "co"
+        })
+        assert response.status_code == 200, response.text
+        return response.json()["id"]
+    return create
+
+
+class StatementCounter:
+    """Number of SQL statements sent to the primary engine."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+@pytest.fixture
+def count_statements():
+    """``with count_statements() as counter:`` counts the statements run inside the block."""
+    @contextmanager
+    def counting():
+        counter = StatementCounter()
+        event.listen(async_engine.sync_engine, "before_cursor_execute", counter)
+        try:
+            yield counter
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", counter)
+    return counting
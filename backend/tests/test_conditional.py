@@ -0,0 +1,27 @@
+"""Conditional GETs revalidate when anything in the payload changes."""
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import ProductType
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_product_type_change_invalidates_application_etag(database, client, users, create_application):
+    application_id = await create_application("etag-product-type")
+    path = f"/api/applications/{application_id}"
+    response = await client.get(path, headers=users["admin"])
+    etag = response.headers["etag"]
+    response = await client.get(path, headers={**users["admin"], "If-None-Match": etag})
+    assert response.status_code == 304
+
+    with Session(database) as db:
+        product_type = db.scalar(select(ProductType).where(ProductType.name_en == "Software"))
+        product_type.name_fa = "نرم‌افزار کاربردی"
+        db.commit()
+
+    response = await client.get(path, headers={**users["admin"], "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["product_type"]["name_fa"] == "نرم‌افزار کاربردی"
+    assert response.headers["etag"] != etag
@@ -0,0 +1,24 @@
+"""Bundle entry names cannot escape the ZIP's document-type folders."""
+import pytest
+
+from app.routers.documents import archive_member_name
+
+FALLBACK = "3568217a72eed5450d704907de96e14c75cc1b18661f38e0c9f458e462b38def.pdf"
+
+
+@pytest.mark.parametrize("original, expected", [
+    ("report.pdf", "report.pdf"),
+    ("گزارش ارزیابی‌نهایی.pdf", "گزارش ارزیابی‌نهایی.pdf"),
+    ("../../etc/passwd", "passwd"),
+    ("..\\..\\evil.exe", "evil.exe"),
+    ("C:evil.exe", "evil.exe"),
+    ("dir\\sub/name.zip", "name.zip"),
+    ("bad\x00na\x1bme\n.pdf", "badname.pdf"),
+    ("..", FALLBACK),
+    ("uploads/.", FALLBACK),
+    ("folder\\", FALLBACK),
+    ("", FALLBACK),
+    (None, FALLBACK),
+])
+def test_archive_member_name(original, expected):
+    assert archive_member_name(original, FALLBACK) == expected
@@ -0,0 +1,66 @@
+"""The hot queries use the indexes added in migration 0002.
+
+Checked with SQLite's EXPLAIN QUERY PLAN on the queries the routers build.
+"""
+import pytest
+from sqlalchemy import select
+
+from app.core.pagination import keyset_page
+from app.models import (
+    Application, ApplicationStatus, Document, DocumentType, Evaluation, Report, STClassSelection
+)
+from app.routers.applications import application_summary_query
+
+
+def query_plan(engine, query) -> str:
+    sql = query.compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        return "\n".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+
+
+def page(query):
+    return keyset_page(query, Application.created_at, Application.id, None, 50)
+
+
+@pytest.mark.parametrize("query, index", [
+    (
+        page(application_summary_query().where(Application.applicant_id == 1)),
+        "ix_applications_applicant_id_created_at",
+    ),
+    (
+        page(application_summary_query().where(Application.status == ApplicationStatus.SUBMITTED)),
+        "ix_applications_status_submission_date",
+    ),
+    (
+        select(Application)
+        .where(Application.status == ApplicationStatus.SUBMITTED)
+        .order_by(Application.submission_date),
+        "ix_applications_status_submission_date",
+    ),
+    (page(application_summary_query()), "ix_applications_created_at"),
+    (
+        select(Document).where(Document.application_id == 1, Document.document_type == DocumentType.OTHER),
+        "ix_documents_application_id_document_type",
+    ),
+    (select(Document).where(Document.application_id == 1), "ix_documents_application_id_document_type"),
+    (select(Evaluation).where(Evaluation.application_id == 1), "ix_evaluations_application_id"),
+    (select(Evaluation).where(Evaluation.evaluator_id == 1), "ix_evaluations_evaluator_id"),
+    (select(Report).where(Report.evaluation_id == 1), "ix_reports_evaluation_id_report_type"),
+    (
+        select(STClassSelection).where(STClassSelection.security_target_id == 1),
+        "ix_st_class_selections_security_target_id",
+    ),
+])
+def test_query_uses_index(database, query, index):
+    plan = query_plan(database, query)
+    assert f"USING INDEX {index}" in plan, plan
+
+
+def test_status_filter_sorted_by_submission_date_needs_no_sort(database):
+    plan = query_plan(
+        database,
+        select(Application.id)
+        .where(Application.status == ApplicationStatus.SUBMITTED)
+        .order_by(Application.submission_date)
+    )
+    assert "TEMP B-TREE" not in plan, plan
@@ -0,0 +1,168 @@
+"""ApplicationNumberAllocator never hands out a number twice under concurrency.
+
+Small blocks force frequent reservations, so the counter row is contended
+far more than in production.
+"""
+import asyncio
+import re
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.database import Base, configure_sqlite, get_async_database_url
+from app.models import Application, ProductType, User, UserRole
+from app.numbering import ApplicationNumberAllocator, format_application_number
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Allocates numbers in a separate process, like one API worker
+WORKER = textwrap.dedent("""
+    import asyncio, sys
+    from app.core.config import settings
+    settings.DATABASE_URL = sys.argv[1]
+    from app.database import async_engine
+    from app.numbering import ApplicationNumberAllocator
+
+    async def main(year, count, block_size):
+        allocator = ApplicationNumberAllocator(async_engine, block_size)
+        numbers = await asyncio.gather(*(allocator.next_number(year) for _ in range(count)))
+        await async_engine.dispose()
+        print("\\n".join(numbers))
+
+    asyncio.run(main(int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4])))
+""")
+
+# Creates applications in a separate process the way the create route does:
+# a number from generate_application_number, then an ORM flush and commit
+CREATE_WORKER = textwrap.dedent("""
+    import asyncio, sys
+    from app.core.config import settings
+    settings.DATABASE_URL = sys.argv[1]
+    settings.APPLICATION_NUMBER_BLOCK_SIZE = 3
+    from app.database import AsyncSessionLocal, async_engine
+    from app.models import Application, ApplicationStatus
+    from app.routers.applications import generate_application_number
+
+    async def main(prefix, count, concurrency, applicant_id, product_type_id):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def create(i):
+            async with semaphore, AsyncSessionLocal() as db:
+                db.add(Application(
+                    application_number=await generate_application_number(),
+                    product_name=f"{prefix}-{i}", product_type_id=product_type_id, applicant_id=applicant_id,
+                    company_name="co", status=ApplicationStatus.SUBMITTED
+                ))
+                await db.commit()
+
+        await asyncio.gather(*(create(i) for i in range(count)))
+        await async_engine.dispose()
+
+    asyncio.run(main(sys.argv[2], *map(int, sys.argv[3:])))
+""")
+
+
+def new_engine():
+    """An engine with its own pool, as another worker would have."""
+    engine = create_async_engine(get_async_database_url(settings.DATABASE_URL))
+    configure_sqlite(engine.sync_engine)
+    return engine
+
+
+@pytest.mark.asyncio
+async def test_one_allocator_under_concurrent_requests(database):
+    engine = new_engine()
+    allocator = ApplicationNumberAllocator(engine, block_size=3)
+    try:
+        numbers = await asyncio.gather(*(allocator.next_number(2101) for _ in range(300)))
+    finally:
+        await engine.dispose()
+
+    assert len(set(numbers)) == 300
+    # A single allocator uses its blocks in full
+    assert sorted(numbers) == [format_application_number(2101, value) for value in range(1, 301)]
+
+
+@pytest.mark.asyncio
+async def test_allocators_with_separate_pools(database):
+    engines = [new_engine() for _ in range(4)]
+    allocators = [ApplicationNumberAllocator(engine, block_size=2) for engine in engines]
+    try:
+        numbers = await asyncio.gather(*(
+            allocator.next_number(2102) for _ in range(100) for allocator in allocators
+        ))
+    finally:
+        for engine in engines:
+            await engine.dispose()
+
+    assert len(numbers) == 400
+    assert len(set(numbers)) == 400
+
+
+@pytest.mark.asyncio
+async def test_new_year_starts_a_new_sequence(database):
+    engine = new_engine()
+    allocator = ApplicationNumberAllocator(engine, block_size=5)
+    try:
+        assert await allocator.next_number(2103) == format_application_number(2103, 1)
+        assert await allocator.next_number(2104) == format_application_number(2104, 1)
+        assert await allocator.next_number(2103) == format_application_number(2103, 6)
+    finally:
+        await engine.dispose()
+
+
+def test_worker_processes_never_collide(database):
+    workers = [
+        subprocess.Popen(
+            [sys.executable, "-c", WORKER, settings.DATABASE_URL, "2105", "500", "3"],
+            cwd=BACKEND_DIR, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+        )
+        for _ in range(4)
+    ]
+    numbers = []
+    for worker in workers:
+        stdout, stderr = worker.communicate(timeout=120)
+        assert worker.returncode == 0, stderr
+        numbers += stdout.split()
+
+    assert len(numbers) == 2000
+    assert len(set(numbers)) == 2000
+
+
+def test_concurrent_creates_store_unique_numbers(tmp_path):
+    # A database of its own, so the 2000 rows do not show up in other tests' lists
+    url = f"sqlite:///{tmp_path}/numbering.db"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        applicant_id = conn.execute(insert(User).values(
+            email="numbering@example.com", hashed_password="x", full_name="numbering", role=UserRole.APPLICANT
+        )).inserted_primary_key[0]
+        product_type_id = conn.execute(insert(ProductType).values(
+            name_en="Software", name_fa="نرم‌افزار", protection_profile="pp"
+        )).inserted_primary_key[0]
+
+    workers = [
+        subprocess.Popen(
+            [sys.executable, "-c", CREATE_WORKER, url, f"numbering-{worker}", "500", "20",
+             str(applicant_id), str(product_type_id)],
+            cwd=BACKEND_DIR, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+        )
+        for worker in range(4)
+    ]
+    for worker in workers:
+        _, stderr = worker.communicate(timeout=600)
+        assert worker.returncode == 0, stderr
+
+    with engine.connect() as conn:
+        numbers = conn.scalars(select(Application.application_number)).all()
+    engine.dispose()
+    assert len(numbers) == 2000
+    assert len(set(numbers)) == 2000
+    assert all(re.fullmatch(r"ITRC-\d{4}-\d{6}", number) for number in numbers)
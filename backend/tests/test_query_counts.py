@@ -0,0 +1,75 @@
+"""The application endpoints issue a fixed number of statements.
+
+Each endpoint is measured before and after more applications exist; a
+count that grows with the data is an N+1 query.
+"""
+import pytest
+
+from app.core.config import settings
+
+pytestmark = pytest.mark.asyncio
+
+LIST_ENDPOINTS = [
+    ("/api/applications/", "admin"),
+    ("/api/applications/dashboard/list", "admin"),
+    ("/api/applications/dashboard/list", "evaluator"),
+    ("/api/applications/dashboard/list", "applicant"),
+    ("/api/applications/my", "applicant"),
+    ("/api/applications/available", "evaluator"),
+]
+
+
+async def statements_for(client, count_statements, path, headers):
+    # Warm the principal cache so only the endpoint's own queries are counted
+    response = await client.get("/api/auth/me", headers=headers)
+    assert response.status_code == 200, response.text
+    with count_statements() as counter:
+        response = await client.get(path, headers=headers)
+    assert response.status_code == 200, response.text
+    return counter.count, response.json()
+
+
+@pytest.mark.parametrize("path, role", LIST_ENDPOINTS)
+async def test_list_runs_one_query(client, users, create_application, count_statements, path, role):
+    path = f"{path}?limit={settings.PAGE_SIZE_MAX}"
+    await create_application("list-first")
+    few, rows = await statements_for(client, count_statements, path, users[role])
+
+    for i in range(10):
+        await create_application(f"list-{i}")
+    many, more_rows = await statements_for(client, count_statements, path, users[role])
+
+    assert len(more_rows) > len(rows)
+    assert few == many == 1
+
+
+async def test_detail_query_count_is_fixed(client, users, create_application, count_statements):
+    first = await create_application("detail-first")
+    for i in range(5):
+        await create_application(f"detail-{i}")
+    last = await create_application("detail-last")
+
+    counts = []
+    for application_id in (first, last):
+        count, body = await statements_for(
+            client, count_statements, f"/api/applications/{application_id}", users["admin"]
+        )
+        assert body["id"] == application_id
+        assert body["applicant"]["email"] == "applicant@example.com"
+        counts.append(count)
+
+    # Version check, then the application with its applicant and product type
+    assert counts == [4, 4]
+
+
+async def test_detail_not_modified_runs_version_query_only(client, users, create_application, count_statements):
+    application_id = await create_application("detail-etag")
+    response = await client.get(f"/api/applications/{application_id}", headers=users["admin"])
+    etag = response.headers["etag"]
+
+    with count_statements() as counter:
+        response = await client.get(
+            f"/api/applications/{application_id}", headers={**users["admin"], "If-None-Match": etag}
+        )
+    assert response.status_code == 304
+    assert counter.count == 1
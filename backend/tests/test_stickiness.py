@@ -0,0 +1,66 @@
+"""A user's reads stay on the primary after their write, on any worker.
+
+Another worker is simulated by emptying this worker's recent_writers and
+configuring one stand-in replica that counts its sessions.
+"""
+import itertools
+
+import pytest
+
+from app import database
+from app.core.cache import TTLCache
+from app.core.stickiness import READ_PRIMARY_COOKIE, READ_PRIMARY_HEADER, token_is_current
+
+pytestmark = pytest.mark.asyncio
+
+
+class CountingReplica:
+    def __init__(self):
+        self.sessions = 0
+
+    def __call__(self):
+        self.sessions += 1
+        return database.AsyncSessionLocal()
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    replica = CountingReplica()
+    monkeypatch.setattr(database, "_replica_cycle", itertools.cycle([replica]))
+    monkeypatch.setattr(database, "recent_writers", TTLCache(maxsize=10, ttl=60))
+    return replica
+
+
+async def test_write_returns_token_for_its_user(client, users):
+    response = await client.post("/api/applications/", headers=users["applicant"], data={
+        "product_name": "sticky", "product_type": "Software", "company_name": "co"
+    })
+    assert response.status_code == 200, response.text
+    token = response.headers[READ_PRIMARY_HEADER]
+    assert response.cookies[READ_PRIMARY_COOKIE] == token
+    assert token_is_current(token, "applicant@example.com")
+    assert not token_is_current(token, "evaluator@example.com")
+    assert not token_is_current("0." + token.split(".")[1], "applicant@example.com")
+
+    response = await client.get("/api/auth/me", headers=users["applicant"])
+    assert READ_PRIMARY_HEADER not in response.headers
+
+
+async def test_token_keeps_reads_on_primary(client, users, replica):
+    response = await client.post("/api/applications/", headers=users["applicant"], data={
+        "product_name": "sticky", "product_type": "Software", "company_name": "co"
+    })
+    token = response.headers[READ_PRIMARY_HEADER]
+    database.recent_writers.clear()
+    client.cookies.clear()
+
+    async def read(**kwargs):
+        response = await client.get("/api/applications/dashboard/list", **kwargs)
+        assert response.status_code == 200, response.text
+        return replica.sessions
+
+    assert await read(headers=users["applicant"]) == 1
+    assert await read(headers={**users["applicant"], READ_PRIMARY_HEADER: token}) == 1
+    assert await read(headers=users["applicant"], cookies={READ_PRIMARY_COOKIE: token}) == 1
+    # Bound to the writer: another user presenting it still reads from the replica
+    assert await read(headers={**users["evaluator"], READ_PRIMARY_HEADER: token}) == 2
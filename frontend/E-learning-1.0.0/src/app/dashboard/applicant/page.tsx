@@ -3,6 +3,7 @@
 import { useEffect, useState } from "react";
 import Link from "next/link";
 import { motion } from "framer-motion";
+import { fetchAllPages } from "@/utils/pagination";
 
 interface User {
   id: number;
@@ -72,17 +73,11 @@ export default function ApplicantDashboard() {
       }
 
       console.log("🔍 Loading applications for applicant...");
-      const response = await fetch("http://localhost:8000/api/applications", {
+      const data: any[] = await fetchAllPages("http://localhost:8000/api/applications", {
         headers: {
           "Authorization": `Bearer ${token}`,
         },
       });
-      
-      if (!response.ok) {
-        throw new Error(`Failed to load applications: ${response.status} ${await response.text()}`);
-      }
-      
-      const data: any[] = await response.json(); // Explicitly type data as any[] for now
       console.log("API Response Data (Applicant):", data);
 
       const applicationsData: Application[] = data.map((app: any) => {
@@ -3,6 +3,7 @@
 import { useEffect, useState } from "react";
 import Link from "next/link";
 import { motion } from "framer-motion";
+import { fetchAllPages } from "@/utils/pagination";
 
 interface User {
   id: number;
@@ -71,17 +72,11 @@ export default function EvaluatorDashboard() {
       }
   
       console.log("🔍 Loading applications for evaluator dashboard...");
-      const response = await fetch("http://localhost:8000/api/applications/dashboard/list", {
+      const data = await fetchAllPages("http://localhost:8000/api/applications/dashboard/list", {
         headers: {
           "Authorization": `Bearer ${token}`,
         },
       });
-      
-      if (!response.ok) {
-        throw new Error(`Failed to load applications: ${response.status}`);
-      }
-      
-      const data = await response.json();
       console.log("API Response Data (Evaluator):", data);
   
       const transformedData = data.map((app: any) => {
@@ -0,0 +1,24 @@
+// List endpoints return one page at a time; the next page's cursor comes
+// back in the X-Next-Cursor header and is absent on the last page.
+const PAGE_LIMIT = 200;
+
+const fetchAllPages = async (url: string, init: RequestInit = {}): Promise<any[]> => {
+    const rows: any[] = [];
+    let cursor: string | null = null;
+    do {
+        const pageUrl = new URL(url);
+        pageUrl.searchParams.set("limit", String(PAGE_LIMIT));
+        if (cursor) {
+            pageUrl.searchParams.set("cursor", cursor);
+        }
+        const response = await fetch(pageUrl.toString(), init);
+        if (!response.ok) {
+            throw new Error(`Failed to load applications: ${response.status} ${await response.text()}`);
+        }
+        rows.push(...(await response.json()));
+        cursor = response.headers.get("X-Next-Cursor");
+    } while (cursor);
+    return rows;
+};
+
+export { fetchAllPages };